@@ -1,7 +1,7 @@
 import os
 from flask import Flask
+import click
 from config import config
-from flask_migrate import Migrate
 from flask_login import LoginManager
 
 def create_app(config_name=None):
@@ -16,10 +16,22 @@ def create_app(config_name=None):
 
     # Initialize extensions
     from .models import db
+    from .monitoring import apply_pool_telemetry, configure_sqlite, init_request_metrics
+    apply_pool_telemetry(app)
     db.init_app(app)
+    configure_sqlite(app, db)
+    init_request_metrics(app, db)
 
-    # Initialize Flask-Migrate
-    migrate = Migrate(app, db)
+    # Per-request profiling hooks exist only when profiling can be requested
+    if app.config.get('PROFILING_ENABLED') or app.config.get('PROFILE_SECRET'):
+        from .profiling import init_profiling
+        init_profiling(app)
+
+    # Initialize Flask-Migrate only for the flask CLI (it adds the "db" commands);
+    # importing it loads Alembic, which web workers never use
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db)
 
     # Initialize Flask-Login
     login_manager = LoginManager()
@@ -34,22 +46,34 @@ def create_app(config_name=None):
 
     # Register blueprints
     from .routes import main
+    from .monitoring import monitoring
     app.register_blueprint(main)
+    app.register_blueprint(monitoring)
+
+    # Background writer for auto-saved simulations
+    from .autosave import init_autosave
+    init_autosave(app)
 
-    # Create database tables and seed initial data
-    with app.app_context():
-        db.create_all()
-        seed_achievements()
+    # Register CLI maintenance commands
+    from .cli import register_commands
+    register_commands(app)
+
+    # Schema work happens in "flask init-db" (once per deploy); workers boot without it
+    if app.config.get('DB_AUTO_INIT') or app.config.get('DB_CHECK_MIGRATIONS'):
+        from .schema import init_db, check_migrations
+        with app.app_context():
+            if app.config.get('DB_AUTO_INIT'):
+                init_db()
+            if app.config.get('DB_CHECK_MIGRATIONS'):
+                check_migrations()
 
     return app
 
 def seed_achievements():
-    """Seed initial achievements into the database"""
-    from .models import Achievement, db
+    """Seed initial achievements into the database (missing ones only); returns how many were added"""
+    from .models import Achievement, db, invalidate_achievement_cache
 
-    # Check if achievements already exist
-    if Achievement.query.count() > 0:
-        return
+    existing = {name for (name,) in db.session.query(Achievement.name)}
 
     achievements_data = [
         # Simulation achievements
@@ -125,8 +149,14 @@ def seed_achievements():
         }
     ]
 
-    for achievement_data in achievements_data:
+    missing = [data for data in achievements_data if data['name'] not in existing]
+    if not missing:
+        return 0
+
+    for achievement_data in missing:
         achievement = Achievement(**achievement_data)
         db.session.add(achievement)
 
     db.session.commit()
+    invalidate_achievement_cache()
+    return len(missing)
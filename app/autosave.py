@@ -0,0 +1,188 @@
+"""
+Background writer for auto-saved simulations
+
+Calculation endpoints hand their results to a bounded in-process queue and
+respond immediately. A daemon thread drains the queue in batches: it inserts
+the simulations and their performance samples in one transaction and then
+runs the per-user bookkeeping (stats, achievements). Re-saving identical inputs only
+bumps the existing row's updated_at (see save_autosaved_simulation). A batch
+that fails to commit is rolled back and retried one simulation at a time, so
+only the failing items are lost (and logged).
+
+Achievements awarded in the background are stored with notified_at unset and
+reported on the user's next request to any worker (pop_unnotified_achievements
+claims and stamps them).
+"""
+import atexit
+import os
+import queue
+import threading
+from flask import current_app
+
+class SimulationWriter:
+    """Bounded queue + daemon thread that batches simulation auto-saves"""
+
+    def __init__(self, app, max_queue_size=1000, batch_size=50, flush_interval=0.5):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the writer thread lazily, once per process (threads do not survive fork)"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='simulation-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, item):
+        """
+        Queue an auto-save. Returns False when the queue is full so the
+        caller can fall back to a synchronous save.
+        """
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self.write_batch(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def write_batch(self, batch):
+        """Insert a batch of simulations and run achievement checks per user"""
+        with self.app.app_context():
+            try:
+                _write_batch(batch, notify_later=True)
+            except Exception:
+                # _write_batch logs failing items itself; never let the writer thread die
+                current_app.logger.exception('Background auto-save failed for %d simulations', len(batch))
+
+    def flush(self):
+        """Write whatever is still queued in the calling thread (used at shutdown)"""
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.write_batch(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+def _write_batch(batch, notify_later):
+    """Save the batch and run the per-user bookkeeping; returns the awarded achievements as dicts"""
+    from .models import db, update_user_stats, check_achievements
+
+    try:
+        created = _insert_simulations(batch)
+    except Exception:
+        db.session.rollback()
+        # One bad item must not take the rest of the batch with it
+        created = []
+        for item in batch:
+            try:
+                created.extend(_insert_simulations([item]))
+            except Exception:
+                db.session.rollback()
+                current_app.logger.exception(
+                    'Auto-save failed for user %s (%s)', item.get('user_id'), item.get('module_type')
+                )
+
+    # Deduplicated saves add no simulation, so only new rows touch the stats
+    user_ids = []
+    for simulation in created:
+        if simulation.user_id not in user_ids:
+            user_ids.append(simulation.user_id)
+
+    awarded = []
+    for user_id in user_ids:
+        try:
+            update_user_stats(user_id)
+            awarded.extend(check_achievements(user_id, notify_later=notify_later))
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('Auto-save bookkeeping failed for user %s', user_id)
+    return awarded
+
+def _insert_simulations(batch):
+    """
+    Save the batch and fold the new rows into the users' performance in one
+    transaction; returns the newly created simulations
+    """
+    from .models import db, save_autosaved_simulation, record_simulation_performance
+
+    created = []
+    for item in batch:
+        results_data = _serialize_results(item['results_data'])
+        simulation, is_new = save_autosaved_simulation(
+            user_id=item['user_id'],
+            name=item['name'],
+            description=item.get('description'),
+            module_type=item['module_type'],
+            input_data=item['input_data'],
+            results_data=results_data
+        )
+        if is_new:
+            record_simulation_performance(item['user_id'], results_data)
+            created.append(simulation)
+    db.session.commit()
+    return created
+
+def _serialize_results(results_data):
+    dataframe = results_data.get('dataframe')
+    if hasattr(dataframe, 'to_dict'):
+        # DataFrame serialization is deferred to the writer thread
+        results_data = dict(results_data, dataframe=dataframe.to_dict('records'))
+    return results_data
+
+def init_autosave(app):
+    """Attach the background writer to the app (unless disabled by config)"""
+    if not app.config.get('AUTOSAVE_ASYNC', True):
+        return None
+
+    writer = SimulationWriter(
+        app,
+        max_queue_size=app.config.get('AUTOSAVE_QUEUE_SIZE', 1000),
+        batch_size=app.config.get('AUTOSAVE_BATCH_SIZE', 50),
+        flush_interval=app.config.get('AUTOSAVE_FLUSH_INTERVAL', 0.5)
+    )
+    app.extensions['autosave_writer'] = writer
+    atexit.register(writer.flush)
+    return writer
+
+def save_simulation_async(item):
+    """
+    Queue an auto-save for the background writer.
+
+    Falls back to a synchronous save when the writer is disabled or the queue
+    is full. Returns the achievements awarded synchronously (empty when queued).
+    """
+    writer = current_app.extensions.get('autosave_writer')
+    if writer is not None and writer.submit(item):
+        return []
+
+    return _write_batch([item], notify_later=False)
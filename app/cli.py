@@ -0,0 +1,135 @@
+"""
+Flask CLI commands for maintenance jobs
+"""
+import click
+from flask import current_app
+
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI"""
+
+    @app.cli.command('init-db')
+    @click.option('--check-migrations', is_flag=True, help='Also compare the database with the Alembic head')
+    def init_db_command(check_migrations):
+        """Create missing tables and seed reference data (run once per deploy, before the workers)"""
+        from .schema import init_db, pending_migrations_message
+
+        added = init_db()
+        click.echo(f"Database initialized: {added} achievements seeded")
+        if check_migrations:
+            message = pending_migrations_message()
+            if message:
+                raise click.ClickException(message)
+            click.echo("Migrations: up to date")
+
+    @app.cli.command('seed')
+    def seed_command():
+        """Seed reference data (achievements) without touching the schema"""
+        from . import seed_achievements
+
+        added = seed_achievements()
+        click.echo(f"Achievements seeded: {added}")
+
+    @app.cli.command('profile-token')
+    @click.option('--ttl', default=300, show_default=True, help='Seconds the token stays valid')
+    def profile_token_command(ttl):
+        """Print an X-Profile-Token header value that profiles the requests carrying it"""
+        from .profiling import sign_profile_token, PROFILE_HEADER
+
+        secret = current_app.config.get('PROFILE_SECRET')
+        if not secret:
+            raise click.ClickException('PROFILE_SECRET is not set')
+        click.echo(f"{PROFILE_HEADER}: {sign_profile_token(secret, ttl)}")
+
+    @app.cli.command('refresh-community-stats')
+    def refresh_community_stats_command():
+        """Recompute the materialized community statistics (run from a scheduler)"""
+        from .models import refresh_community_stats
+
+        stats = refresh_community_stats()
+        click.echo(
+            f"Community stats refreshed: {stats.total_users} users, "
+            f"{stats.total_simulations} simulations"
+        )
+
+    @app.cli.command('refresh-template-scores')
+    @click.option('--batch-size', default=500, show_default=True, help='Templates updated per transaction')
+    @click.option('--max-age', default=3600, show_default=True, help='Only refresh scores older than this (seconds)')
+    def refresh_template_scores_command(batch_size, max_age):
+        """Refresh time-decayed template popularity scores incrementally"""
+        from .models import refresh_template_scores
+
+        refreshed = refresh_template_scores(batch_size=batch_size, max_age=max_age)
+        click.echo(f"Template scores refreshed: {refreshed}")
+
+    @app.cli.command('recount-template-votes')
+    def recount_template_votes_command():
+        """Recompute template vote tallies from template_votes (run periodically)"""
+        from .models import recount_template_votes, refresh_template_scores
+
+        corrected = recount_template_votes()
+        refreshed = refresh_template_scores()
+        click.echo(f"Template tallies corrected: {corrected}, scores refreshed: {refreshed}")
+
+    @app.cli.command('retention')
+    @click.option('--ttl-days', type=int, default=None, help='Delete anonymous users inactive longer than this')
+    @click.option('--compact-after-days', type=int, default=None, help='Thin auto-saves not updated for this long')
+    @click.option('--chunk-size', type=int, default=None, help='Rows handled per transaction')
+    def retention_command(ttl_days, compact_after_days, chunk_size):
+        """Purge stale anonymous users and compact old auto-saved simulations"""
+        from .models import (
+            purge_inactive_anonymous_users, compact_stale_simulations,
+            purge_orphan_simulation_results, refresh_community_stats
+        )
+
+        config = current_app.config
+        ttl_days = ttl_days if ttl_days is not None else config['RETENTION_ANONYMOUS_TTL_DAYS']
+        compact_after_days = (
+            compact_after_days if compact_after_days is not None else config['RETENTION_COMPACT_AFTER_DAYS']
+        )
+        chunk_size = chunk_size or config['RETENTION_CHUNK_SIZE']
+
+        click.echo(f"Purging anonymous users inactive for more than {ttl_days} days...")
+        users = purge_inactive_anonymous_users(
+            ttl_days, chunk_size=chunk_size,
+            progress=lambda done: click.echo(f"  users deleted: {done}")
+        )
+
+        click.echo(f"Compacting auto-saved simulations older than {compact_after_days} days...")
+        simulations = compact_stale_simulations(
+            compact_after_days, chunk_size=chunk_size,
+            progress=lambda done: click.echo(f"  simulations compacted: {done}")
+        )
+
+        results = purge_orphan_simulation_results(chunk_size=chunk_size)
+        refresh_community_stats()
+        click.echo(
+            f"Retention done: {users} users deleted, {simulations} simulations compacted, "
+            f"{results} orphan results removed"
+        )
+
+    @app.cli.command('export-simulations')
+    @click.option('--user-id', default=None, help='Only this user (default: every user)')
+    @click.option('--output', type=click.File('w', encoding='utf-8'), default='-', show_default=True)
+    def export_simulations_command(user_id, output):
+        """Export simulations as NDJSON (streamed, constant memory)"""
+        from .transfer import iter_simulations_ndjson
+
+        count = 0
+        for line in iter_simulations_ndjson(user_id):
+            output.write(line)
+            count += 1
+        click.echo(f"Simulations exported: {count}", err=True)
+
+    @app.cli.command('import-simulations')
+    @click.argument('source', type=click.File('r', encoding='utf-8'))
+    @click.option('--user-id', default=None, help='Assign every record to this user (default: user_id per record)')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Rows inserted per transaction')
+    def import_simulations_command(source, user_id, chunk_size):
+        """Import simulations from an NDJSON file with validation"""
+        from .transfer import import_simulations_ndjson
+
+        summary = import_simulations_ndjson(source, user_id=user_id, chunk_size=chunk_size)
+        for error in summary.errors:
+            click.echo(f"  line {error['line']}: {error['error']}", err=True)
+        click.echo(f"Simulations imported: {summary.imported}, rejected: {summary.rejected}")
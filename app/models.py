@@ -1,14 +1,26 @@
 """
 Database models for the financial simulator with user profiles and gamification
 """
-import pandas as pd
-import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask_sqlalchemy import SQLAlchemy
 from uuid import uuid4
+import hashlib
+import json
+import sys
+import threading
+from .monitoring import timed
 
 db = SQLAlchemy()
 
+# Template popularity ranking: engagement weights and time-decay gravity
+TEMPLATE_SCORE_WEIGHTS = {
+    'upvotes': 1.0,
+    'downvotes': -1.0,
+    'downloads': 0.5,
+    'views': 0.05
+}
+TEMPLATE_SCORE_GRAVITY = 1.5
+
 class User(db.Model):
     """User model for anonymous and registered profiles"""
     __tablename__ = 'users'
@@ -31,12 +43,20 @@ class User(db.Model):
     total_templates_created = db.Column(db.Integer, default=0)
     total_achievements = db.Column(db.Integer, default=0)
 
+    # Average simulation 'rentabilidad', derived from the stored sum and count
+    # (both updated atomically when simulations are saved or deleted)
+    avg_performance = db.Column(db.Float, default=0.0)
+    performance_total = db.Column(db.Float, default=0.0)
+    performance_samples = db.Column(db.Integer, default=0)
+
     # Relationships
     simulations = db.relationship('Simulation', backref='user', lazy=True, cascade='all, delete-orphan')
     achievements = db.relationship('UserAchievement', backref='user', lazy=True, cascade='all, delete-orphan')
     templates = db.relationship('Template', backref='creator', lazy=True, cascade='all, delete-orphan')
 
+    # Retention job scans anonymous users by inactivity
     __table_args__ = (
+        db.Index('ix_users_registered_last_active', 'is_registered', 'last_active'),
         db.UniqueConstraint('email', name='unique_user_email'),
     )
 
@@ -77,7 +97,8 @@ class User(db.Model):
             'display_name': self.display_name,
             'total_simulations': self.total_simulations,
             'total_templates_created': self.total_templates_created,
-            'total_achievements': self.total_achievements
+            'total_achievements': self.total_achievements,
+            'avg_performance': self.avg_performance or 0
         }
 
 class Simulation(db.Model):
@@ -92,7 +113,11 @@ class Simulation(db.Model):
 
     # Simulation data (stored as JSON)
     input_data = db.Column(db.JSON, nullable=False)
-    results_data = db.Column(db.JSON, nullable=False)
+    results_data = db.Column(db.JSON, nullable=True)  # None when the blob lives in simulation_results
+
+    # Content hash of the normalized input_data, and optional shared result blob
+    input_hash = db.Column(db.String(64), nullable=True)
+    result_id = db.Column(db.Integer, db.ForeignKey('simulation_results.id'), nullable=True)
 
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -100,12 +125,46 @@ class Simulation(db.Model):
     is_favorite = db.Column(db.Boolean, default=False)
     is_public = db.Column(db.Boolean, default=False)
 
+    # Retention: auto-saved rows are thinned to their summary once stale
+    is_autosave = db.Column(db.Boolean, default=False)
+    compacted_at = db.Column(db.DateTime, nullable=True)
+
     # Relationships
     shares = db.relationship('SimulationShare', backref='simulation', lazy=True, cascade='all, delete-orphan')
+    shared_result = db.relationship('SimulationResult', lazy=True)
+
+    # Keyset pagination index for user listings ordered by (updated_at, id)
+    __table_args__ = (
+        db.Index('ix_simulations_user_updated', 'user_id', 'updated_at', 'id'),
+        db.Index('ix_simulations_user_module_hash', 'user_id', 'module_type', 'input_hash'),
+        db.Index('ix_simulations_autosave_updated', 'is_autosave', 'updated_at', 'id'),
+    )
+
+    # Columns needed by list views (JSON blobs are left out on purpose)
+    LIST_COLUMNS = ('id', 'name', 'module_type', 'created_at', 'updated_at', 'is_favorite', 'is_public')
 
     def __repr__(self):
         return f'<Simulation {self.id}: {self.name}>'
 
+    @property
+    def results(self):
+        """Results blob, whether stored inline or shared through simulation_results"""
+        if self.results_data is not None:
+            return self.results_data
+        return self.shared_result.results_data if self.shared_result else None
+
+    def to_summary_dict(self):
+        """Slim representation for listings, without input/results data"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'module_type': self.module_type,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'is_favorite': self.is_favorite,
+            'is_public': self.is_public
+        }
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -114,13 +173,27 @@ class Simulation(db.Model):
             'description': self.description,
             'module_type': self.module_type,
             'input_data': self.input_data,
-            'results_data': self.results_data,
+            'results_data': self.results,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'is_favorite': self.is_favorite,
             'is_public': self.is_public
         }
 
+class SimulationResult(db.Model):
+    """Result blobs shared by every simulation whose results are identical"""
+    __tablename__ = 'simulation_results'
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    results_data = db.Column(db.JSON, nullable=False)
+
+    # Metadata
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SimulationResult {self.id}: {self.content_hash[:12]}>'
+
 class Template(db.Model):
     """Template model for sharing simulation configurations"""
     __tablename__ = 'templates'
@@ -143,6 +216,10 @@ class Template(db.Model):
     views = db.Column(db.Integer, default=0)
     downloads = db.Column(db.Integer, default=0)
 
+    # Precomputed ranking (see compute_template_score)
+    popularity_score = db.Column(db.Float, default=0.0)
+    score_updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -150,9 +227,23 @@ class Template(db.Model):
     # Relationships
     votes = db.relationship('TemplateVote', backref='template', lazy=True, cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_templates_public_score', 'is_public', 'popularity_score', 'id'),
+        db.Index('ix_templates_creator_score', 'creator_id', 'popularity_score', 'id'),
+        db.Index('ix_templates_score_updated', 'score_updated_at'),
+    )
+
     def __repr__(self):
         return f'<Template {self.id}: {self.name}>'
 
+    def refresh_score(self, now=None):
+        """Recompute the precomputed popularity score from the current counters"""
+        now = now or datetime.utcnow()
+        self.popularity_score = compute_template_score(
+            self.upvotes, self.downvotes, self.views, self.downloads, self.created_at, now
+        )
+        self.score_updated_at = now
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -168,6 +259,7 @@ class Template(db.Model):
             'downvotes': self.downvotes,
             'views': self.views,
             'downloads': self.downloads,
+            'popularity_score': self.popularity_score,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -229,6 +321,9 @@ class UserAchievement(db.Model):
     current_value = db.Column(db.Integer, default=0)
     is_completed = db.Column(db.Boolean, default=False)
     completed_at = db.Column(db.DateTime, nullable=True)
+    # NULL while a completed achievement has not been reported to the user yet
+    # (awarded by the background auto-save writer)
+    notified_at = db.Column(db.DateTime, nullable=True)
 
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -240,6 +335,20 @@ class UserAchievement(db.Model):
     def __repr__(self):
         return f'<UserAchievement {self.user_id}:{self.achievement_id}>'
 
+    @staticmethod
+    def virtual_progress_dict(user_id, achievement_id):
+        """Progress entry for an achievement the user has not started (not persisted)"""
+        return {
+            'id': None,
+            'user_id': user_id,
+            'achievement_id': achievement_id,
+            'current_value': 0,
+            'is_completed': False,
+            'completed_at': None,
+            'created_at': None,
+            'updated_at': None
+        }
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -286,6 +395,56 @@ class SimulationShare(db.Model):
     def __repr__(self):
         return f'<SimulationShare {self.id}>'
 
+class CommunityStats(db.Model):
+    """Materialized community statistics (single row, refreshed by a job)"""
+    __tablename__ = 'community_stats'
+
+    SINGLETON_ID = 1
+
+    id = db.Column(db.Integer, primary_key=True)
+    total_users = db.Column(db.Integer, default=0)
+    total_simulations = db.Column(db.Integer, default=0)
+    avg_simulations_per_user = db.Column(db.Float, default=0.0)
+    avg_performance = db.Column(db.Float, default=0.0)
+
+    # Metadata
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CommunityStats {self.refreshed_at}>'
+
+    def to_dict(self):
+        return {
+            'total_users': self.total_users,
+            'total_simulations': self.total_simulations,
+            'avg_simulations_per_user': self.avg_simulations_per_user,
+            'avg_performance': self.avg_performance,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
+
+# In-process cache of active achievement definitions (seeded once, rarely change)
+_achievement_cache = None
+_achievement_cache_lock = threading.Lock()
+
+def get_active_achievements():
+    """Return active achievement definitions as dicts, ordered by id (cached per process)"""
+    global _achievement_cache
+
+    cache = _achievement_cache
+    if cache is None:
+        with _achievement_cache_lock:
+            if _achievement_cache is None:
+                achievements = Achievement.query.filter_by(is_active=True).order_by(Achievement.id).all()
+                _achievement_cache = [a.to_dict() for a in achievements]
+            cache = _achievement_cache
+    return cache
+
+def invalidate_achievement_cache():
+    """Drop cached achievement definitions (call after changing the achievements table)"""
+    global _achievement_cache
+    with _achievement_cache_lock:
+        _achievement_cache = None
+
 # Utility functions for user management
 def get_or_create_user(user_id=None):
     """Get existing user or create new anonymous user"""
@@ -311,53 +470,547 @@ def update_user_stats(user_id):
         user.total_achievements = UserAchievement.query.filter_by(user_id=user_id, is_completed=True).count()
         db.session.commit()
 
-def check_achievements(user_id):
-    """Check and award achievements for user"""
+    refresh_community_stats_if_stale()
+
+def compute_template_score(upvotes, downvotes, views, downloads, created_at, now=None):
+    """
+    Popularity score with time decay: weighted engagement / (age_hours + 2) ^ gravity
+    """
+    now = now or datetime.utcnow()
+    engagement = (
+        (upvotes or 0) * TEMPLATE_SCORE_WEIGHTS['upvotes'] +
+        (downvotes or 0) * TEMPLATE_SCORE_WEIGHTS['downvotes'] +
+        (downloads or 0) * TEMPLATE_SCORE_WEIGHTS['downloads'] +
+        (views or 0) * TEMPLATE_SCORE_WEIGHTS['views']
+    )
+    age_hours = max((now - (created_at or now)).total_seconds() / 3600, 0)
+    return engagement / (age_hours + 2) ** TEMPLATE_SCORE_GRAVITY
+
+def update_template_score(template_id, now=None):
+    """
+    Recompute one template's score from its stored counters with a Core
+    UPDATE (updated_at is left alone). Does not commit.
+    """
+    now = now or datetime.utcnow()
+    counters = db.session.execute(
+        db.select(Template.upvotes, Template.downvotes, Template.views, Template.downloads, Template.created_at)
+        .where(Template.id == template_id)
+    ).first()
+    if counters is None:
+        return None
+
+    score = compute_template_score(*counters, now=now)
+    db.session.execute(
+        db.update(Template)
+        .where(Template.id == template_id)
+        .values(popularity_score=score, score_updated_at=now, updated_at=Template.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return score
+
+def refresh_template_scores(batch_size=500, max_age=3600):
+    """
+    Incrementally refresh template scores so time decay stays current.
+
+    Only templates whose score is older than max_age seconds are touched,
+    stalest first, in batches of batch_size. Scores are written with a Core
+    UPDATE that leaves updated_at (the template's last edit) alone. Returns
+    the number refreshed.
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=max_age)
+    refreshed = 0
+    table = Template.__table__
+    update_score = table.update().where(table.c.id == db.bindparam('template_id')).values(
+        popularity_score=db.bindparam('score'), score_updated_at=now, updated_at=table.c.updated_at
+    )
+
+    while True:
+        rows = db.session.execute(
+            db.select(Template.id, Template.upvotes, Template.downvotes, Template.views,
+                      Template.downloads, Template.created_at)
+            .where(db.or_(Template.score_updated_at.is_(None), Template.score_updated_at < cutoff))
+            .order_by(Template.score_updated_at.asc().nullsfirst())
+            .limit(batch_size)
+        ).all()
+
+        if not rows:
+            break
+
+        db.session.connection().execute(update_score, [
+            {'template_id': row.id, 'score': compute_template_score(*row[1:], now=now)}
+            for row in rows
+        ])
+        db.session.commit()
+        refreshed += len(rows)
+
+        if len(rows) < batch_size:
+            break
+
+    return refreshed
+
+def upsert_template_vote(user_id, template_id, vote_type):
+    """Insert or update a user's vote with a single INSERT ... ON CONFLICT statement"""
+    dialect = db.session.get_bind().dialect.name
+    values = {
+        'user_id': user_id,
+        'template_id': template_id,
+        'vote_type': vote_type,
+        'created_at': datetime.utcnow()
+    }
+
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        stmt = insert(TemplateVote).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'template_id'],
+            set_={'vote_type': stmt.excluded.vote_type}
+        )
+        db.session.execute(stmt)
+    else:
+        # Generic fallback for backends without ON CONFLICT support
+        vote = TemplateVote.query.filter_by(user_id=user_id, template_id=template_id).first()
+        if vote:
+            vote.vote_type = vote_type
+        else:
+            db.session.add(TemplateVote(**values))
+
+def apply_template_vote(user_id, template_id, vote_type):
+    """
+    Apply a vote using atomic SQL increments instead of read-modify-write.
+
+    The tally change is a single UPDATE (upvotes = upvotes + :delta), so
+    concurrent votes from different users never lose updates. The popularity
+    score is recomputed from the new counters in the same transaction, so the
+    ranking reflects the vote immediately.
+
+    Returns False if the template does not exist.
+    """
+    old_vote = db.session.query(TemplateVote.vote_type).filter_by(
+        user_id=user_id,
+        template_id=template_id
+    ).scalar()
+
+    if old_vote == vote_type:
+        # Same vote again: nothing to change
+        return db.session.query(Template.id).filter_by(id=template_id).scalar() is not None
+
+    upvotes_delta = (vote_type == 'upvote') - (old_vote == 'upvote')
+    downvotes_delta = (vote_type == 'downvote') - (old_vote == 'downvote')
+
+    try:
+        result = db.session.execute(
+            db.update(Template)
+            .where(Template.id == template_id)
+            .values(
+                upvotes=db.func.coalesce(Template.upvotes, 0) + upvotes_delta,
+                downvotes=db.func.coalesce(Template.downvotes, 0) + downvotes_delta,
+                # A vote is not an edit of the template
+                updated_at=Template.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.session.rollback()
+            return False
+
+        upsert_template_vote(user_id, template_id, vote_type)
+        update_template_score(template_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return True
+
+def recount_template_votes():
+    """
+    Periodic reconciliation: recompute tallies from template_votes.
+
+    Fixes any drift (e.g. duplicate concurrent votes from the same user)
+    with one UPDATE using correlated subqueries, then rescores the corrected
+    templates. Returns rows corrected.
+    """
+    upvotes = db.select(db.func.count(TemplateVote.id)).where(
+        TemplateVote.template_id == Template.id,
+        TemplateVote.vote_type == 'upvote'
+    ).scalar_subquery()
+    downvotes = db.select(db.func.count(TemplateVote.id)).where(
+        TemplateVote.template_id == Template.id,
+        TemplateVote.vote_type == 'downvote'
+    ).scalar_subquery()
+
+    result = db.session.execute(
+        db.update(Template)
+        .where(db.or_(
+            db.func.coalesce(Template.upvotes, 0) != upvotes,
+            db.func.coalesce(Template.downvotes, 0) != downvotes
+        ))
+        .values(upvotes=upvotes, downvotes=downvotes, score_updated_at=None, updated_at=Template.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    if result.rowcount:
+        refresh_template_scores()
+    return result.rowcount
+
+def _normalize_for_hash(value):
+    """Canonical form of JSON-like data: numpy scalars unwrapped, floats rounded"""
+    if isinstance(value, dict):
+        return {str(k): _normalize_for_hash(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_for_hash(v) for v in value]
+    # numpy values can only exist once numpy is loaded (it is imported lazily)
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(value, numpy.generic):
+        value = value.item()
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return round(value, 8)
+    return value
+
+def compute_content_hash(data):
+    """SHA-256 of the normalized JSON representation of data"""
+    canonical = json.dumps(_normalize_for_hash(data), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def get_or_create_simulation_result(results_data):
+    """Return the shared result blob for results_data, inserting it if new"""
+    from sqlalchemy.exc import IntegrityError
+
+    content_hash = compute_content_hash(results_data)
+    result = SimulationResult.query.filter_by(content_hash=content_hash).first()
+    if result:
+        return result
+
+    try:
+        with db.session.begin_nested():
+            result = SimulationResult(content_hash=content_hash, results_data=results_data)
+            db.session.add(result)
+    except IntegrityError:
+        # Another writer stored the same blob concurrently
+        result = SimulationResult.query.filter_by(content_hash=content_hash).one()
+    return result
+
+def save_autosaved_simulation(user_id, name, description, module_type, input_data, results_data):
+    """
+    Store an auto-saved simulation with content-hash deduplication.
+
+    If the user already has an auto-saved simulation of the same module with
+    identical (normalized) inputs, only its updated_at is bumped; manual
+    saves with the same inputs are left alone. Otherwise a new row
+    is added pointing to a result blob shared across users. Does not commit.
+    Returns (simulation, created).
+    """
+    input_hash = compute_content_hash(input_data)
+
+    existing = Simulation.query.options(
+        db.load_only(Simulation.id, Simulation.updated_at)
+    ).filter_by(
+        user_id=user_id,
+        module_type=module_type,
+        input_hash=input_hash,
+        is_autosave=True,
+        compacted_at=None
+    ).order_by(Simulation.updated_at.desc()).first()
+
+    if existing:
+        existing.updated_at = datetime.utcnow()
+        return existing, False
+
+    simulation = Simulation(
+        user_id=user_id,
+        name=name,
+        description=description,
+        module_type=module_type,
+        input_data=input_data,
+        input_hash=input_hash,
+        is_autosave=True,
+        shared_result=get_or_create_simulation_result(results_data)
+    )
+    db.session.add(simulation)
+    return simulation, True
+
+def get_simulation_performance(results_data):
+    """Extract the 'rentabilidad' of a simulation result, or None if absent"""
+    if not results_data or 'resumen' not in results_data:
+        return None
+    rentabilidad = results_data['resumen'].get('rentabilidad')
+    return float(rentabilidad) if rentabilidad is not None else None
+
+def record_simulation_performance(user_id, results_data, removed=False):
+    """Fold a saved (or removed) simulation into the user's average performance. Does not commit."""
+    rentabilidad = get_simulation_performance(results_data)
+    if rentabilidad is None:
+        return
+
+    if removed:
+        add_performance_samples(user_id, -rentabilidad, -1)
+    else:
+        add_performance_samples(user_id, rentabilidad, 1)
+
+def add_performance_samples(user_id, total, count):
+    """
+    Add count samples summing to total (negative to remove) to the user's average.
+
+    One UPDATE adds to the stored sum and count and derives the average from
+    them, so concurrent saves never lose a sample. Does not commit: call it in
+    the transaction that inserts or deletes the simulations.
+    """
+    if not count:
+        return
+
+    samples = db.func.coalesce(User.performance_samples, 0) + count
+    running_total = db.func.coalesce(User.performance_total, 0.0) + total
+    db.session.execute(
+        db.update(User)
+        .where(User.id == user_id)
+        .values(
+            performance_samples=db.case((samples > 0, samples), else_=0),
+            performance_total=db.case((samples > 0, running_total), else_=0.0),
+            avg_performance=db.case((samples > 0, running_total / samples), else_=0.0)
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def refresh_community_stats():
+    """Recompute the materialized community statistics row"""
+    total_users = db.session.query(db.func.count(User.id)).scalar() or 0
+    total_simulations = db.session.query(db.func.count(Simulation.id)).scalar() or 0
+    avg_performance = db.session.query(db.func.avg(User.avg_performance)).filter(
+        User.performance_samples > 0
+    ).scalar() or 0.0
+
+    stats = db.session.get(CommunityStats, CommunityStats.SINGLETON_ID)
+    if not stats:
+        stats = CommunityStats(id=CommunityStats.SINGLETON_ID)
+        db.session.add(stats)
+
+    stats.total_users = total_users
+    stats.total_simulations = total_simulations
+    stats.avg_simulations_per_user = total_simulations / total_users if total_users > 0 else 0
+    stats.avg_performance = float(avg_performance)
+    stats.refreshed_at = datetime.utcnow()
+    db.session.commit()
+    return stats
+
+def refresh_community_stats_if_stale():
+    """After-write hook: refresh community statistics when older than COMMUNITY_STATS_MAX_AGE"""
+    from flask import current_app
+
+    max_age = current_app.config.get('COMMUNITY_STATS_MAX_AGE', 300)
+    refreshed_at = db.session.query(CommunityStats.refreshed_at).filter_by(
+        id=CommunityStats.SINGLETON_ID
+    ).scalar()
+
+    if refreshed_at is None or (datetime.utcnow() - refreshed_at).total_seconds() > max_age:
+        refresh_community_stats()
+
+def get_community_stats():
+    """Primary-key read of the materialized community statistics"""
+    stats = db.session.get(CommunityStats, CommunityStats.SINGLETON_ID)
+    if not stats:
+        # First call on a fresh database: materialize once
+        stats = refresh_community_stats()
+    return stats
+
+def purge_inactive_anonymous_users(ttl_days, chunk_size=500, progress=None):
+    """
+    Delete anonymous users inactive for more than ttl_days, with their
+    simulations, shares, achievements and votes.
+
+    Users who created templates are kept so community content survives.
+    Works in chunks of chunk_size users, one transaction per chunk, and calls
+    progress(deleted_so_far) after each one. Returns the number deleted.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=ttl_days)
+    deleted = 0
+    votes_deleted = 0
+
+    while True:
+        user_ids = [row.id for row in db.session.query(User.id).filter(
+            db.or_(User.is_registered.is_(False), User.is_registered.is_(None)),
+            User.last_active < cutoff,
+            ~db.exists().where(Template.creator_id == User.id)
+        ).limit(chunk_size)]
+        if not user_ids:
+            break
+
+        simulation_ids = db.select(Simulation.id).where(Simulation.user_id.in_(user_ids))
+        SimulationShare.query.filter(db.or_(
+            SimulationShare.shared_by_user_id.in_(user_ids),
+            SimulationShare.simulation_id.in_(simulation_ids)
+        )).delete(synchronize_session=False)
+        votes_deleted += TemplateVote.query.filter(
+            TemplateVote.user_id.in_(user_ids)
+        ).delete(synchronize_session=False)
+        UserAchievement.query.filter(UserAchievement.user_id.in_(user_ids)).delete(synchronize_session=False)
+        Simulation.query.filter(Simulation.user_id.in_(user_ids)).delete(synchronize_session=False)
+        User.query.filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+        deleted += len(user_ids)
+        if progress:
+            progress(deleted)
+
+    # Tallies still count the removed votes until they are recounted
+    if votes_deleted:
+        recount_template_votes()
+
+    return deleted
+
+def compact_stale_simulations(max_age_days, chunk_size=500, progress=None):
+    """
+    Thin auto-saved simulations not updated for max_age_days down to their
+    summary ('resumen'), dropping the per-period table.
+
+    Favorites, public and shared simulations are left intact. Walks the
+    candidates by id in chunks, one transaction per chunk, and calls
+    progress(compacted_so_far) after each one. Returns the number compacted.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    compacted = 0
+    last_id = 0
+
+    while True:
+        simulations = Simulation.query.options(
+            db.load_only(Simulation.id, Simulation.results_data, Simulation.result_id),
+            db.selectinload(Simulation.shared_result)
+        ).filter(
+            Simulation.is_autosave.is_(True),
+            Simulation.compacted_at.is_(None),
+            Simulation.is_favorite.isnot(True),
+            Simulation.is_public.isnot(True),
+            Simulation.updated_at < cutoff,
+            Simulation.id > last_id,
+            ~db.exists().where(SimulationShare.simulation_id == Simulation.id)
+        ).order_by(Simulation.id).limit(chunk_size).all()
+        if not simulations:
+            break
+
+        now = datetime.utcnow()
+        for simulation in simulations:
+            results = simulation.results or {}
+            # Setting updated_at explicitly keeps onupdate from making the row look fresh
+            db.session.query(Simulation).filter_by(id=simulation.id).update({
+                'results_data': {'resumen': results.get('resumen')},
+                'result_id': None,
+                'compacted_at': now,
+                'updated_at': Simulation.updated_at
+            }, synchronize_session=False)
+        db.session.commit()
+
+        last_id = simulations[-1].id
+        compacted += len(simulations)
+        if progress:
+            progress(compacted)
+
+    return compacted
+
+def purge_orphan_simulation_results(chunk_size=500):
+    """Delete shared result blobs no simulation points to. Returns the number deleted."""
+    deleted = 0
+    while True:
+        result_ids = [row.id for row in db.session.query(SimulationResult.id).filter(
+            ~db.exists().where(Simulation.result_id == SimulationResult.id)
+        ).limit(chunk_size)]
+        if not result_ids:
+            break
+
+        SimulationResult.query.filter(SimulationResult.id.in_(result_ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(result_ids)
+
+    return deleted
+
+def check_achievements(user_id, notify_later=False):
+    """
+    Check and award achievements for user; returns the awarded definitions as dicts.
+
+    Callers that show the returned achievements to the user right away mark
+    them notified; with notify_later they are left for pop_unnotified_achievements.
+    """
     user = User.query.get(user_id)
     if not user:
         return []
 
     awarded_achievements = []
 
-    # Get all active achievements
-    achievements = Achievement.query.filter_by(is_active=True).all()
-
-    for achievement in achievements:
-        # Check if user already has this achievement
-        user_achievement = UserAchievement.query.filter_by(
-            user_id=user_id,
-            achievement_id=achievement.id
-        ).first()
+    # Definitions come from the in-process cache; progress from one query
+    progress_by_achievement = {
+        ua.achievement_id: ua for ua in UserAchievement.query.filter_by(user_id=user_id)
+    }
+    simulations_created = None
 
+    for achievement in get_active_achievements():
+        user_achievement = progress_by_achievement.get(achievement['id'])
         if not user_achievement:
             user_achievement = UserAchievement(
                 user_id=user_id,
-                achievement_id=achievement.id
+                achievement_id=achievement['id']
             )
             db.session.add(user_achievement)
+            progress_by_achievement[achievement['id']] = user_achievement
 
         # Calculate current value based on criteria target
         current_value = 0
-        if achievement.criteria_target == 'simulations_created':
-            current_value = Simulation.query.filter_by(user_id=user_id).count()
-        elif achievement.criteria_target == 'social_comparison_viewed':
+        if achievement['criteria_target'] == 'simulations_created':
+            if simulations_created is None:
+                simulations_created = Simulation.query.filter_by(user_id=user_id).count()
+            current_value = simulations_created
+        elif achievement['criteria_target'] == 'social_comparison_viewed':
             # This would be tracked separately, for now just check if user exists
             current_value = 1 if user_id else 0
-        elif achievement.criteria_target == 'achievements_earned':
-            current_value = UserAchievement.query.filter_by(user_id=user_id, is_completed=True).count()
+        elif achievement['criteria_target'] == 'achievements_earned':
+            # Includes the ones completed earlier in this loop
+            current_value = sum(1 for ua in progress_by_achievement.values() if ua.is_completed)
 
         # Update progress
         user_achievement.current_value = current_value
 
         # Check if achievement is completed
-        if not user_achievement.is_completed and current_value >= achievement.criteria_value:
+        if not user_achievement.is_completed and current_value >= achievement['criteria_value']:
             user_achievement.is_completed = True
             user_achievement.completed_at = datetime.utcnow()
+            user_achievement.notified_at = None if notify_later else user_achievement.completed_at
             awarded_achievements.append(achievement)
 
     db.session.commit()
     return awarded_achievements
 
+def pop_unnotified_achievements(user_id):
+    """
+    Completed achievements not yet reported to the user, as dicts; marks them
+    notified (commits). Claimed with one UPDATE so concurrent requests, on any
+    worker, never report the same achievement twice.
+    """
+    now = datetime.utcnow()
+    claimed = db.session.execute(db.update(UserAchievement).where(
+        UserAchievement.user_id == user_id,
+        UserAchievement.is_completed.is_(True),
+        UserAchievement.notified_at.is_(None)
+    ).values(
+        notified_at=now,
+        updated_at=UserAchievement.updated_at
+    ).execution_options(synchronize_session=False))
+    db.session.commit()
+    if not claimed.rowcount:
+        return []
+
+    achievements = Achievement.query.join(
+        UserAchievement, UserAchievement.achievement_id == Achievement.id
+    ).filter(
+        UserAchievement.user_id == user_id,
+        UserAchievement.notified_at == now
+    ).order_by(Achievement.id)
+    return [achievement.to_dict() for achievement in achievements]
+
+@timed('calcular_cartera')
 def calcular_cartera(datos):
     """
     Calculate portfolio growth (Módulo A)
@@ -368,6 +1021,8 @@ def calcular_cartera(datos):
     Returns:
         Dictionary with calculation results
     """
+    import pandas as pd
+
     # Extract data
     edad_actual = datos['edad_actual']
     monto_inicial = datos['monto_inicial']
@@ -467,6 +1122,7 @@ def calcular_cartera(datos):
         }
     }
 
+@timed('calcular_jubilacion')
 def calcular_jubilacion(datos):
     """
     Calculate retirement projection (Módulo B)
@@ -586,6 +1242,7 @@ def calcular_jubilacion(datos):
         'mensaje': 'Cálculo de jubilación completado exitosamente'
     }
 
+@timed('calcular_bonos')
 def calcular_bonos(datos):
     """
     Calculate bond valuation (Módulo C)
@@ -596,6 +1253,8 @@ def calcular_bonos(datos):
     Returns:
         Dictionary with calculation results
     """
+    import pandas as pd
+
     # Extract data
     valor_nominal = datos['valor_nominal']
     tasa_cupon = datos['tasa_cupon'] / 100  # Convert to decimal
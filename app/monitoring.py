@@ -0,0 +1,306 @@
+"""
+Operational instrumentation: database pool telemetry, SQLite tuning and
+request/SQL/calculation metrics exposed in Prometheus text format
+"""
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import Blueprint, Response, abort, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+monitoring = Blueprint('monitoring', __name__)
+
+class PoolTelemetry:
+    """Thread-safe counters for connection checkout wait time and pool usage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.peak_checked_out = 0
+
+    def record_checkout(self, wait_seconds, checked_out):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait_seconds
+            self.wait_max = max(self.wait_max, wait_seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool=None):
+        """Current counters plus live pool state (size, overflow, saturation)"""
+        with self._lock:
+            data = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.wait_total,
+                'wait_seconds_avg': self.wait_total / self.checkouts if self.checkouts else 0.0,
+                'wait_seconds_max': self.wait_max,
+                'peak_checked_out': self.peak_checked_out
+            }
+
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            data.update({
+                'pool_size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'saturation': pool.checkedout() / capacity if capacity > 0 else 0.0
+            })
+        elif pool is not None:
+            data.update({'pool_class': type(pool).__name__, 'status': pool.status()})
+
+        return data
+
+pool_telemetry = PoolTelemetry()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_telemetry.record_timeout()
+            raise
+        pool_telemetry.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+def apply_pool_telemetry(app):
+    """Swap in the instrumented pool class before the engine is created"""
+    if not app.config.get('DB_POOL_TELEMETRY'):
+        return
+
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    # Only QueuePool-backed engines (not in-memory SQLite) can be instrumented
+    if 'pool_size' in options:
+        options['poolclass'] = InstrumentedQueuePool
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def configure_sqlite(app, db):
+    """Enable WAL and busy_timeout on every new SQLite connection"""
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return
+
+    busy_timeout = app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    use_wal = app.config.get('SQLITE_WAL', True)
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout)}')
+        if use_wal:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', set_sqlite_pragmas)
+
+# Latency buckets (seconds) shared by the request and calculation histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms rendered in Prometheus text format.
+
+    Values live in the worker process: with several gunicorn workers each
+    scrape of /metrics reports the worker that served it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _metric(self, name, kind, help_text, buckets=None):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = {'kind': kind, 'help': help_text, 'buckets': buckets, 'series': {}}
+            self._metrics[name] = metric
+        return metric
+
+    def inc(self, name, help_text, labels=(), amount=1):
+        """Add `amount` to a counter"""
+        with self._lock:
+            series = self._metric(name, 'counter', help_text)['series']
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name, help_text, value, labels=(), buckets=LATENCY_BUCKETS):
+        """Record one observation in a histogram"""
+        with self._lock:
+            metric = self._metric(name, 'histogram', help_text, buckets)
+            state = metric['series'].get(labels)
+            if state is None:
+                state = metric['series'][labels] = {'buckets': [0] * len(metric['buckets']), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(metric['buckets']):
+                if value <= bound:
+                    state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def render(self):
+        """All metrics in Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._metrics):
+                metric = self._metrics[name]
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['kind']}")
+                for labels, value in sorted(metric['series'].items()):
+                    if metric['kind'] == 'counter':
+                        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                        continue
+                    for bound, count in zip(metric['buckets'], value['buckets']):
+                        lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {value['count']}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+
+def _endpoint_label():
+    """Endpoint name of the current request ('background' outside requests)"""
+    if not has_request_context():
+        return 'background'
+    return request.endpoint or 'unmatched'
+
+@contextmanager
+def timed(phase):
+    """Time a calculation phase (context manager or decorator)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(
+            'calculation_duration_seconds', 'Time spent in calculation and report phases',
+            time.perf_counter() - start, (('phase', phase),)
+        )
+
+def init_request_metrics(app, db):
+    """Time every request and count the SQL statements it runs"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_seconds = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        labels = (('endpoint', _endpoint_label()), ('method', request.method))
+        metrics.observe(
+            'http_request_duration_seconds', 'Request latency by endpoint',
+            time.perf_counter() - start, labels
+        )
+        metrics.inc('http_requests_total', 'Requests by endpoint and status',
+                    labels + (('status', str(response.status_code)),))
+        metrics.observe(
+            'http_request_sql_statements', 'SQL statements run per request',
+            g.get('sql_statements', 0), labels[:1], buckets=SQL_COUNT_BUCKETS
+        )
+        return response
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        labels = (('endpoint', _endpoint_label()),)
+        metrics.inc('sql_statements_total', 'SQL statements executed', labels)
+        metrics.inc('sql_duration_seconds_total', 'Time spent executing SQL statements', labels, elapsed)
+        if has_request_context() and 'sql_statements' in g:
+            g.sql_statements += 1
+            g.sql_seconds += elapsed
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
+
+def internal_only(view):
+    """Serve the view only to callers presenting INTERNAL_METRICS_TOKEN (404 when unset)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get('INTERNAL_METRICS_TOKEN')
+        if not expected:
+            abort(404)
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer':
+            token = request.headers.get('X-Internal-Token', '')
+        if not hmac.compare_digest(token.strip().encode(), expected.encode()):
+            abort(403)
+        return view(*args, **kwargs)
+    return wrapper
+
+@monitoring.route('/internal/db-pool')
+@internal_only
+def db_pool_stats():
+    """Connection pool telemetry: checkout wait time and saturation"""
+    from .models import db
+    return jsonify(pool_telemetry.snapshot(db.engine.pool))
+
+@monitoring.route('/healthz')
+def healthz():
+    """Liveness probe: answers from the worker without touching the database or the session"""
+    return jsonify({'status': 'ok'})
+
+@monitoring.route('/metrics')
+@internal_only
+def prometheus_metrics():
+    """Request, SQL, calculation and pool metrics in Prometheus text format (bearer token)"""
+    from .models import db
+
+    body = metrics.render()
+    pool = pool_telemetry.snapshot(db.engine.pool)
+    gauges = [
+        ('db_pool_checkouts_total', 'counter', 'Connection checkouts', pool['checkouts']),
+        ('db_pool_timeouts_total', 'counter', 'Connection checkouts that timed out', pool['timeouts']),
+        ('db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a connection', pool['wait_seconds_total']),
+    ]
+    if 'checked_out' in pool:
+        gauges.append(('db_pool_checked_out', 'gauge', 'Connections currently checked out', pool['checked_out']))
+        gauges.append(('db_pool_saturation', 'gauge', 'Checked-out share of the pool capacity', pool['saturation']))
+    for name, kind, help_text, value in gauges:
+        body += f'# HELP {name} {help_text}\n# TYPE {name} {kind}\n{name} {_format_value(value)}\n'
+    return Response(body, mimetype='text/plain; version=0.0.4')
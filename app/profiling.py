@@ -0,0 +1,170 @@
+"""
+On-demand profiling of single requests
+
+A request is profiled when PROFILING_ENABLED is set (optionally limited to
+PROFILE_ENDPOINTS) or when it carries a valid X-Profile-Token header signed
+with PROFILE_SECRET (see `flask profile-token`). The view runs under cProfile
+while a sampler thread records its stack every few milliseconds; each
+profiled request leaves two files in PROFILE_DIR:
+
+    <name>.prof       cProfile stats (python -m pstats, snakeviz)
+    <name>.collapsed  folded stacks (flamegraph.pl, speedscope)
+
+Only the newest PROFILE_KEEP requests are kept. With profiling disabled and
+no secret configured the hooks are not even registered.
+"""
+import cProfile
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from flask import current_app, g, request
+
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+def sign_profile_token(secret, ttl=300, now=None):
+    """Token '<expires>.<hmac>' accepted in the X-Profile-Token header until it expires"""
+    expires = int((now or time.time()) + ttl)
+    signature = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f'{expires}.{signature}'
+
+def verify_profile_token(secret, token, now=None):
+    """True when the token was signed with `secret` and has not expired"""
+    expires, _, signature = (token or '').partition('.')
+    if not expires.isdigit() or int(expires) < (now or time.time()):
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval into folded-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+class RequestProfiler:
+    """cProfile plus stack sampling around the current thread"""
+
+    def __init__(self, sample_interval):
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident(), sample_interval)
+        self.started = None
+
+    def start(self):
+        # enable() raises ValueError while another profiler is active; only
+        # start the sampler thread once it succeeded so nothing is left running
+        self.profile.enable()
+        self.started = time.perf_counter()
+        self.sampler.start()
+
+    def stop(self):
+        self.profile.disable()
+        self.sampler.stop()
+        return time.perf_counter() - self.started
+
+    def write(self, directory, name):
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, name)
+        self.profile.dump_stats(base + '.prof')
+        with open(base + '.collapsed', 'w') as collapsed:
+            collapsed.write(self.sampler.collapsed())
+
+def rotate_profiles(directory, keep):
+    """Delete all but the newest `keep` profiled requests (.prof + .collapsed pairs)"""
+    try:
+        names = [name[:-len('.prof')] for name in os.listdir(directory) if name.endswith('.prof')]
+    except FileNotFoundError:
+        return 0
+    names.sort(key=lambda name: os.path.getmtime(os.path.join(directory, name + '.prof')), reverse=True)
+    removed = 0
+    for name in names[keep:]:
+        for extension in ('.prof', '.collapsed'):
+            try:
+                os.remove(os.path.join(directory, name + extension))
+            except FileNotFoundError:
+                pass
+        removed += 1
+    return removed
+
+def _should_profile(config):
+    secret = config.get('PROFILE_SECRET')
+    if secret and PROFILE_HEADER in request.headers:
+        return verify_profile_token(secret, request.headers[PROFILE_HEADER])
+    if not config.get('PROFILING_ENABLED'):
+        return False
+    endpoints = config.get('PROFILE_ENDPOINTS')
+    return not endpoints or request.endpoint in endpoints
+
+def init_profiling(app):
+    """Register the profiling hooks when profiling is enabled or a signing secret is set"""
+    if not (app.config.get('PROFILING_ENABLED') or app.config.get('PROFILE_SECRET')):
+        return
+
+    @app.before_request
+    def start_profiler():
+        if not _should_profile(current_app.config):
+            return
+        profiler = RequestProfiler(current_app.config.get('PROFILE_SAMPLE_INTERVAL_MS', 5) / 1000)
+        try:
+            profiler.start()
+        except ValueError:
+            # Another thread of this worker is being profiled (one profiler per process on 3.12+)
+            return
+        g.request_profiler = profiler
+
+    @app.after_request
+    def write_profile(response):
+        profiler = g.pop('request_profiler', None)
+        if profiler is None:
+            return response
+        elapsed = profiler.stop()
+
+        config = current_app.config
+        name = '{}_{}_{}_{}ms'.format(
+            time.strftime('%Y%m%d-%H%M%S'), (request.endpoint or 'unmatched').replace('.', '-'),
+            os.getpid(), int(elapsed * 1000)
+        )
+        try:
+            profiler.write(config['PROFILE_DIR'], name)
+            rotate_profiles(config['PROFILE_DIR'], config.get('PROFILE_KEEP', 50))
+            response.headers[PROFILE_ID_HEADER] = name
+        except OSError:
+            current_app.logger.exception('Could not write request profile %s', name)
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exception=None):
+        # Views that raised skip after_request; never leave a profiler running
+        profiler = g.pop('request_profiler', None)
+        if profiler is not None:
+            profiler.stop()
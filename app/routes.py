@@ -1,30 +1,58 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, session, jsonify, send_file, g
+from flask import (
+    Blueprint, render_template, request, flash, redirect, url_for, session, jsonify, send_file, g,
+    Response, stream_with_context, current_app
+)
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from .forms import CarteraForm, JubilacionForm, BonosForm
 from .models import (
-    db, User, Simulation, Template, Achievement, UserAchievement,
+    db, User, Simulation, Template, TemplateVote, Achievement, UserAchievement,
     calcular_cartera, calcular_jubilacion, calcular_bonos,
-    get_or_create_user, update_user_stats, check_achievements
-)
-from utils.pdf_generator import generar_pdf_cartera, generar_pdf_bono, generar_pdf_jubilacion, generar_pdf_comparacion
-from utils.manual_usuario import crear_manual_usuario
-from utils.calculos_financieros import (
-    simular_cartera_con_inflacion,
-    comparar_estrategias_inversion,
-    calcular_benchmarking,
-    simular_rebalanceo_automatico
+    get_or_create_user, update_user_stats, check_achievements,
+    record_simulation_performance, get_community_stats, apply_template_vote,
+    get_active_achievements, compute_content_hash, pop_unnotified_achievements
 )
+# pandas/numpy, ReportLab and the PDF/chart helpers are imported inside the
+# views that use them, so workers boot without loading them
 from utils.validaciones import validar_datos_cartera
+from .autosave import save_simulation_async
+from .monitoring import timed
+from .transfer import iter_simulations_ndjson, import_simulations_ndjson
+from sqlalchemy.orm import load_only
 from datetime import datetime
-import numpy as np
 import uuid
+import os
 
 main = Blueprint('main', __name__)
 
+# Page sizes for the simulations listing API
+SIMULATIONS_PAGE_SIZE = 20
+SIMULATIONS_MAX_PAGE_SIZE = 100
+
+# Upper bound for the points requested from the chart series API
+CHART_SERIES_MAX_POINTS = 5000
+
+# Page sizes for the template catalog API
+TEMPLATES_PAGE_SIZE = 24
+TEMPLATES_MAX_PAGE_SIZE = 100
+
 def is_ajax_request():
     """Check if the request is an AJAX request"""
     return request.headers.get('X-Requested-With') == 'XMLHttpRequest' or request.is_json
 
+def chart_max_points():
+    """Points per chart series sent to the browser"""
+    from utils.chart_series import DEFAULT_MAX_POINTS
+    return current_app.config.get('CHART_MAX_POINTS', DEFAULT_MAX_POINTS)
+
+def encode_simulation_cursor(simulation):
+    """Build an opaque keyset cursor from the last simulation of a page"""
+    return f"{simulation.updated_at.isoformat()}_{simulation.id}"
+
+def decode_simulation_cursor(cursor):
+    """Parse a keyset cursor into (updated_at, id); raises ValueError if malformed"""
+    updated_at, simulation_id = cursor.rsplit('_', 1)
+    return datetime.fromisoformat(updated_at), int(simulation_id)
+
 def generate_cartera_table_html(dataframe):
     """Generate properly formatted HTML table for cartera results"""
     html = '''
@@ -237,6 +265,7 @@ def index():
 @main.route('/cartera', methods=['GET', 'POST'])
 def cartera():
     """Módulo A: Crecimiento de Cartera"""
+    from utils.chart_series import portfolio_series
     # Pre-fill form with session data if available (for editing from other modules)
     session_data = session.get('cartera_datos', {})
     form = CarteraForm(data=session_data) if session_data else CarteraForm()
@@ -283,30 +312,25 @@ def cartera():
                 session['cartera_resumen'] = resultado['resumen']
                 session['cartera_datos'] = datos
 
-                # Auto-save simulation to database
+                # Auto-save simulation through the background writer; achievements
+                # it awards are stored unnotified and reported on the user's next request
+                awarded_achievements = pop_unnotified_achievements(g.user.id)
                 try:
-                    simulation_name = f"Simulación Cartera - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-                    simulation = Simulation(
-                        user_id=g.user.id,
-                        name=simulation_name,
-                        description="Cálculo automático de crecimiento de cartera",
-                        module_type='cartera',
-                        input_data=datos,
-                        results_data={
+                    awarded_achievements += save_simulation_async({
+                        'user_id': g.user.id,
+                        'name': f"Simulación Cartera - {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+                        'description': "Cálculo automático de crecimiento de cartera",
+                        'module_type': 'cartera',
+                        'input_data': datos,
+                        'results_data': {
                             'resumen': resultado['resumen'],
-                            'dataframe': resultado['dataframe'].to_dict('records')
+                            'dataframe': resultado['dataframe']
                         }
-                    )
-                    db.session.add(simulation)
-                    db.session.commit()
-
-                    # Update user stats and check achievements
-                    update_user_stats(g.user.id)
-                    awarded_achievements = check_achievements(g.user.id)
+                    })
                 except Exception as db_error:
                     # Don't fail the calculation if database save fails
+                    db.session.rollback()
                     print(f"Database save error: {db_error}")
-                    awarded_achievements = []
 
                 # Return JSON for AJAX requests
                 if is_ajax_request():
@@ -320,11 +344,14 @@ def cartera():
                             'resumen': resultado['resumen'],
                             'dataframe_html': table_html,
                             'summary_html': summary_html,
+                            'grafica': portfolio_series(
+                                resultado['dataframe'], datos['frecuencia'], chart_max_points()
+                            ),
                             'tea_equivalente': resultado['resumen'].get('tea_equivalente', 0),
                             'tea_ingresada': resultado['resumen'].get('tea_ingresada', 0),
                             'frecuencia': resultado['resumen'].get('frecuencia', 'N/A')
                         },
-                        'awarded_achievements': [a.to_dict() for a in awarded_achievements] if awarded_achievements else []
+                        'awarded_achievements': awarded_achievements
                     })
             except Exception as e:
                 error_msg = f'Error en el cálculo: {str(e)}'
@@ -338,7 +365,10 @@ def cartera():
                 return jsonify({'success': False, 'errors': errors})
 
     # Return HTML for regular requests
-    return render_template('cartera.html', form=form, resultado=resultado, errors=errors)
+    grafica = None
+    if resultado:
+        grafica = portfolio_series(resultado['dataframe'], resultado['resumen']['frecuencia'], chart_max_points())
+    return render_template('cartera.html', form=form, resultado=resultado, errors=errors, grafica=grafica)
 
 @main.route('/jubilacion', methods=['GET', 'POST'])
 def jubilacion():
@@ -515,6 +545,7 @@ def jubilacion_preview():
 @main.route('/bonos', methods=['GET', 'POST'])
 def bonos():
     """Módulo C: Valoración de Bonos"""
+    from utils.chart_series import bond_series
     form = BonosForm()
     resultado = None
     errors = []
@@ -535,7 +566,8 @@ def bonos():
                 # Store results in session for PDF download (convert DataFrame to dict)
                 session['bonos_resultado'] = {
                     'dataframe': resultado['dataframe'].to_dict('records'),
-                    'resumen': resultado['resumen']
+                    'resumen': resultado['resumen'],
+                    'frecuencia_pago': datos['frecuencia_pago']
                 }
 
                 # Return JSON for AJAX requests
@@ -546,7 +578,9 @@ def bonos():
                         'success': True,
                         'resultado': {
                             'resumen': resultado['resumen'],
-                            'dataframe': resultado['dataframe'].to_dict('records'),
+                            'grafica': bond_series(
+                                resultado['dataframe'], datos['frecuencia_pago'], chart_max_points()
+                            ),
                             'dataframe_html': table_rows_html
                         }
                     })
@@ -569,9 +603,45 @@ def resultado():
     """Mostrar resultados detallados"""
     return render_template('resultado.html')
 
+@main.route('/api/grafica/<modulo>')
+def chart_series(modulo):
+    """Chart series of the last portfolio or bond calculation (?puntos=N&metodo=auto|lttb|anual|completo)"""
+    from utils.chart_series import portfolio_series, bond_series, METHODS
+    try:
+        max_points = min(request.args.get('puntos', chart_max_points(), type=int), CHART_SERIES_MAX_POINTS)
+        metodo = request.args.get('metodo', 'auto')
+        if max_points < 3:
+            return jsonify({'success': False, 'error': 'puntos debe ser al menos 3'})
+        if metodo not in METHODS:
+            return jsonify({'success': False, 'error': f'metodo debe ser uno de: {", ".join(METHODS)}'})
+
+        if modulo == 'cartera':
+            if 'cartera_datos' not in session:
+                return jsonify({'success': False, 'error': 'Debes completar primero el Módulo A (Crecimiento de Cartera)'})
+            datos = session['cartera_datos']
+            resultado = calcular_cartera(datos)
+            grafica = portfolio_series(resultado['dataframe'], datos.get('frecuencia'), max_points, metodo)
+        elif modulo == 'bonos':
+            if 'bonos_resultado' not in session:
+                return jsonify({'success': False, 'error': 'Debes completar primero el Módulo C (Valoración de Bonos)'})
+            import pandas as pd
+            session_data = session['bonos_resultado']
+            grafica = bond_series(
+                pd.DataFrame(session_data['dataframe']), session_data.get('frecuencia_pago'), max_points, metodo
+            )
+        else:
+            return jsonify({'success': False, 'error': 'Módulo no válido'})
+
+        return jsonify({'success': True, 'grafica': grafica})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @main.route('/descargar-pdf/<modulo>')
 def descargar_pdf(modulo):
     """Download PDF report for the specified module"""
+    from utils.pdf_generator import (
+        generar_pdf_cartera, generar_pdf_bono, generar_pdf_jubilacion, generar_pdf_completo
+    )
     try:
         if modulo == 'cartera':
             # Check if portfolio data exists in session
@@ -597,7 +667,11 @@ def descargar_pdf(modulo):
             })
 
             # Generate PDF with complete data
-            pdf_buffer = generar_pdf_cartera(resultado['dataframe'], resumen_completo)
+            with timed('pdf_cartera'):
+                pdf_buffer = generar_pdf_cartera(
+                    resultado['dataframe'], resumen_completo,
+                    appendix=request.args.get('detalle') == 'anexo'
+                )
             pdf_buffer.seek(0)
 
             return send_file(
@@ -622,7 +696,11 @@ def descargar_pdf(modulo):
             }
 
             # Generate PDF
-            pdf_buffer = generar_pdf_bono(resultado['dataframe'], resultado['resumen'])
+            with timed('pdf_bonos'):
+                pdf_buffer = generar_pdf_bono(
+                    resultado['dataframe'], resultado['resumen'],
+                    appendix=request.args.get('detalle') == 'anexo'
+                )
             pdf_buffer.seek(0)
 
             return send_file(
@@ -642,7 +720,8 @@ def descargar_pdf(modulo):
             resultado = session['jubilacion_resultado']
 
             # Generate PDF
-            pdf_buffer = generar_pdf_jubilacion(resultado)
+            with timed('pdf_jubilacion'):
+                pdf_buffer = generar_pdf_jubilacion(resultado)
             pdf_buffer.seek(0)
 
             return send_file(
@@ -652,6 +731,64 @@ def descargar_pdf(modulo):
                 mimetype='application/pdf'
             )
 
+        elif modulo == 'completo':
+            if 'cartera_datos' not in session:
+                flash('Debes completar primero el Módulo A (Crecimiento de Cartera)', 'error')
+                return redirect(url_for('main.cartera'))
+
+            # Same inputs as the individual reports, for every module completed so far
+            datos = session['cartera_datos']
+            resultado = calcular_cartera(datos)
+            resumen_completo = dict(resultado['resumen'], **{
+                clave: datos.get(clave) for clave in (
+                    'edad_actual', 'monto_inicial', 'aporte_periodico', 'frecuencia',
+                    'tipo_plazo', 'años', 'edad_retiro', 'tea'
+                )
+            })
+            cartera_data = {'dataframe': resultado['dataframe'], 'resumen': resumen_completo}
+
+            bono_data = None
+            if 'bonos_resultado' in session:
+                import pandas as pd
+                bono_data = {
+                    'dataframe': pd.DataFrame(session['bonos_resultado']['dataframe']),
+                    'resumen': session['bonos_resultado']['resumen']
+                }
+
+            # The session only keeps the comparison settings; the tables are recomputed
+            comparacion_data = None
+            if 'comparacion_config' in session:
+                configuracion = session['comparacion_config']
+                comparacion_data = calcular_comparacion(
+                    datos, configuracion['estrategias_seleccionadas'],
+                    configuracion['frecuencia_rebalanceo'], configuracion['estrategia_personalizada']
+                )
+
+            # Written to a temporary file and streamed from disk
+            with timed('pdf_completo'):
+                pdf_path = generar_pdf_completo(
+                    cartera_data=cartera_data,
+                    jubilacion_data=session.get('jubilacion_resultado'),
+                    bono_data=bono_data,
+                    comparacion_data=comparacion_data,
+                    appendix=request.args.get('detalle', 'anexo') == 'anexo'
+                )
+            # The open handle keeps the file readable, so its name can go right away.
+            # send_file responses are passed straight to the server (call_on_close
+            # never runs for them); the server closes the handle once it is sent.
+            pdf_file = open(pdf_path, 'rb')
+            try:
+                os.remove(pdf_path)
+                return send_file(
+                    pdf_file,
+                    as_attachment=True,
+                    download_name=f'reporte_completo_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf',
+                    mimetype='application/pdf'
+                )
+            except Exception:
+                pdf_file.close()
+                raise
+
         else:
             flash('Módulo no válido', 'error')
             return redirect(url_for('main.index'))
@@ -756,6 +893,7 @@ def calcular_escenario():
 @main.route('/api/analisis-riesgo', methods=['POST'])
 def analisis_riesgo():
     """API endpoint for risk analysis with multiple scenarios"""
+    import numpy as np
     try:
         # Get base portfolio data from session
         base_datos = session.get('cartera_datos', {})
@@ -815,16 +953,20 @@ def analisis_riesgo():
 
 @main.route('/descargar-manual')
 def descargar_manual():
-    """Download user manual PDF"""
+    """Download user manual PDF (prebuilt; conditional and range requests supported)"""
+    from utils.manual_usuario import obtener_manual_usuario
     try:
-        # Generate the manual PDF
-        manual_path = crear_manual_usuario()
+        # Only builds when the manual's source or images changed
+        manual_path, fingerprint = obtener_manual_usuario()
 
         return send_file(
             manual_path,
             as_attachment=True,
             download_name='manual_usuario_simulador_financiero.pdf',
-            mimetype='application/pdf'
+            mimetype='application/pdf',
+            etag=fingerprint,
+            conditional=True,
+            max_age=3600
         )
 
     except Exception as e:
@@ -834,6 +976,7 @@ def descargar_manual():
 @main.route('/api/calcular-inflacion', methods=['POST'])
 def calcular_inflacion():
     """API endpoint for inflation-adjusted calculations"""
+    from utils.calculos_financieros import simular_cartera_con_inflacion
     try:
         data = request.get_json()
 
@@ -852,16 +995,17 @@ def calcular_inflacion():
         reajuste_jubilacion = data.get('reajuste_jubilacion', False)
 
         # Calculate with inflation adjustments
-        df_inflacion, resumen_inflacion = simular_cartera_con_inflacion(
-            monto_inicial=base_datos['monto_inicial'],
-            aporte_inicial=base_datos['aporte_periodico'],
-            tea=base_datos['tea'],
-            frecuencia=base_datos['frecuencia'],
-            años=base_datos.get('años', 25),
-            tasa_inflacion=tasa_inflacion,
-            escalado_aportes=escalado_aportes,
-            reajuste_jubilacion=reajuste_jubilacion
-        )
+        with timed('simular_cartera_con_inflacion'):
+            df_inflacion, resumen_inflacion = simular_cartera_con_inflacion(
+                monto_inicial=base_datos['monto_inicial'],
+                aporte_inicial=base_datos['aporte_periodico'],
+                tea=base_datos['tea'],
+                frecuencia=base_datos['frecuencia'],
+                años=base_datos.get('años', 25),
+                tasa_inflacion=tasa_inflacion,
+                escalado_aportes=escalado_aportes,
+                reajuste_jubilacion=reajuste_jubilacion
+            )
 
         return jsonify({
             'success': True,
@@ -872,120 +1016,102 @@ def calcular_inflacion():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-@main.route('/api/comparar-estrategias', methods=['POST'])
-def comparar_estrategias():
-    """API endpoint for strategy comparison"""
-    try:
-        data = request.get_json()
-
-        # Get base portfolio data from session
-        base_datos = session.get('cartera_datos', {})
-        if not base_datos:
-            return jsonify({'success': False, 'error': 'Datos base no encontrados. Complete el Módulo A primero.'})
-
-        estrategias_seleccionadas = data.get('estrategias', [])
-        estrategia_personalizada = data.get('estrategia_personalizada')
-        rebalanceo = data.get('rebalanceo', 'none')
-
-        print(f"Debug: estrategias_seleccionadas = {estrategias_seleccionadas}")
-        print(f"Debug: estrategia_personalizada = {estrategia_personalizada}")
-        print(f"Debug: rebalanceo = {rebalanceo}")
-        print(f"Debug: base_datos = {base_datos}")
-
-        # Validate input data
-        if not estrategias_seleccionadas:
-            return jsonify({'success': False, 'error': 'Debes seleccionar al menos una estrategia para comparar'})
+def calcular_comparacion(base_datos, estrategias_seleccionadas, rebalanceo='none', estrategia_personalizada=None):
+    """
+    Strategy comparison, benchmarks and risk analysis for the Module A inputs.
+
+    The combined report recomputes it from the configuration kept in the
+    session, so the tables never have to travel in the session cookie.
+    Raises ValueError when no strategy can be prepared.
+    """
+    from utils.calculos_financieros import (
+        comparar_estrategias_inversion, calcular_benchmarking, simular_rebalanceo_automatico
+    )
+    import numpy as np
+
+    # Define strategy configurations
+    estrategias_config = {
+        'conservative': [
+            {'nombre': 'Bonos', 'peso': 0.7, 'tea': 0.04},
+            {'nombre': 'Acciones', 'peso': 0.3, 'tea': 0.08}
+        ],
+        'moderate': [
+            {'nombre': 'Bonos', 'peso': 0.5, 'tea': 0.04},
+            {'nombre': 'Acciones', 'peso': 0.5, 'tea': 0.08}
+        ],
+        'aggressive': [
+            {'nombre': 'Bonos', 'peso': 0.2, 'tea': 0.04},
+            {'nombre': 'Acciones', 'peso': 0.8, 'tea': 0.08}
+        ],
+        'balanced': [
+            {'nombre': 'Bonos', 'peso': 0.4, 'tea': 0.04},
+            {'nombre': 'Acciones', 'peso': 0.4, 'tea': 0.08},
+            {'nombre': 'Oro', 'peso': 0.2, 'tea': 0.03}
+        ],
+        'tech': [
+            {'nombre': 'Tech Stocks', 'peso': 0.7, 'tea': 0.12},
+            {'nombre': 'Bonos', 'peso': 0.3, 'tea': 0.04}
+        ]
+    }
+
+    # Prepare strategies for comparison
+    estrategias_comparar = []
+
+    for estrategia in estrategias_seleccionadas:
+        if estrategia == 'custom' and estrategia_personalizada:
+            # Custom strategy - calculate weighted average TEA
+            tea_custom = 0
+            total_weight = 0
+            if estrategia_personalizada.get('stocks', 0) > 0:
+                tea_custom += (estrategia_personalizada['stocks'] / 100) * 0.08
+                total_weight += estrategia_personalizada['stocks'] / 100
+            if estrategia_personalizada.get('bonds', 0) > 0:
+                tea_custom += (estrategia_personalizada['bonds'] / 100) * 0.04
+                total_weight += estrategia_personalizada['bonds'] / 100
+            if estrategia_personalizada.get('gold', 0) > 0:
+                tea_custom += (estrategia_personalizada['gold'] / 100) * 0.03
+                total_weight += estrategia_personalizada['gold'] / 100
+            if estrategia_personalizada.get('realEstate', 0) > 0:
+                tea_custom += (estrategia_personalizada['realEstate'] / 100) * 0.06
+                total_weight += estrategia_personalizada['realEstate'] / 100
+
+            if total_weight > 0:
+                tea_custom = tea_custom / total_weight
+            else:
+                tea_custom = 0.05  # Default
 
-        # Define strategy configurations
-        estrategias_config = {
-            'conservative': [
-                {'nombre': 'Bonos', 'peso': 0.7, 'tea': 0.04},
-                {'nombre': 'Acciones', 'peso': 0.3, 'tea': 0.08}
-            ],
-            'moderate': [
-                {'nombre': 'Bonos', 'peso': 0.5, 'tea': 0.04},
-                {'nombre': 'Acciones', 'peso': 0.5, 'tea': 0.08}
-            ],
-            'aggressive': [
-                {'nombre': 'Bonos', 'peso': 0.2, 'tea': 0.04},
-                {'nombre': 'Acciones', 'peso': 0.8, 'tea': 0.08}
-            ],
-            'balanced': [
-                {'nombre': 'Bonos', 'peso': 0.4, 'tea': 0.04},
-                {'nombre': 'Acciones', 'peso': 0.4, 'tea': 0.08},
-                {'nombre': 'Oro', 'peso': 0.2, 'tea': 0.03}
-            ],
-            'tech': [
-                {'nombre': 'Tech Stocks', 'peso': 0.7, 'tea': 0.12},
-                {'nombre': 'Bonos', 'peso': 0.3, 'tea': 0.04}
-            ]
-        }
+            estrategias_comparar.append({
+                'nombre': 'Personalizada',
+                'tea': tea_custom,
+                'volatilidad': 0.15,  # Higher volatility for custom
+                'rebalanceo': rebalanceo != 'none'
+            })
+        elif estrategia in estrategias_config:
+            # Calculate weighted average TEA for predefined strategies
+            activos = estrategias_config[estrategia]
+            tea_estrategia = sum(activo['peso'] * activo['tea'] for activo in activos)
+
+            # Map strategy names to Spanish
+            nombre_estrategia = {
+                'conservative': 'Conservadora',
+                'moderate': 'Moderada',
+                'aggressive': 'Agresiva',
+                'balanced': 'Balanceada',
+                'tech': 'Tecnología'
+            }.get(estrategia, estrategia.title())
+
+            estrategias_comparar.append({
+                'nombre': nombre_estrategia,
+                'tea': tea_estrategia,
+                'volatilidad': 0.10 if estrategia == 'conservative' else 0.15 if estrategia == 'moderate' else 0.20 if estrategia == 'aggressive' else 0.18,
+                'rebalanceo': rebalanceo != 'none'
+            })
 
-        # Prepare strategies for comparison
-        estrategias_comparar = []
-
-        for estrategia in estrategias_seleccionadas:
-            if estrategia == 'custom' and estrategia_personalizada:
-                # Custom strategy - calculate weighted average TEA
-                tea_custom = 0
-                total_weight = 0
-                if estrategia_personalizada.get('stocks', 0) > 0:
-                    tea_custom += (estrategia_personalizada['stocks'] / 100) * 0.08
-                    total_weight += estrategia_personalizada['stocks'] / 100
-                if estrategia_personalizada.get('bonds', 0) > 0:
-                    tea_custom += (estrategia_personalizada['bonds'] / 100) * 0.04
-                    total_weight += estrategia_personalizada['bonds'] / 100
-                if estrategia_personalizada.get('gold', 0) > 0:
-                    tea_custom += (estrategia_personalizada['gold'] / 100) * 0.03
-                    total_weight += estrategia_personalizada['gold'] / 100
-                if estrategia_personalizada.get('realEstate', 0) > 0:
-                    tea_custom += (estrategia_personalizada['realEstate'] / 100) * 0.06
-                    total_weight += estrategia_personalizada['realEstate'] / 100
-
-                if total_weight > 0:
-                    tea_custom = tea_custom / total_weight
-                else:
-                    tea_custom = 0.05  # Default
-
-                estrategias_comparar.append({
-                    'nombre': 'Personalizada',
-                    'tea': tea_custom,
-                    'volatilidad': 0.15,  # Higher volatility for custom
-                    'rebalanceo': rebalanceo != 'none'
-                })
-            elif estrategia in estrategias_config:
-                # Calculate weighted average TEA for predefined strategies
-                activos = estrategias_config[estrategia]
-                tea_estrategia = sum(activo['peso'] * activo['tea'] for activo in activos)
-
-                # Map strategy names to Spanish
-                nombre_estrategia = {
-                    'conservative': 'Conservadora',
-                    'moderate': 'Moderada',
-                    'aggressive': 'Agresiva',
-                    'balanced': 'Balanceada',
-                    'tech': 'Tecnología'
-                }.get(estrategia, estrategia.title())
-
-                estrategias_comparar.append({
-                    'nombre': nombre_estrategia,
-                    'tea': tea_estrategia,
-                    'volatilidad': 0.10 if estrategia == 'conservative' else 0.15 if estrategia == 'moderate' else 0.20 if estrategia == 'aggressive' else 0.18,
-                    'rebalanceo': rebalanceo != 'none'
-                })
-
-        print(f"Debug: estrategias_comparar = {estrategias_comparar}")
-
-        if not estrategias_comparar:
-            return jsonify({'success': False, 'error': 'No se pudieron preparar las estrategias para comparar'})
-
-        # Compare strategies
-        print(f"Debug: About to call comparar_estrategias_inversion with:")
-        print(f"  monto_inicial: {base_datos['monto_inicial']}")
-        print(f"  aporte_periodico: {base_datos['aporte_periodico']}")
-        print(f"  frecuencia: {base_datos['frecuencia']}")
-        print(f"  años: {base_datos.get('años', 25)}")
+    if not estrategias_comparar:
+        raise ValueError('No se pudieron preparar las estrategias para comparar')
 
+    # Compare strategies (phase timings are exported on /metrics)
+    with timed('comparar_estrategias_inversion'):
         df_comparacion = comparar_estrategias_inversion(
             monto_inicial=base_datos['monto_inicial'],
             aporte_periodico=base_datos['aporte_periodico'],
@@ -993,17 +1119,16 @@ def comparar_estrategias():
             años=base_datos.get('años', 25),
             estrategias=estrategias_comparar
         )
-        print(f"Debug: comparar_estrategias_inversion completed successfully")
-
-        # Calculate benchmarks
-        print(f"Debug: About to call calcular_benchmarking")
-        benchmarks = [
-            {'nombre': 'S&P 500', 'tea': 0.08},
-            {'nombre': 'Bonos del Tesoro', 'tea': 0.04},
-            {'nombre': 'Oro', 'tea': 0.03},
-            {'nombre': 'Bienes Raíces', 'tea': 0.06}
-        ]
 
+    # Calculate benchmarks
+    benchmarks = [
+        {'nombre': 'S&P 500', 'tea': 0.08},
+        {'nombre': 'Bonos del Tesoro', 'tea': 0.04},
+        {'nombre': 'Oro', 'tea': 0.03},
+        {'nombre': 'Bienes Raíces', 'tea': 0.06}
+    ]
+
+    with timed('calcular_benchmarking'):
         df_benchmarks = calcular_benchmarking(
             estrategia_personal={'tea': base_datos['tea']},
             benchmarks=benchmarks,
@@ -1012,30 +1137,28 @@ def comparar_estrategias():
             frecuencia=base_datos['frecuencia'],
             años=base_datos.get('años', 25)
         )
-        print(f"Debug: calcular_benchmarking completed successfully")
-
-        # Calculate risk analysis using the same activos structure
-        print(f"Debug: Starting risk analysis")
-        capitales_simulados = []
-        for estrategia in estrategias_seleccionadas:
-            print(f"Debug: Processing estrategia: {estrategia}")
-            if estrategia == 'custom' and estrategia_personalizada:
-                # Use custom activos for risk analysis
-                activos_riesgo = []
-                if estrategia_personalizada.get('stocks', 0) > 0:
-                    activos_riesgo.append({'nombre': 'Acciones', 'peso': estrategia_personalizada['stocks'] / 100, 'tea': 0.08})
-                if estrategia_personalizada.get('bonds', 0) > 0:
-                    activos_riesgo.append({'nombre': 'Bonos', 'peso': estrategia_personalizada['bonds'] / 100, 'tea': 0.04})
-                if estrategia_personalizada.get('gold', 0) > 0:
-                    activos_riesgo.append({'nombre': 'Oro', 'peso': estrategia_personalizada['gold'] / 100, 'tea': 0.03})
-                if estrategia_personalizada.get('realEstate', 0) > 0:
-                    activos_riesgo.append({'nombre': 'Bienes Raíces', 'peso': estrategia_personalizada['realEstate'] / 100, 'tea': 0.06})
-            elif estrategia in estrategias_config:
-                activos_riesgo = estrategias_config[estrategia]
-            else:
-                continue
 
-            if activos_riesgo:
+    # Calculate risk analysis using the same activos structure
+    capitales_simulados = []
+    for estrategia in estrategias_seleccionadas:
+        if estrategia == 'custom' and estrategia_personalizada:
+            # Use custom activos for risk analysis
+            activos_riesgo = []
+            if estrategia_personalizada.get('stocks', 0) > 0:
+                activos_riesgo.append({'nombre': 'Acciones', 'peso': estrategia_personalizada['stocks'] / 100, 'tea': 0.08})
+            if estrategia_personalizada.get('bonds', 0) > 0:
+                activos_riesgo.append({'nombre': 'Bonos', 'peso': estrategia_personalizada['bonds'] / 100, 'tea': 0.04})
+            if estrategia_personalizada.get('gold', 0) > 0:
+                activos_riesgo.append({'nombre': 'Oro', 'peso': estrategia_personalizada['gold'] / 100, 'tea': 0.03})
+            if estrategia_personalizada.get('realEstate', 0) > 0:
+                activos_riesgo.append({'nombre': 'Bienes Raíces', 'peso': estrategia_personalizada['realEstate'] / 100, 'tea': 0.06})
+        elif estrategia in estrategias_config:
+            activos_riesgo = estrategias_config[estrategia]
+        else:
+            continue
+
+        if activos_riesgo:
+            with timed('simular_rebalanceo_automatico'):
                 df_sim, _ = simular_rebalanceo_automatico(
                     monto_inicial=base_datos['monto_inicial'],
                     aporte_periodico=base_datos['aporte_periodico'],
@@ -1044,29 +1167,67 @@ def comparar_estrategias():
                     activos=activos_riesgo,
                     frecuencia_rebalanceo=rebalanceo if rebalanceo != 'none' else 'Anual'
                 )
-                capitales_simulados.extend(df_sim['Saldo Total (USD)'].tail(10).tolist())
-
-        if capitales_simulados:
-            mejor_escenario = max(capitales_simulados)
-            peor_escenario = min(capitales_simulados)
-            volatilidad_promedio = np.std(capitales_simulados) / np.mean(capitales_simulados) * 100
-            promedio_capital = np.mean(capitales_simulados)
-            probabilidad_exito = len([c for c in capitales_simulados if c > promedio_capital * 0.9]) / len(capitales_simulados) * 100
-        else:
-            mejor_escenario = peor_escenario = volatilidad_promedio = probabilidad_exito = 0
-
-        analisis_riesgo = {
-            'volatilidad_promedio': volatilidad_promedio,
-            'mejor_escenario': mejor_escenario,
-            'peor_escenario': peor_escenario,
-            'probabilidad_exito': probabilidad_exito
+            capitales_simulados.extend(df_sim['Saldo Total (USD)'].tail(10).tolist())
+
+    if capitales_simulados:
+        mejor_escenario = max(capitales_simulados)
+        peor_escenario = min(capitales_simulados)
+        volatilidad_promedio = np.std(capitales_simulados) / np.mean(capitales_simulados) * 100
+        promedio_capital = np.mean(capitales_simulados)
+        probabilidad_exito = len([c for c in capitales_simulados if c > promedio_capital * 0.9]) / len(capitales_simulados) * 100
+    else:
+        mejor_escenario = peor_escenario = volatilidad_promedio = probabilidad_exito = 0
+
+    analisis_riesgo = {
+        'volatilidad_promedio': volatilidad_promedio,
+        'mejor_escenario': mejor_escenario,
+        'peor_escenario': peor_escenario,
+        'probabilidad_exito': probabilidad_exito
+    }
+
+    return {
+        'estrategias': df_comparacion.to_dict('records'),
+        'benchmarks': df_benchmarks.to_dict('records'),
+        'analisis_riesgo': {clave: float(valor) for clave, valor in analisis_riesgo.items()},
+        'configuracion': {
+            'estrategias_seleccionadas': estrategias_seleccionadas,
+            'frecuencia_rebalanceo': rebalanceo,
+            'estrategia_personalizada': estrategia_personalizada
         }
+    }
+
+@main.route('/api/comparar-estrategias', methods=['POST'])
+def comparar_estrategias():
+    """API endpoint for strategy comparison"""
+    try:
+        data = request.get_json()
+
+        # Get base portfolio data from session
+        base_datos = session.get('cartera_datos', {})
+        if not base_datos:
+            return jsonify({'success': False, 'error': 'Datos base no encontrados. Complete el Módulo A primero.'})
+
+        estrategias_seleccionadas = data.get('estrategias', [])
+        estrategia_personalizada = data.get('estrategia_personalizada')
+        rebalanceo = data.get('rebalanceo', 'none')
+
+        # Validate input data
+        if not estrategias_seleccionadas:
+            return jsonify({'success': False, 'error': 'Debes seleccionar al menos una estrategia para comparar'})
+
+        comparacion = calcular_comparacion(
+            base_datos, estrategias_seleccionadas, rebalanceo, estrategia_personalizada
+        )
+
+        # Only the configuration is kept: the combined report (/descargar-pdf/completo)
+        # recomputes the tables, which would overflow the 4 KB session cookie
+        session['comparacion_config'] = comparacion['configuracion']
 
         return jsonify({
             'success': True,
-            'estrategias': df_comparacion.to_dict('records'),
-            'benchmarks': df_benchmarks.to_dict('records'),
-            'analisis_riesgo': analisis_riesgo
+            'estrategias': comparacion['estrategias'],
+            'benchmarks': comparacion['benchmarks'],
+            'analisis_riesgo': comparacion['analisis_riesgo']
         })
 
     except Exception as e:
@@ -1075,6 +1236,7 @@ def comparar_estrategias():
 @main.route('/api/exportar-comparacion', methods=['POST'])
 def exportar_comparacion():
     """API endpoint for exporting comparison results"""
+    from utils.pdf_generator import generar_pdf_comparacion
     try:
         data = request.get_json()
 
@@ -1092,7 +1254,8 @@ def exportar_comparacion():
             return jsonify({'success': False, 'error': 'No hay datos de benchmarks para exportar'})
 
         # Generate PDF
-        pdf_buffer = generar_pdf_comparacion(estrategias, benchmarks, analisis_riesgo, configuracion)
+        with timed('pdf_comparacion'):
+            pdf_buffer = generar_pdf_comparacion(estrategias, benchmarks, analisis_riesgo, configuracion)
         pdf_buffer.seek(0)
 
         return send_file(
@@ -1154,15 +1317,17 @@ def get_user_profile():
     """Get current user profile"""
     try:
         user = g.user
-        achievements = UserAchievement.query.filter_by(
-            user_id=user.id,
-            is_completed=True
-        ).all()
+        completed_ids = {
+            achievement_id for (achievement_id,) in db.session.query(UserAchievement.achievement_id).filter_by(
+                user_id=user.id,
+                is_completed=True
+            )
+        }
 
         return jsonify({
             'success': True,
             'user': user.to_dict(),
-            'achievements': [ua.achievement.to_dict() for ua in achievements]
+            'achievements': [a for a in get_active_achievements() if a['id'] in completed_ids]
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -1188,20 +1353,67 @@ def update_user_profile():
 
 @main.route('/api/simulations', methods=['GET'])
 def get_simulations():
-    """Get user's simulations"""
+    """Get user's simulations (slim, keyset-paginated on updated_at/id)"""
     try:
         user = g.user
-        simulations = Simulation.query.filter_by(user_id=user.id).order_by(
-            Simulation.updated_at.desc()
-        ).all()
+        limit = min(max(request.args.get('limit', SIMULATIONS_PAGE_SIZE, type=int), 1), SIMULATIONS_MAX_PAGE_SIZE)
+
+        query = Simulation.query.options(
+            load_only(*[getattr(Simulation, col) for col in Simulation.LIST_COLUMNS])
+        ).filter_by(user_id=user.id)
+
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_updated_at, cursor_id = decode_simulation_cursor(cursor)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Invalid cursor'})
+            query = query.filter(db.or_(
+                Simulation.updated_at < cursor_updated_at,
+                db.and_(Simulation.updated_at == cursor_updated_at, Simulation.id < cursor_id)
+            ))
+
+        # Fetch one extra row to know whether there is a next page
+        simulations = query.order_by(
+            Simulation.updated_at.desc(), Simulation.id.desc()
+        ).limit(limit + 1).all()
+
+        has_more = len(simulations) > limit
+        simulations = simulations[:limit]
+        next_cursor = encode_simulation_cursor(simulations[-1]) if has_more else None
 
         return jsonify({
             'success': True,
-            'simulations': [s.to_dict() for s in simulations]
+            'simulations': [s.to_summary_dict() for s in simulations],
+            'next_cursor': next_cursor,
+            'has_more': has_more
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@main.route('/api/simulations/export', methods=['GET'])
+def export_simulations():
+    """Stream all of the user's simulations as NDJSON"""
+    filename = f"simulaciones_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
+    return Response(
+        stream_with_context(iter_simulations_ndjson(g.user.id)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@main.route('/api/simulations/import', methods=['POST'])
+def import_simulations():
+    """Import simulations from an NDJSON body (or uploaded 'file'), in chunks"""
+    try:
+        upload = request.files.get('file')
+        lines = upload.stream if upload else request.stream
+        summary = import_simulations_ndjson(lines, user_id=g.user.id)
+
+        return jsonify({'success': True, **summary.to_dict()})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
 @main.route('/api/simulations', methods=['POST'])
 def save_simulation():
     """Save a new simulation"""
@@ -1215,12 +1427,14 @@ def save_simulation():
             description=data.get('description', ''),
             module_type=data['module_type'],
             input_data=data['input_data'],
+            input_hash=compute_content_hash(data['input_data']),
             results_data=data['results_data'],
             is_favorite=data.get('is_favorite', False),
             is_public=data.get('is_public', False)
         )
 
         db.session.add(simulation)
+        record_simulation_performance(user.id, simulation.results_data)
         db.session.commit()
 
         # Update user stats and check achievements
@@ -1230,7 +1444,7 @@ def save_simulation():
         return jsonify({
             'success': True,
             'simulation': simulation.to_dict(),
-            'awarded_achievements': [a.to_dict() for a in awarded_achievements]
+            'awarded_achievements': awarded_achievements
         })
     except Exception as e:
         db.session.rollback()
@@ -1305,6 +1519,7 @@ def delete_simulation(simulation_id):
             return jsonify({'success': False, 'error': 'Simulation not found'})
 
         db.session.delete(simulation)
+        record_simulation_performance(user.id, simulation.results, removed=True)
         db.session.commit()
 
         # Update user stats
@@ -1321,16 +1536,31 @@ def get_templates():
     try:
         user = g.user
 
-        # Get user's templates and public templates
-        user_templates = Template.query.filter_by(creator_id=user.id).all()
-        public_templates = Template.query.filter_by(is_public=True).all()
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', TEMPLATES_PAGE_SIZE, type=int), 1), TEMPLATES_MAX_PAGE_SIZE)
+        sort = request.args.get('sort', 'popular')
 
-        # Combine and remove duplicates
-        all_templates = list(set(user_templates + public_templates))
+        # User's own templates and public templates in a single query
+        query = Template.query.filter(db.or_(
+            Template.creator_id == user.id,
+            Template.is_public.is_(True)
+        ))
+
+        if sort == 'recent':
+            query = query.order_by(Template.created_at.desc(), Template.id.desc())
+        else:
+            query = query.order_by(Template.popularity_score.desc(), Template.id.desc())
+
+        # Fetch one extra row to know whether there is a next page
+        templates = query.offset((page - 1) * per_page).limit(per_page + 1).all()
+        has_more = len(templates) > per_page
 
         return jsonify({
             'success': True,
-            'templates': [t.to_dict() for t in all_templates]
+            'templates': [t.to_dict() for t in templates[:per_page]],
+            'page': page,
+            'per_page': per_page,
+            'has_more': has_more
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -1352,6 +1582,7 @@ def create_template():
             tags=data.get('tags', []),
             is_public=data.get('is_public', True)
         )
+        template.refresh_score()
 
         db.session.add(template)
         db.session.commit()
@@ -1363,7 +1594,7 @@ def create_template():
         return jsonify({
             'success': True,
             'template': template.to_dict(),
-            'awarded_achievements': [a.to_dict() for a in awarded_achievements]
+            'awarded_achievements': awarded_achievements
         })
     except Exception as e:
         db.session.rollback()
@@ -1380,42 +1611,11 @@ def vote_template(template_id):
         if vote_type not in ['upvote', 'downvote']:
             return jsonify({'success': False, 'error': 'Invalid vote type'})
 
-        template = Template.query.get(template_id)
-        if not template:
+        # Atomic counter increments + vote upsert in one short transaction
+        if not apply_template_vote(user.id, template_id, vote_type):
             return jsonify({'success': False, 'error': 'Template not found'})
 
-        # Check if user already voted
-        existing_vote = TemplateVote.query.filter_by(
-            user_id=user.id,
-            template_id=template_id
-        ).first()
-
-        if existing_vote:
-            # Update existing vote
-            old_vote = existing_vote.vote_type
-            existing_vote.vote_type = vote_type
-        else:
-            # Create new vote
-            existing_vote = TemplateVote(
-                user_id=user.id,
-                template_id=template_id,
-                vote_type=vote_type
-            )
-            db.session.add(existing_vote)
-            old_vote = None
-
-        # Update template vote counts
-        if old_vote == 'upvote':
-            template.upvotes -= 1
-        elif old_vote == 'downvote':
-            template.downvotes -= 1
-
-        if vote_type == 'upvote':
-            template.upvotes += 1
-        elif vote_type == 'downvote':
-            template.downvotes += 1
-
-        db.session.commit()
+        template = db.session.get(Template, template_id)
 
         return jsonify({
             'success': True,
@@ -1431,38 +1631,37 @@ def get_achievements():
     try:
         user = g.user
 
-        user_achievements = UserAchievement.query.filter_by(user_id=user.id).all()
-        achievements_dict = {}
-
-        for ua in user_achievements:
-            achievements_dict[ua.achievement_id] = {
-                'achievement': ua.achievement.to_dict(),
-                'progress': ua.to_dict()
-            }
+        # Definitions come from the in-process cache; progress from one query.
+        # Missing progress rows are synthesized, never written (read-only endpoint).
+        progress_by_achievement = {
+            ua.achievement_id: ua for ua in UserAchievement.query.filter_by(user_id=user.id)
+        }
 
-        # Include achievements user hasn't started yet
-        all_achievements = Achievement.query.filter_by(is_active=True).all()
-        for achievement in all_achievements:
-            if achievement.id not in achievements_dict:
-                # Create progress entry
-                user_achievement = UserAchievement(
-                    user_id=user.id,
-                    achievement_id=achievement.id
-                )
-                db.session.add(user_achievement)
-                achievements_dict[achievement.id] = {
-                    'achievement': achievement.to_dict(),
-                    'progress': user_achievement.to_dict()
-                }
+        achievements = []
+        for achievement in get_active_achievements():
+            user_achievement = progress_by_achievement.get(achievement['id'])
+            achievements.append({
+                'achievement': achievement,
+                'progress': user_achievement.to_dict() if user_achievement
+                else UserAchievement.virtual_progress_dict(user.id, achievement['id'])
+            })
 
-        db.session.commit()
+        return jsonify({
+            'success': True,
+            'achievements': achievements
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
 
+@main.route('/api/achievements/pending', methods=['GET'])
+def get_pending_achievements():
+    """Achievements awarded by the background auto-save writer since the last check"""
+    try:
         return jsonify({
             'success': True,
-            'achievements': list(achievements_dict.values())
+            'awarded_achievements': pop_unnotified_achievements(g.user.id)
         })
     except Exception as e:
-        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)})
 
 @main.route('/api/social/comparison')
@@ -1471,45 +1670,21 @@ def get_social_comparison():
     try:
         user = g.user
 
-        # Get user's simulation stats
-        user_simulations = Simulation.query.filter_by(user_id=user.id).all()
-
-        if not user_simulations:
-            return jsonify({
-                'success': True,
-                'comparison': {
-                    'user_stats': {'total_simulations': 0, 'avg_performance': 0},
-                    'community_stats': {'total_users': 0, 'avg_simulations_per_user': 0}
-                }
-            })
-
-        # Calculate user's average performance
-        total_performance = 0
-        count = 0
-        for sim in user_simulations:
-            if sim.results_data and 'resumen' in sim.results_data:
-                resumen = sim.results_data['resumen']
-                if 'rentabilidad' in resumen:
-                    total_performance += resumen['rentabilidad']
-                    count += 1
-
-        user_avg_performance = total_performance / count if count > 0 else 0
-
-        # Get community stats (simplified - in production you'd cache this)
-        total_users = User.query.count()
-        total_simulations = Simulation.query.count()
-        avg_simulations_per_user = total_simulations / total_users if total_users > 0 else 0
+        # Community stats are materialized by refresh_community_stats (primary-key read)
+        community_stats = get_community_stats()
 
         return jsonify({
             'success': True,
             'comparison': {
                 'user_stats': {
-                    'total_simulations': len(user_simulations),
-                    'avg_performance': user_avg_performance
+                    'total_simulations': user.total_simulations or 0,
+                    'avg_performance': user.avg_performance or 0
                 },
                 'community_stats': {
-                    'total_users': total_users,
-                    'avg_simulations_per_user': avg_simulations_per_user
+                    'total_users': community_stats.total_users,
+                    'avg_simulations_per_user': community_stats.avg_simulations_per_user,
+                    'avg_performance': community_stats.avg_performance,
+                    'refreshed_at': community_stats.refreshed_at.isoformat() if community_stats.refreshed_at else None
                 }
             }
         })
@@ -0,0 +1,81 @@
+"""
+Database schema bootstrap, kept out of the application factory
+
+Tables are created and reference data seeded by `flask init-db` / `flask seed`
+(once per deploy), so worker boots do no schema work and concurrent boots on
+a fresh database cannot race each other. DB_AUTO_INIT restores the old
+create-on-boot behaviour for local development.
+
+Schema changes ship as Alembic revisions (migrations/versions): deploys run
+`flask db upgrade` before `flask init-db`. The revisions check what already
+exists (has_table / has_column / has_index), so databases created earlier by
+create_all upgrade cleanly without being stamped first.
+"""
+import os
+import sqlalchemy as sa
+from flask import current_app
+from .models import db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Processes that already compared the database with the Alembic head
+_migrations_checked = set()
+
+def init_db():
+    """Create missing tables and seed reference data (idempotent). Returns the achievements added."""
+    from . import seed_achievements
+
+    db.create_all()
+    return seed_achievements()
+
+def has_table(bind, table):
+    """True when the table exists (used by migrations that may run after create_all)"""
+    return sa.inspect(bind).has_table(table)
+
+def has_column(bind, table, column):
+    """True when the table exists and has the column"""
+    return has_table(bind, table) and column in {c['name'] for c in sa.inspect(bind).get_columns(table)}
+
+def has_index(bind, table, index):
+    """True when the table exists and has the index"""
+    return has_table(bind, table) and index in {i['name'] for i in sa.inspect(bind).get_indexes(table)}
+
+def migration_status(directory=MIGRATIONS_DIR):
+    """(current, head) Alembic revisions of the database, as sets"""
+    from alembic.config import Config as AlembicConfig
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    alembic_config = AlembicConfig()
+    alembic_config.set_main_option('script_location', directory)
+    heads = set(ScriptDirectory.from_config(alembic_config).get_heads())
+    with db.engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    return current, heads
+
+def pending_migrations_message(directory=MIGRATIONS_DIR):
+    """Description of the pending migrations, or None when the database is at the head"""
+    current, heads = migration_status(directory)
+    if current == heads:
+        return None
+    return (
+        f"Database is not at the migration head (current: {', '.join(sorted(current)) or 'none'}, "
+        f"head: {', '.join(sorted(heads)) or 'none'}); run \"flask db upgrade\""
+    )
+
+def check_migrations(directory=MIGRATIONS_DIR):
+    """
+    Compare the database with the Alembic head once per process.
+
+    Logs a warning when migrations are pending; returns True when the
+    database is up to date (or was already checked).
+    """
+    if os.getpid() in _migrations_checked:
+        return True
+    _migrations_checked.add(os.getpid())
+
+    message = pending_migrations_message(directory)
+    if message:
+        current_app.logger.warning(message)
+        return False
+    return True
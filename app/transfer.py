@@ -0,0 +1,210 @@
+"""
+Bulk export and import of simulations as NDJSON (one JSON object per line)
+
+Export streams rows through a server-side cursor (yield_per) so memory stays
+flat regardless of how many simulations are exported. Import validates each
+line and inserts valid rows in chunks with bulk_insert_mappings, committing
+once per chunk.
+"""
+import json
+from datetime import datetime
+from .models import (
+    db, User, Simulation, SimulationResult, compute_content_hash,
+    get_simulation_performance, add_performance_samples, update_user_stats
+)
+
+EXPORT_YIELD_PER = 1000
+IMPORT_CHUNK_SIZE = 1000
+
+# Rejected lines reported back to the caller (the rest are only counted)
+IMPORT_MAX_ERRORS = 50
+
+EXPORT_COLUMNS = (
+    Simulation.id, Simulation.user_id, Simulation.name, Simulation.description,
+    Simulation.module_type, Simulation.input_data, Simulation.results_data,
+    SimulationResult.results_data.label('shared_results_data'),
+    Simulation.created_at, Simulation.updated_at, Simulation.is_favorite, Simulation.is_public
+)
+
+class ImportSummary:
+    """Counters and first errors of a bulk import"""
+
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, line_number, message):
+        self.rejected += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'errors': self.errors
+        }
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def iter_simulations_ndjson(user_id=None, yield_per=EXPORT_YIELD_PER):
+    """
+    Yield simulations as NDJSON lines, oldest first.
+
+    Exports every user's simulations when user_id is None (admin export);
+    user_id is then included in each record.
+    """
+    query = db.select(*EXPORT_COLUMNS).outerjoin(
+        SimulationResult, Simulation.result_id == SimulationResult.id
+    ).order_by(Simulation.id)
+    if user_id is not None:
+        query = query.where(Simulation.user_id == user_id)
+
+    rows = db.session.execute(query.execution_options(yield_per=yield_per))
+    for row in rows:
+        record = {
+            'id': row.id,
+            'name': row.name,
+            'description': row.description,
+            'module_type': row.module_type,
+            'input_data': row.input_data,
+            'results_data': row.results_data if row.results_data is not None else row.shared_results_data,
+            'created_at': _isoformat(row.created_at),
+            'updated_at': _isoformat(row.updated_at),
+            'is_favorite': bool(row.is_favorite),
+            'is_public': bool(row.is_public)
+        }
+        if user_id is None:
+            record['user_id'] = row.user_id
+        yield json.dumps(record, default=str) + '\n'
+
+def _parse_datetime(value, field):
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{field}' must be an ISO 8601 datetime")
+
+def validate_simulation_record(record):
+    """Check an imported record and return the column mapping to insert (raises ValueError)"""
+    if not isinstance(record, dict):
+        raise ValueError('Each line must be a JSON object')
+
+    name = record.get('name')
+    if not isinstance(name, str) or not name.strip() or len(name) > 100:
+        raise ValueError("'name' must be a non-empty string of at most 100 characters")
+
+    module_type = record.get('module_type')
+    if not isinstance(module_type, str) or not module_type or len(module_type) > 20:
+        raise ValueError("'module_type' must be a non-empty string of at most 20 characters")
+
+    input_data = record.get('input_data')
+    if not isinstance(input_data, dict):
+        raise ValueError("'input_data' must be an object")
+
+    results_data = record.get('results_data')
+    if not isinstance(results_data, dict):
+        raise ValueError("'results_data' must be an object")
+
+    description = record.get('description')
+    if description is not None and not isinstance(description, str):
+        raise ValueError("'description' must be a string")
+
+    for field in ('is_favorite', 'is_public'):
+        if not isinstance(record.get(field, False), bool):
+            raise ValueError(f"'{field}' must be a boolean")
+
+    mapping = {
+        'name': name.strip(),
+        'description': description,
+        'module_type': module_type,
+        'input_data': input_data,
+        'input_hash': compute_content_hash(input_data),
+        'results_data': results_data,
+        'is_favorite': record.get('is_favorite', False),
+        'is_public': record.get('is_public', False),
+        'is_autosave': False
+    }
+    for field in ('created_at', 'updated_at'):
+        value = _parse_datetime(record.get(field), field)
+        if value is not None:
+            mapping[field] = value
+    return mapping
+
+def import_simulations_ndjson(lines, user_id=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Import simulations from an iterable of NDJSON lines.
+
+    With user_id every record is assigned to that user (ids in the file are
+    ignored). Without it each record must carry the user_id of an existing
+    user (admin import). Returns an ImportSummary.
+    """
+    summary = ImportSummary()
+    chunk = []
+    imported_users = set()
+
+    def flush():
+        if not chunk:
+            return
+
+        if user_id is None:
+            known = {row.id for row in db.session.query(User.id).filter(
+                User.id.in_({mapping['user_id'] for _, mapping in chunk})
+            )}
+            valid = []
+            for line_number, mapping in chunk:
+                if mapping['user_id'] in known:
+                    valid.append(mapping)
+                else:
+                    summary.reject(line_number, f"Unknown user_id '{mapping['user_id']}'")
+        else:
+            valid = [mapping for _, mapping in chunk]
+
+        # Per-user (rentabilidad total, samples) of the chunk, committed with its rows
+        performance = {}
+        for mapping in valid:
+            imported_users.add(mapping['user_id'])
+            rentabilidad = get_simulation_performance(mapping['results_data'])
+            if rentabilidad is not None:
+                total, count = performance.get(mapping['user_id'], (0.0, 0))
+                performance[mapping['user_id']] = (total + rentabilidad, count + 1)
+
+        db.session.bulk_insert_mappings(Simulation, valid)
+        for imported_user_id, (total, count) in performance.items():
+            add_performance_samples(imported_user_id, total, count)
+        db.session.commit()
+        summary.imported += len(valid)
+        chunk.clear()
+
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+
+        try:
+            record = json.loads(line)
+            mapping = validate_simulation_record(record)
+            if user_id is not None:
+                mapping['user_id'] = user_id
+            elif isinstance(record.get('user_id'), str):
+                mapping['user_id'] = record['user_id']
+            else:
+                raise ValueError("'user_id' is required")
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError too
+            summary.reject(line_number, str(e))
+            continue
+
+        chunk.append((line_number, mapping))
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+
+    for imported_user_id in imported_users:
+        update_user_stats(imported_user_id)
+
+    return summary
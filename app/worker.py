@@ -0,0 +1,65 @@
+"""
+Worker lifecycle hooks for pre-fork servers (see gunicorn.conf.py)
+
+With preload_app the application is created once in the master and the
+workers are forked from it: heavy modules imported there are shared
+copy-on-write, but database connections and per-process state must not be.
+Each worker therefore resets its pools after the fork and warms its own
+caches before taking traffic, so the first requests do not pay for them.
+"""
+import time
+from flask import current_app
+
+# Small inputs that run the calculation code paths once (pandas/numpy internals)
+_WARMUP_CARTERA = {
+    'edad_actual': 30, 'monto_inicial': 1000.0, 'aporte_periodico': 100.0,
+    'frecuencia': 'Mensual', 'tea': 8.0, 'tipo_plazo': 'años', 'años': 2, 'edad_retiro': None
+}
+_WARMUP_BONOS = {
+    'valor_nominal': 1000.0, 'tasa_cupon': 6.0, 'frecuencia_pago': 'Semestral',
+    'años_bono': 2, 'tea_retorno': 7.0
+}
+
+def preload_modules():
+    """Import the heavy calculation and report modules (master process, before forking)"""
+    from utils import calculos_financieros, chart_series  # noqa: F401 (pandas, numpy)
+    from utils.pdf_generator import get_style_registry
+
+    # The style registry is plain Python objects: safe to build once and share
+    get_style_registry()
+
+def reset_after_fork(app):
+    """Drop state inherited from the master: pooled connections, telemetry and metrics"""
+    from .models import db
+    from .monitoring import pool_telemetry, metrics
+
+    with app.app_context():
+        # close=False leaves the parent's sockets alone; the worker opens its own
+        db.engine.dispose(close=False)
+    pool_telemetry.reset()
+    metrics.reset()
+
+def warm_caches(app):
+    """Fill this worker's caches before it accepts requests; returns the seconds spent"""
+    started = time.perf_counter()
+    from utils.chart_series import portfolio_series, bond_series
+    from utils.pdf_generator import get_style_registry
+    from .models import calcular_cartera, calcular_bonos, get_active_achievements
+    from .monitoring import metrics
+
+    get_style_registry()
+    with app.app_context():
+        try:
+            get_active_achievements()
+        except Exception:
+            # A database that is not initialized yet must not keep the worker from booting
+            current_app.logger.warning('Warmup: achievement definitions not loaded', exc_info=True)
+
+        cartera = calcular_cartera(dict(_WARMUP_CARTERA))
+        portfolio_series(cartera['dataframe'], _WARMUP_CARTERA['frecuencia'])
+        bonos = calcular_bonos(dict(_WARMUP_BONOS))
+        bond_series(bonos['dataframe'], _WARMUP_BONOS['frecuencia_pago'])
+
+    # The warm-up calculations ran under timed(); keep them out of the reported histograms
+    metrics.reset()
+    return time.perf_counter() - started
@@ -0,0 +1,354 @@
+"""
+Benchmarks of the calculation engine and the PDF generators
+
+Times utils.calculos_financieros, the app.models calculations and the
+utils.pdf_generator reports over plazos of 1 to 100 years and monthly to
+annual frequencies, writes the results to JSON and compares two result files
+(or a run against the stored baseline) flagging regressions.
+
+    python benchmarks/engine.py run                       # full sweep, print a table
+    python benchmarks/engine.py run --quick -k bono       # subset of sizes / cases
+    python benchmarks/engine.py run --save                # update benchmarks/results/engine.json (baseline)
+    python benchmarks/engine.py run --output new.json
+    python benchmarks/engine.py compare new.json          # against the baseline; exit 1 on regressions
+    python benchmarks/engine.py run --compare             # run and compare in one step
+
+Each case is calibrated so that one repeat lasts at least --min-time seconds.
+Comparisons use the fastest repeat (min_s, the least noisy figure on a shared
+machine) unless --metric median_s is given; cases only in the baseline (for
+example when running with -k) are counted, not flagged.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'results', 'engine.json')
+
+YEARS = (1, 5, 10, 25, 50, 100)
+FREQUENCIES = ('Mensual', 'Trimestral', 'Semestral', 'Anual')
+QUICK_YEARS = (1, 25, 100)
+QUICK_FREQUENCIES = ('Mensual', 'Anual')
+
+# simular_rebalanceo_automatico only knows these frequencies (others fall back to monthly)
+REBALANCE_FREQUENCIES = ('Mensual', 'Trimestral', 'Anual')
+
+MONTO_INICIAL = 10000.0
+APORTE = 500.0
+TEA = 0.08
+
+ESTRATEGIAS = [
+    {'nombre': 'Conservadora', 'tea': 0.052, 'volatilidad': 0.10, 'rebalanceo': True},
+    {'nombre': 'Moderada', 'tea': 0.06, 'volatilidad': 0.15, 'rebalanceo': True},
+    {'nombre': 'Agresiva', 'tea': 0.072, 'volatilidad': 0.20, 'rebalanceo': True}
+]
+BENCHMARKS = [
+    {'nombre': 'S&P 500', 'tea': 0.08},
+    {'nombre': 'Bonos del Tesoro', 'tea': 0.04},
+    {'nombre': 'Oro', 'tea': 0.03},
+    {'nombre': 'Bienes Raíces', 'tea': 0.06}
+]
+ACTIVOS = [
+    {'nombre': 'Bonos', 'peso': 0.4, 'tea': 0.04},
+    {'nombre': 'Acciones', 'peso': 0.4, 'tea': 0.08},
+    {'nombre': 'Oro', 'peso': 0.2, 'tea': 0.03}
+]
+
+def _datos_cartera(años, frecuencia):
+    return {
+        'edad_actual': 25, 'monto_inicial': MONTO_INICIAL, 'aporte_periodico': APORTE,
+        'frecuencia': frecuencia, 'tea': TEA * 100, 'tipo_plazo': 'años', 'años': años, 'edad_retiro': None
+    }
+
+def _datos_bono(años, frecuencia):
+    return {
+        'valor_nominal': 1000.0, 'tasa_cupon': 6.0, 'frecuencia_pago': frecuencia,
+        'años_bono': años, 'tea_retorno': 7.0
+    }
+
+def _sweep(years, frequencies):
+    return [(años, frecuencia) for frecuencia in frequencies for años in years]
+
+def engine_cases(years, frequencies):
+    """(name, params, callable) for every calculation function and input size"""
+    import numpy as np
+    from utils import calculos_financieros as cf
+    from app.models import calcular_cartera, calcular_bonos
+
+    def seeded(function):
+        # comparar_estrategias_inversion draws random scenarios: same draws on every call
+        def run():
+            np.random.seed(42)
+            return function()
+        return run
+
+    cases = []
+    for años, frecuencia in _sweep(years, frequencies):
+        params = {'años': años, 'frecuencia': frecuencia}
+        cases += [
+            ('simular_crecimiento_cartera', params,
+             lambda a=años, f=frecuencia: cf.simular_crecimiento_cartera(MONTO_INICIAL, APORTE, TEA, f, a)),
+            ('calcular_cartera', params,
+             lambda a=años, f=frecuencia: calcular_cartera(_datos_cartera(a, f))),
+            ('valorar_bono', params,
+             lambda a=años, f=frecuencia: cf.valorar_bono(1000.0, 0.06, f, a, 0.07)),
+            ('calcular_bonos', params,
+             lambda a=años, f=frecuencia: calcular_bonos(_datos_bono(a, f))),
+            ('simular_cartera_con_inflacion', params,
+             lambda a=años, f=frecuencia: cf.simular_cartera_con_inflacion(
+                 MONTO_INICIAL, APORTE, TEA, f, a, 0.03, escalado_aportes=0.02, reajuste_jubilacion=True)),
+            ('comparar_estrategias_inversion', params,
+             seeded(lambda a=años, f=frecuencia: cf.comparar_estrategias_inversion(
+                 MONTO_INICIAL, APORTE, f, a, ESTRATEGIAS))),
+            ('calcular_benchmarking', params,
+             lambda a=años, f=frecuencia: cf.calcular_benchmarking(
+                 {'tea': TEA}, BENCHMARKS, MONTO_INICIAL, APORTE, f, a)),
+        ]
+        if frecuencia in REBALANCE_FREQUENCIES:
+            cases.append((
+                'simular_rebalanceo_automatico', params,
+                lambda a=años, f=frecuencia: cf.simular_rebalanceo_automatico(
+                    MONTO_INICIAL, APORTE, f, a, ACTIVOS, frecuencia_rebalanceo='Anual')
+            ))
+    return cases
+
+def _jubilacion_resumen(datos_cartera, resumen_cartera):
+    """calcular_jubilacion result (it reads Module A from the session)"""
+    from flask import Flask, session
+    from app.models import calcular_jubilacion
+
+    app = Flask(__name__)
+    app.secret_key = 'benchmark'
+    with app.test_request_context():
+        session['cartera_datos'] = datos_cartera
+        session['cartera_resumen'] = resumen_cartera
+        return calcular_jubilacion({'tipo_retiro': 'pension', 'tipo_impuesto': '29.5', 'edad_jubilacion': 65})
+
+def pdf_cases(years):
+    """(name, params, callable) for every PDF generator, over the portfolio/bond plazos"""
+    import numpy as np
+    from utils import calculos_financieros as cf
+    from utils import pdf_generator
+    from app.models import calcular_cartera, calcular_bonos
+
+    np.random.seed(42)
+    comparacion = {
+        'estrategias': cf.comparar_estrategias_inversion(MONTO_INICIAL, APORTE, 'Mensual', 25, ESTRATEGIAS).to_dict('records'),
+        'benchmarks': cf.calcular_benchmarking({'tea': TEA}, BENCHMARKS, MONTO_INICIAL, APORTE, 'Mensual', 25).to_dict('records'),
+        'analisis_riesgo': {'volatilidad_promedio': 12.5, 'mejor_escenario': 450000.0,
+                            'peor_escenario': 310000.0, 'probabilidad_exito': 70.0},
+        'configuracion': {'estrategias_seleccionadas': ['conservative', 'moderate', 'aggressive'],
+                          'frecuencia_rebalanceo': 'Anual'}
+    }
+
+    cases = [(
+        'generar_pdf_comparacion', {},
+        lambda: pdf_generator.generar_pdf_comparacion(
+            comparacion['estrategias'], comparacion['benchmarks'],
+            comparacion['analisis_riesgo'], comparacion['configuracion'])
+    )]
+    for años in years:
+        datos = _datos_cartera(años, 'Mensual')
+        cartera = calcular_cartera(datos)
+        resumen = dict(cartera['resumen'], **datos)
+        bono = calcular_bonos(_datos_bono(años, 'Mensual'))
+        jubilacion = _jubilacion_resumen(datos, cartera['resumen'])
+        params = {'años': años, 'frecuencia': 'Mensual'}
+
+        def completo(cartera=cartera, resumen=resumen, bono=bono, jubilacion=jubilacion):
+            path = pdf_generator.generar_pdf_completo(
+                cartera_data={'dataframe': cartera['dataframe'], 'resumen': resumen},
+                jubilacion_data=jubilacion, bono_data=bono, comparacion_data=comparacion
+            )
+            os.remove(path)
+
+        cases += [
+            ('generar_pdf_cartera', params,
+             lambda df=cartera['dataframe'], r=resumen: pdf_generator.generar_pdf_cartera(df, r)),
+            ('generar_pdf_cartera_anexo', params,
+             lambda df=cartera['dataframe'], r=resumen: pdf_generator.generar_pdf_cartera(df, r, appendix=True)),
+            ('generar_pdf_bono', params,
+             lambda df=bono['dataframe'], r=bono['resumen']: pdf_generator.generar_pdf_bono(df, r)),
+            ('generar_pdf_jubilacion', params,
+             lambda r=jubilacion: pdf_generator.generar_pdf_jubilacion(r)),
+            ('generar_pdf_completo', params, completo),
+        ]
+    return cases
+
+def case_id(name, params):
+    if not params:
+        return name
+    return '{}[{}]'.format(name, ','.join(f'{key}={value}' for key, value in params.items()))
+
+def measure(function, repeats=5, min_time=0.05):
+    """Seconds per call: loops calibrated to last min_time, then `repeats` timed repeats"""
+    function()  # warm up imports and caches
+
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+
+    timings = [elapsed / loops]
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            function()
+        timings.append((time.perf_counter() - started) / loops)
+
+    return {
+        'median_s': statistics.median(timings),
+        'min_s': min(timings),
+        'stdev_s': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'loops': loops,
+        'repeats': len(timings)
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(quick=False, pattern=None, repeats=5, min_time=0.05, pdf=True, progress=None):
+    """Run every case (matching `pattern`) and return the JSON-ready report"""
+    years = QUICK_YEARS if quick else YEARS
+    frequencies = QUICK_FREQUENCIES if quick else FREQUENCIES
+    cases = engine_cases(years, frequencies)
+    if pdf:
+        cases += pdf_cases(QUICK_YEARS if quick else (1, 10, 30, 100))
+
+    results = {}
+    for name, params, function in cases:
+        identifier = case_id(name, params)
+        if pattern and pattern not in identifier:
+            continue
+        results[identifier] = dict(measure(function, repeats, min_time), function=name, params=params)
+        if progress:
+            progress(identifier, results[identifier])
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'commit': _git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'quick': quick,
+        'results': results
+    }
+
+def compare(baseline, current, threshold=0.10, metric='min_s'):
+    """
+    Rows (case, baseline s, current s, ratio, status) for the cases of the current report.
+
+    A case regresses when it is more than `threshold` slower (ratio above
+    1 + threshold) and improves when it is that much faster; cases missing
+    from the baseline are 'new'.
+    """
+    rows = []
+    for identifier, result in current['results'].items():
+        before = baseline['results'].get(identifier)
+        if before is None:
+            rows.append((identifier, None, result[metric], None, 'new'))
+            continue
+        ratio = result[metric] / before[metric] if before[metric] else float('inf')
+        if ratio > 1 + threshold:
+            status = 'REGRESSION'
+        elif ratio < 1 / (1 + threshold):
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((identifier, before[metric], result[metric], ratio, status))
+    return rows
+
+def _ms(seconds):
+    return '-' if seconds is None else f'{seconds * 1000:.3f}'
+
+def print_comparison(rows, threshold, not_run=0):
+    width = max((len(row[0]) for row in rows), default=10)
+    print(f"{'case':<{width}}  {'baseline ms':>12}  {'current ms':>12}  {'ratio':>7}  status")
+    for identifier, before, after, ratio, status in rows:
+        ratio_text = '-' if ratio is None else f'{ratio:.2f}x'
+        print(f'{identifier:<{width}}  {_ms(before):>12}  {_ms(after):>12}  {ratio_text:>7}  {status}')
+    regressions = sum(1 for row in rows if row[4] == 'REGRESSION')
+    print(f'\n{regressions} regression(s) over {threshold:.0%} in {len(rows)} case(s)')
+    if not_run:
+        print(f'{not_run} baseline case(s) not in this run')
+    return regressions
+
+def _load(path):
+    with open(path) as report_file:
+        return json.load(report_file)
+
+def _write(path, report):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as report_file:
+        json.dump(report, report_file, indent=2, ensure_ascii=False)
+        report_file.write('\n')
+
+def _report_comparison(baseline, current, args):
+    """Print the comparison table; returns the number of regressions"""
+    rows = compare(baseline, current, args.threshold, args.metric)
+    not_run = len(set(baseline['results']) - set(current['results']))
+    return print_comparison(rows, args.threshold, not_run)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--quick', action='store_true', help='fewer plazos and frequencies')
+    run_parser.add_argument('-k', dest='pattern', help='only cases whose id contains this text')
+    run_parser.add_argument('--no-pdf', action='store_true', help='skip the PDF generators')
+    run_parser.add_argument('--repeats', type=int, default=5, help='timed repeats per case (median reported)')
+    run_parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per repeat')
+    run_parser.add_argument('--output', metavar='PATH', help='write the results to PATH')
+    run_parser.add_argument('--save', action='store_true',
+                            help=f'write the results as the baseline ({os.path.relpath(BASELINE_PATH, ROOT)})')
+    run_parser.add_argument('--compare', action='store_true', help='compare the run with the baseline')
+    run_parser.add_argument('--threshold', type=float, default=0.10, help='slowdown flagged as regression (0.10 = 10%%)')
+
+    compare_parser = commands.add_parser('compare', help='compare results against a baseline')
+    compare_parser.add_argument('current', help='results JSON of the new run')
+    compare_parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline results JSON')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='slowdown flagged as regression (0.10 = 10%%)')
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument('--metric', choices=('min_s', 'median_s'), default='min_s',
+                                    help='figure compared against the baseline')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        return 1 if _report_comparison(_load(args.baseline), _load(args.current), args) else 0
+
+    def progress(identifier, result):
+        print(f"{identifier:<60} {result['median_s'] * 1000:>10.3f} ms  (x{result['loops']})", flush=True)
+
+    report = run_suite(args.quick, args.pattern, args.repeats, args.min_time, not args.no_pdf, progress)
+    if args.output:
+        _write(args.output, report)
+    if args.compare:
+        print()
+        regressions = _report_comparison(_load(BASELINE_PATH), report, args)
+    else:
+        regressions = 0
+    if args.save:
+        _write(BASELINE_PATH, report)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
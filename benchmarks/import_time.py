@@ -0,0 +1,125 @@
+"""
+Startup-time profile of a web worker
+
+Boots the app (create_app) in fresh interpreters under `python -X importtime`
+and reports the median boot time, peak memory, the packages that dominate
+import time and whether the heavy dependencies (pandas, numpy, ReportLab,
+matplotlib, Alembic) were loaded at boot.
+
+    python benchmarks/import_time.py                 # print the report
+    python benchmarks/import_time.py --save          # update benchmarks/results/import_time.json
+    python benchmarks/import_time.py --raw boot.txt  # keep one raw -X importtime log
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PATH = os.path.join(ROOT, 'benchmarks', 'results', 'import_time.json')
+
+HEAVY_MODULES = ('pandas', 'numpy', 'reportlab', 'matplotlib', 'alembic')
+
+# Runs in the child interpreter; prints one JSON line on stdout
+BOOT_SCRIPT = """
+import time
+started = time.perf_counter()
+import json, resource, sys
+from app import create_app
+create_app()
+print(json.dumps({
+    'boot_seconds': time.perf_counter() - started,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'loaded': {name: name in sys.modules for name in %r}
+}))
+""" % (HEAVY_MODULES,)
+
+def parse_importtime(log):
+    """
+    Cumulative import time (microseconds) per top-level package of an -X importtime log.
+
+    A package is counted where it is first entered from another package, so
+    "pandas" includes everything pandas imports while "app" includes pandas
+    too if app imported it.
+    """
+    entries = []
+    for line in log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip().split('.')[0], int(cumulative)))
+
+    # The log is post-order (children first); walk it parent-first
+    packages = {}
+    ancestors = []
+    for depth, package, cumulative in reversed(entries):
+        del ancestors[depth:]
+        if package not in ancestors:
+            packages[package] = packages.get(package, 0) + cumulative
+        ancestors.append(package)
+    return packages
+
+def boot_once(database_path):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database_path}', AUTOSAVE_ASYNC='false')
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result['packages'] = parse_importtime(process.stderr)
+    return result, process.stderr
+
+def profile_startup(runs=5, top=15, raw_path=None):
+    """Boot the app `runs` times and summarize the medians"""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, 'boot.db')
+        boot_once(database_path)  # first boot creates the tables and compiles bytecode
+        for run in range(runs):
+            result, log = boot_once(database_path)
+            results.append(result)
+            if raw_path and run == 0:
+                with open(raw_path, 'w') as raw:
+                    raw.write(log)
+
+    packages = {}
+    for result in results:
+        for package, micros in result['packages'].items():
+            packages.setdefault(package, []).append(micros)
+    ranking = sorted(
+        ((package, statistics.median(values) / 1000) for package, values in packages.items()),
+        key=lambda item: item[1], reverse=True
+    )
+
+    return {
+        'python': platform.python_version(),
+        'runs': runs,
+        'boot_seconds': round(statistics.median(r['boot_seconds'] for r in results), 4),
+        'max_rss_mb': round(statistics.median(r['max_rss_kb'] for r in results) / 1024, 1),
+        'loaded_at_boot': results[-1]['loaded'],
+        'top_imports_ms': {package: round(ms, 1) for package, ms in ranking[:top]}
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to boot (median reported)')
+    parser.add_argument('--top', type=int, default=15, help='packages listed in the import ranking')
+    parser.add_argument('--save', action='store_true', help=f'write the report to {os.path.relpath(RESULT_PATH, ROOT)}')
+    parser.add_argument('--raw', metavar='PATH', help='write the raw -X importtime log of one boot to PATH')
+    args = parser.parse_args(argv)
+
+    report = profile_startup(args.runs, args.top, args.raw)
+    output = json.dumps(report, indent=2, sort_keys=False)
+    print(output)
+    if args.save:
+        os.makedirs(os.path.dirname(RESULT_PATH), exist_ok=True)
+        with open(RESULT_PATH, 'w') as result_file:
+            result_file.write(output + '\n')
+
+if __name__ == '__main__':
+    main()
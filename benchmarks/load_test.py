@@ -0,0 +1,378 @@
+"""
+Load test of realistic user sessions against a locally started app
+
+Starts gunicorn (gunicorn.conf.py) on a fresh SQLite database, unless --url
+points to a running server, and runs virtual users that replay a full visit.
+Each virtual user registers an account once; every visit then does:
+
+    POST /login
+    GET  /cartera  -> POST /cartera                      (Módulo A, AJAX form)
+    GET  /escenarios-sensibilidad -> POST /api/calcular-escenario x N  (sliders)
+    GET  /jubilacion -> POST /jubilacion                 (Módulo B, AJAX form)
+    GET  /comparador-estrategias -> POST /api/comparar-estrategias
+    GET  /descargar-pdf/cartera, /descargar-pdf/jubilacion
+    GET  /perfil/dashboard -> /api/user/profile, /api/simulations?limit=5, /api/achievements
+    GET  /logout
+
+Each concurrency level runs for --duration seconds; the report lists, per
+endpoint, throughput, latency percentiles and the error rate (unexpected
+status codes, connection failures and JSON answers with "success": false).
+
+    python benchmarks/load_test.py                          # levels 1, 4, 16
+    python benchmarks/load_test.py -c 8 -c 32 --duration 60 --workers 4 --threads 8
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --output load.json
+
+The client runs on the same machine as the server: compare levels and
+configurations with each other rather than reading the numbers as the
+capacity of a dedicated host.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_LEVELS = (1, 4, 16)
+PERCENTILES = (50, 90, 95, 99)
+
+CSRF_PATTERN = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+class Client:
+    """One virtual user: a keep-alive connection and its session cookies"""
+
+    def __init__(self, base_url, recorder, timeout=60):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.recorder = recorder
+        self.timeout = timeout
+        self.cookies = {}
+        self.connection = None
+
+    def _connect(self):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def request(self, name, method, path, form=None, json_body=None, ajax=False, expect=200):
+        """Send one request, record it under `name` and return (status, body) or (None, None)"""
+        headers = {}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        elif json_body is not None:
+            body = json.dumps(json_body)
+            headers['Content-Type'] = 'application/json'
+        if ajax:
+            headers['X-Requested-With'] = 'XMLHttpRequest'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{key}={value}' for key, value in self.cookies.items())
+
+        started = time.perf_counter()
+        try:
+            connection = self._connect()
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException) as error:
+            self.close()
+            self.recorder.record(name, time.perf_counter() - started, f'{type(error).__name__}: {error}')
+            return None, None
+        elapsed = time.perf_counter() - started
+
+        for header in response.headers.get_all('Set-Cookie') or ():
+            for key, morsel in SimpleCookie(header).items():
+                self.cookies[key] = morsel.value
+
+        error = None
+        if response.status != expect:
+            # e.g. a redirect back to Módulo A or to /login means lost session state
+            error = f'HTTP {response.status}'
+        elif response.headers.get_content_type() == 'application/json':
+            try:
+                data = json.loads(payload)
+            except ValueError:
+                data = None
+            if isinstance(data, dict) and data.get('success') is False:
+                error = f"success=false: {data.get('error') or data.get('errors')}"
+        self.recorder.record(name, elapsed, error)
+        return response.status, payload
+
+    def page_csrf(self, name, path):
+        """GET a form page and return its CSRF token"""
+        _, payload = self.request(name, 'GET', path)
+        match = CSRF_PATTERN.search(payload.decode('utf-8', 'replace')) if payload else None
+        return match.group(1) if match else ''
+
+class Recorder:
+    """Thread-safe latency and error samples per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.error_examples = {}
+        self.sessions = 0
+
+    def record(self, name, seconds, error=None):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+            if error:
+                self.errors[name] = self.errors.get(name, 0) + 1
+                self.error_examples.setdefault(name, error[:200])
+
+    def session_done(self):
+        with self._lock:
+            self.sessions += 1
+
+def register(client, email, password):
+    """Create the virtual user's account (redirects to the dashboard)"""
+    client.request('POST /register', 'POST', '/register', expect=302, form={
+        'email': email, 'password': password, 'display_name': email.split('@')[0]
+    })
+
+def user_session(client, rng, sliders, email, password):
+    """One realistic visit through the simulator"""
+    client.request('POST /login', 'POST', '/login', form={'email': email, 'password': password}, expect=302)
+
+    frecuencia = rng.choice(['Mensual', 'Trimestral', 'Semestral', 'Anual'])
+    edad_actual = rng.randint(22, 50)
+    años = rng.randint(5, 40)
+
+    csrf = client.page_csrf('GET /cartera', '/cartera')
+    client.request('POST /cartera', 'POST', '/cartera', ajax=True, form={
+        'csrf_token': csrf, 'edad_actual': edad_actual, 'monto_inicial': rng.choice([0, 1000, 5000, 20000]),
+        'aporte_periodico': rng.choice([100, 250, 500, 1000]), 'frecuencia': frecuencia,
+        'tipo_plazo': 'años', 'años': años, 'edad_retiro': edad_actual + años, 'tea': rng.choice([5, 6.5, 8, 10])
+    })
+
+    # Dragging a slider sends one request per step
+    client.request('GET /escenarios-sensibilidad', 'GET', '/escenarios-sensibilidad')
+    for step in range(sliders):
+        variable = rng.choice(['tea_change', 'aporte_change', 'edad_retiro'])
+        value = edad_actual + años + rng.randint(-5, 5) if variable == 'edad_retiro' else rng.randint(-50, 50)
+        client.request('POST /api/calcular-escenario', 'POST', '/api/calcular-escenario', json_body={variable: value})
+
+    csrf = client.page_csrf('GET /jubilacion', '/jubilacion')
+    client.request('POST /jubilacion', 'POST', '/jubilacion', ajax=True, form={
+        'csrf_token': csrf, 'tipo_retiro': rng.choice(['pension', 'total', 'dividendos']),
+        'tipo_impuesto': rng.choice(['29.5', '5']), 'ingresos_adicionales': 0, 'costos_mensuales': 0,
+        'edad_jubilacion': edad_actual + años, 'usar_misma_tea': 'y', 'tea_retiro': 5
+    })
+
+    client.request('GET /comparador-estrategias', 'GET', '/comparador-estrategias')
+    client.request('POST /api/comparar-estrategias', 'POST', '/api/comparar-estrategias', json_body={
+        'estrategias': rng.sample(['conservative', 'moderate', 'aggressive', 'balanced', 'tech'], 3),
+        'rebalanceo': rng.choice(['none', 'Anual', 'Trimestral'])
+    })
+
+    client.request('GET /descargar-pdf/cartera', 'GET', '/descargar-pdf/cartera')
+    client.request('GET /descargar-pdf/jubilacion', 'GET', '/descargar-pdf/jubilacion')
+
+    # The dashboard page and its three fetches
+    client.request('GET /perfil/dashboard', 'GET', '/perfil/dashboard')
+    client.request('GET /api/user/profile', 'GET', '/api/user/profile')
+    client.request('GET /api/simulations', 'GET', '/api/simulations?limit=5')
+    client.request('GET /api/achievements', 'GET', '/api/achievements')
+
+    client.request('GET /logout', 'GET', '/logout', expect=302)
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+def summarize(recorder, elapsed, concurrency):
+    endpoints = {}
+    total = errors = 0
+    for name, samples in sorted(recorder.samples.items()):
+        samples = sorted(samples)
+        count = len(samples)
+        failed = recorder.errors.get(name, 0)
+        total += count
+        errors += failed
+        endpoints[name] = {
+            'requests': count,
+            'errors': failed,
+            'error_rate': failed / count,
+            'throughput_rps': count / elapsed,
+            'mean_ms': sum(samples) / count * 1000,
+            **{f'p{pct}_ms': percentile(samples, pct) * 1000 for pct in PERCENTILES},
+            'max_ms': samples[-1] * 1000
+        }
+        if name in recorder.error_examples:
+            endpoints[name]['error_example'] = recorder.error_examples[name]
+    return {
+        'concurrency': concurrency,
+        'duration_s': elapsed,
+        'sessions': recorder.sessions,
+        'requests': total,
+        'errors': errors,
+        'error_rate': errors / total if total else 0.0,
+        'throughput_rps': total / elapsed,
+        'sessions_per_s': recorder.sessions / elapsed,
+        'endpoints': endpoints
+    }
+
+def run_level(base_url, concurrency, duration, sliders, seed):
+    """Run `concurrency` virtual users for `duration` seconds"""
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    def virtual_user(index):
+        rng = random.Random(seed * 1000 + index)
+        client = Client(base_url, recorder)
+        email = f'load-{seed}-{concurrency}-{index}-{rng.getrandbits(32):08x}@example.com'
+        password = f'load-test-{index}'
+        try:
+            register(client, email, password)
+            while time.perf_counter() < deadline:
+                # Every visit starts from a new browser session and connection
+                client.close()
+                client.cookies = {}
+                user_session(client, rng, sliders, email, password)
+                recorder.session_done()
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=virtual_user, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(recorder, time.perf_counter() - started, concurrency)
+
+def print_level(summary):
+    print(f"\n== concurrency {summary['concurrency']}: {summary['throughput_rps']:.1f} req/s, "
+          f"{summary['sessions_per_s']:.2f} sessions/s, {summary['sessions']} sessions, "
+          f"errors {summary['errors']}/{summary['requests']} ({summary['error_rate']:.1%})")
+    width = max(len(name) for name in summary['endpoints']) if summary['endpoints'] else 10
+    header = ''.join(f'{f"p{pct} ms":>10}' for pct in PERCENTILES)
+    print(f"{'endpoint':<{width}}  {'req':>6}  {'req/s':>7}  {'err %':>6}{header}{'max ms':>10}")
+    for name, stats in summary['endpoints'].items():
+        values = ''.join(f"{stats[f'p{pct}_ms']:>10.1f}" for pct in PERCENTILES)
+        print(f"{name:<{width}}  {stats['requests']:>6}  {stats['throughput_rps']:>7.2f}  "
+              f"{stats['error_rate'] * 100:>6.1f}{values}{stats['max_ms']:>10.1f}")
+    for name, stats in summary['endpoints'].items():
+        if 'error_example' in stats:
+            print(f"  {name}: {stats['error_example']}")
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _wait_healthy(base_url, process, timeout=60):
+    parts = urlsplit(base_url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with status {process.returncode}')
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            connection.request('GET', '/healthz')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError('server did not become healthy')
+
+def start_server(directory, workers, threads, log_path):
+    """init-db on a fresh SQLite file, then gunicorn with gunicorn.conf.py; returns (url, process)"""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        FLASK_ENV='production',
+        SECRET_KEY=os.environ.get('SECRET_KEY', 'load-test-secret'),
+        DATABASE_URL=f"sqlite:///{os.path.join(directory, 'load.db')}",
+        PORT=str(port),
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        GUNICORN_ACCESS_LOG='',
+    )
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+    if threads:
+        env['GUNICORN_THREADS'] = str(threads)
+
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'run', 'init-db'],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+    gunicorn = shutil.which('gunicorn') or 'gunicorn'
+    log = open(log_path, 'w')
+    process = subprocess.Popen([gunicorn, '-c', 'gunicorn.conf.py', 'run:app'],
+                               cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f'http://127.0.0.1:{port}'
+    try:
+        _wait_healthy(url, process)
+    except Exception:
+        process.terminate()
+        raise
+    return url, process
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-c', '--concurrency', type=int, action='append',
+                        help=f'virtual users per level (repeatable; default {", ".join(map(str, DEFAULT_LEVELS))})')
+    parser.add_argument('--duration', type=float, default=20, help='seconds per concurrency level')
+    parser.add_argument('--sliders', type=int, default=8, help='/api/calcular-escenario requests per session')
+    parser.add_argument('--url', help='target an already running server instead of starting one')
+    parser.add_argument('--workers', type=int, help='WEB_CONCURRENCY of the started server')
+    parser.add_argument('--threads', type=int, help='GUNICORN_THREADS of the started server')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the virtual users\' inputs')
+    parser.add_argument('--output', metavar='PATH', help='write all levels as JSON to PATH')
+    args = parser.parse_args(argv)
+
+    levels = args.concurrency or list(DEFAULT_LEVELS)
+    with tempfile.TemporaryDirectory(prefix='load_test_') as directory:
+        process = None
+        url = args.url
+        if url is None:
+            log_path = os.path.join(directory, 'server.log')
+            url, process = start_server(directory, args.workers, args.threads, log_path)
+            print(f'Server started at {url} (SQLite in {directory})')
+        try:
+            summaries = []
+            for concurrency in levels:
+                summary = run_level(url, concurrency, args.duration, args.sliders, args.seed)
+                print_level(summary)
+                summaries.append(summary)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'url': args.url or 'local gunicorn',
+                'workers': args.workers, 'threads': args.threads,
+                'duration_s': args.duration, 'sliders': args.sliders,
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'levels': summaries
+            }, output, indent=2)
+            output.write('\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
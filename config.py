@@ -1,9 +1,31 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+def build_engine_options(database_uri, pool_size, max_overflow, pool_recycle, pool_timeout, sqlite_busy_timeout):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for the configured database backend"""
+    if database_uri.startswith('sqlite'):
+        # sqlite3's own busy handler; WAL and PRAGMA busy_timeout are set on connect (app.monitoring)
+        options = {'connect_args': {'timeout': sqlite_busy_timeout / 1000}}
+        if ':memory:' not in database_uri and database_uri != 'sqlite://':
+            options.update({
+                'pool_size': pool_size,
+                'max_overflow': max_overflow,
+                'pool_timeout': pool_timeout
+            })
+        return options
+
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': True
+    }
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -24,16 +46,90 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
 
+    # Connection pool settings (overridable per environment via env vars)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_WAL = True
+
+    # Pool checkout wait / saturation telemetry
+    DB_POOL_TELEMETRY = True
+
+    # Request latency, SQL and calculation-phase metrics (served on /metrics)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    # /metrics and /internal/db-pool require "Authorization: Bearer <token>" (or
+    # X-Internal-Token); without a token configured both answer 404
+    INTERNAL_METRICS_TOKEN = os.environ.get('INTERNAL_METRICS_TOKEN')
+
+    # On-demand request profiling: every request (optionally only PROFILE_ENDPOINTS)
+    # when PROFILING_ENABLED, or requests with an X-Profile-Token signed with PROFILE_SECRET
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_SECRET = os.environ.get('PROFILE_SECRET')
+    PROFILE_ENDPOINTS = [e.strip() for e in os.environ.get('PROFILE_ENDPOINTS', '').split(',') if e.strip()]
+    PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'simulador_profiles')
+    PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 50))
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', 5))
+
+    # Schema bootstrap: tables and seed data come from "flask init-db" (once per deploy).
+    # DB_AUTO_INIT runs it on every app creation instead (development convenience);
+    # DB_CHECK_MIGRATIONS compares the database with the Alembic head once per process
+    DB_AUTO_INIT = os.environ.get('DB_AUTO_INIT', 'false').lower() == 'true'
+    DB_CHECK_MIGRATIONS = os.environ.get('DB_CHECK_MIGRATIONS', 'false').lower() == 'true'
+
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(
+        SQLALCHEMY_DATABASE_URI, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+        DB_POOL_RECYCLE, DB_POOL_TIMEOUT, SQLITE_BUSY_TIMEOUT_MS
+    )
+
+    # Auto-saved simulations are written by a background thread in batches
+    AUTOSAVE_ASYNC = os.environ.get('AUTOSAVE_ASYNC', 'true').lower() == 'true'
+    AUTOSAVE_QUEUE_SIZE = int(os.environ.get('AUTOSAVE_QUEUE_SIZE', 1000))
+    AUTOSAVE_BATCH_SIZE = int(os.environ.get('AUTOSAVE_BATCH_SIZE', 50))
+    AUTOSAVE_FLUSH_INTERVAL = float(os.environ.get('AUTOSAVE_FLUSH_INTERVAL', 0.5))
+
+    # Community statistics are materialized; refreshed after writes once older than this (seconds)
+    COMMUNITY_STATS_MAX_AGE = int(os.environ.get('COMMUNITY_STATS_MAX_AGE', 300))
+
+    # Retention job (flask retention): anonymous user TTL, auto-save compaction age, rows per transaction
+    RETENTION_ANONYMOUS_TTL_DAYS = int(os.environ.get('RETENTION_ANONYMOUS_TTL_DAYS', 30))
+    RETENTION_COMPACT_AFTER_DAYS = int(os.environ.get('RETENTION_COMPACT_AFTER_DAYS', 90))
+    RETENTION_CHUNK_SIZE = int(os.environ.get('RETENTION_CHUNK_SIZE', 500))
+
+    # Chart series sent to the browser are downsampled (LTTB or yearly) to at most this many points
+    CHART_MAX_POINTS = int(os.environ.get('CHART_MAX_POINTS', 200))
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     SECRET_KEY = 'dev-secret-key'
 
+    # "python run.py" on a fresh checkout creates its SQLite schema
+    DB_AUTO_INIT = os.environ.get('DB_AUTO_INIT', 'true').lower() == 'true'
+
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 2))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 3))
+
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(
+        Config.SQLALCHEMY_DATABASE_URI, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+        Config.DB_POOL_RECYCLE, Config.DB_POOL_TIMEOUT, Config.SQLITE_BUSY_TIMEOUT_MS
+    )
+
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     SECRET_KEY = os.environ.get('SECRET_KEY')
 
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 300))
+
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(
+        Config.SQLALCHEMY_DATABASE_URI, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+        DB_POOL_RECYCLE, Config.DB_POOL_TIMEOUT, Config.SQLITE_BUSY_TIMEOUT_MS
+    )
+
 # Configuration dictionary
 config = {
     'development': DevelopmentConfig,
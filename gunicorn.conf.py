@@ -0,0 +1,57 @@
+"""
+Gunicorn configuration for production (gunicorn -c gunicorn.conf.py run:app)
+
+Every setting can be overridden from the environment. Defaults: threaded
+workers (requests mostly wait on the database or build PDFs), the app
+preloaded in the master so workers share the imported modules, and workers
+recycled after a jittered number of requests to bound memory growth.
+"""
+import multiprocessing
+import os
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() == 'true'
+
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# WEB_CONCURRENCY is the variable most PaaS (Render, Heroku) size for the instance
+workers = _env_int('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = _env_int('GUNICORN_THREADS', 4)
+
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+
+# Recycle workers; the jitter keeps them from restarting all at once
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# PDF reports can take a few seconds on small instances
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# Warm each worker's caches right after the fork
+_warmup = _env_bool('GUNICORN_WARMUP', True)
+
+def when_ready(server):
+    """Master, before the first fork: import the heavy modules once so workers share them"""
+    if server.cfg.preload_app and _warmup:
+        from app.worker import preload_modules
+        preload_modules()
+
+def post_fork(server, worker):
+    """Worker, right after the fork: reset inherited pools and warm the caches"""
+    from app.worker import reset_after_fork, warm_caches
+
+    app = worker.app.wsgi()
+    reset_after_fork(app)
+    if _warmup:
+        seconds = warm_caches(app)
+        server.log.info('Worker %s warmed up in %.2fs', worker.pid, seconds)
@@ -0,0 +1,142 @@
+"""baseline schema
+
+Tables as they were before the first revision. Databases created earlier by
+db.create_all() already have them and are left untouched.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.schema import has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not has_table(bind, 'achievements'):
+        op.create_table('achievements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('icon', sa.String(length=50), nullable=True),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('criteria_type', sa.String(length=50), nullable=False),
+        sa.Column('criteria_value', sa.Integer(), nullable=False),
+        sa.Column('criteria_target', sa.String(length=50), nullable=False),
+        sa.Column('rarity', sa.String(length=20), nullable=True),
+        sa.Column('points', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if not has_table(bind, 'users'):
+        op.create_table('users',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_active', sa.DateTime(), nullable=True),
+        sa.Column('email', sa.String(length=120), nullable=True),
+        sa.Column('password_hash', sa.String(length=128), nullable=True),
+        sa.Column('display_name', sa.String(length=50), nullable=True),
+        sa.Column('is_registered', sa.Boolean(), nullable=True),
+        sa.Column('preferences', sa.JSON(), nullable=True),
+        sa.Column('total_simulations', sa.Integer(), nullable=True),
+        sa.Column('total_templates_created', sa.Integer(), nullable=True),
+        sa.Column('total_achievements', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email', name='unique_user_email')
+        )
+    if not has_table(bind, 'simulations'):
+        op.create_table('simulations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('module_type', sa.String(length=20), nullable=False),
+        sa.Column('input_data', sa.JSON(), nullable=False),
+        sa.Column('results_data', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('is_favorite', sa.Boolean(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if not has_table(bind, 'templates'):
+        op.create_table('templates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('creator_id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('module_type', sa.String(length=20), nullable=False),
+        sa.Column('template_data', sa.JSON(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=True),
+        sa.Column('tags', sa.JSON(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=True),
+        sa.Column('upvotes', sa.Integer(), nullable=True),
+        sa.Column('downvotes', sa.Integer(), nullable=True),
+        sa.Column('views', sa.Integer(), nullable=True),
+        sa.Column('downloads', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['creator_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if not has_table(bind, 'user_achievements'):
+        op.create_table('user_achievements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('achievement_id', sa.Integer(), nullable=False),
+        sa.Column('current_value', sa.Integer(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['achievement_id'], ['achievements.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'achievement_id', name='unique_user_achievement')
+        )
+    if not has_table(bind, 'simulation_shares'):
+        op.create_table('simulation_shares',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('simulation_id', sa.Integer(), nullable=False),
+        sa.Column('shared_by_user_id', sa.String(length=36), nullable=False),
+        sa.Column('share_type', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('views', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['shared_by_user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['simulation_id'], ['simulations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if not has_table(bind, 'template_votes'):
+        op.create_table('template_votes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('template_id', sa.Integer(), nullable=False),
+        sa.Column('vote_type', sa.String(length=10), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['template_id'], ['templates.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'template_id', name='unique_user_template_vote')
+        )
+
+
+def downgrade():
+    op.drop_table('template_votes')
+    op.drop_table('simulation_shares')
+    op.drop_table('user_achievements')
+    op.drop_table('templates')
+    op.drop_table('simulations')
+    op.drop_table('users')
+    op.drop_table('achievements')
@@ -0,0 +1,27 @@
+"""simulation listing keyset index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.schema import has_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_index(op.get_bind(), 'simulations', 'ix_simulations_user_updated'):
+        op.create_index('ix_simulations_user_updated', 'simulations', ['user_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_simulations_user_updated', table_name='simulations')
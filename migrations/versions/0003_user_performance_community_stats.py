@@ -0,0 +1,131 @@
+"""user performance average and materialized community statistics
+
+Backfills users.avg_performance / performance_samples from the saved
+simulations and materializes the community_stats row from them (what
+`flask refresh-community-stats` computes).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.schema import has_column, has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+users = sa.table(
+    'users',
+    sa.column('id', sa.String),
+    sa.column('avg_performance', sa.Float),
+    sa.column('performance_samples', sa.Integer)
+)
+simulations = sa.table(
+    'simulations',
+    sa.column('id', sa.Integer),
+    sa.column('user_id', sa.String),
+    sa.column('results_data', sa.JSON)
+)
+community_stats = sa.table(
+    'community_stats',
+    sa.column('id', sa.Integer),
+    sa.column('total_users', sa.Integer),
+    sa.column('total_simulations', sa.Integer),
+    sa.column('avg_simulations_per_user', sa.Float),
+    sa.column('avg_performance', sa.Float),
+    sa.column('refreshed_at', sa.DateTime)
+)
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    bind = op.get_bind()
+    added_columns = not has_column(bind, 'users', 'avg_performance')
+    if added_columns:
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.add_column(sa.Column('avg_performance', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('performance_samples', sa.Integer(), nullable=True))
+
+    if not has_table(bind, 'community_stats'):
+        op.create_table('community_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('total_users', sa.Integer(), nullable=True),
+        sa.Column('total_simulations', sa.Integer(), nullable=True),
+        sa.Column('avg_simulations_per_user', sa.Float(), nullable=True),
+        sa.Column('avg_performance', sa.Float(), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    # Columns that already existed are kept up to date by the application
+    if added_columns:
+        backfill_performance(bind)
+        refresh_community_stats(bind)
+
+
+def backfill_performance(bind):
+    """Recompute every user's average 'rentabilidad' from their saved simulations"""
+    from app.models import get_simulation_performance
+
+    totals = defaultdict(float)
+    counts = defaultdict(int)
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(simulations.c.id, simulations.c.user_id, simulations.c.results_data)
+            .where(simulations.c.id > last_id)
+            .order_by(simulations.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            rentabilidad = get_simulation_performance(row.results_data)
+            if rentabilidad is not None:
+                totals[row.user_id] += rentabilidad
+                counts[row.user_id] += 1
+        last_id = rows[-1].id
+
+    bind.execute(users.update().values(avg_performance=0.0, performance_samples=0))
+    for user_id, count in counts.items():
+        bind.execute(
+            users.update().where(users.c.id == user_id)
+            .values(avg_performance=totals[user_id] / count, performance_samples=count)
+        )
+
+
+def refresh_community_stats(bind):
+    """Materialize the singleton community_stats row (id 1)"""
+    total_users = bind.execute(sa.select(sa.func.count()).select_from(users)).scalar() or 0
+    total_simulations = bind.execute(sa.select(sa.func.count()).select_from(simulations)).scalar() or 0
+    avg_performance = bind.execute(
+        sa.select(sa.func.avg(users.c.avg_performance)).where(users.c.performance_samples > 0)
+    ).scalar() or 0.0
+
+    bind.execute(community_stats.delete())
+    bind.execute(community_stats.insert().values(
+        id=1,
+        total_users=total_users,
+        total_simulations=total_simulations,
+        avg_simulations_per_user=total_simulations / total_users if total_users > 0 else 0,
+        avg_performance=float(avg_performance),
+        refreshed_at=datetime.utcnow()
+    ))
+
+
+def downgrade():
+    op.drop_table('community_stats')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('performance_samples')
+        batch_op.drop_column('avg_performance')
@@ -0,0 +1,93 @@
+"""template popularity score and ranking indexes
+
+Backfills the scores of existing templates (what `flask refresh-template-scores`
+computes) so the ranked catalog does not start with every score at zero.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 09:15:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.schema import has_column, has_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+templates = sa.table(
+    'templates',
+    sa.column('id', sa.Integer),
+    sa.column('upvotes', sa.Integer),
+    sa.column('downvotes', sa.Integer),
+    sa.column('views', sa.Integer),
+    sa.column('downloads', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+    sa.column('popularity_score', sa.Float),
+    sa.column('score_updated_at', sa.DateTime)
+)
+
+INDEXES = (
+    ('ix_templates_public_score', ['is_public', 'popularity_score', 'id']),
+    ('ix_templates_creator_score', ['creator_id', 'popularity_score', 'id']),
+    ('ix_templates_score_updated', ['score_updated_at']),
+)
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    bind = op.get_bind()
+    added_columns = not has_column(bind, 'templates', 'popularity_score')
+    if added_columns:
+        with op.batch_alter_table('templates') as batch_op:
+            batch_op.add_column(sa.Column('popularity_score', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('score_updated_at', sa.DateTime(), nullable=True))
+
+    for name, columns in INDEXES:
+        if not has_index(bind, 'templates', name):
+            op.create_index(name, 'templates', columns, unique=False)
+
+    # Columns that already existed are kept up to date by the application
+    if added_columns:
+        backfill_scores(bind)
+
+
+def backfill_scores(bind):
+    """Score every template with the time-decayed popularity formula"""
+    from app.models import compute_template_score
+
+    now = datetime.utcnow()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(templates.c.id, templates.c.upvotes, templates.c.downvotes, templates.c.views,
+                      templates.c.downloads, templates.c.created_at)
+            .where(templates.c.id > last_id)
+            .order_by(templates.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            score = compute_template_score(row.upvotes, row.downvotes, row.views, row.downloads, row.created_at, now)
+            bind.execute(
+                templates.update().where(templates.c.id == row.id)
+                .values(popularity_score=score, score_updated_at=now)
+            )
+        last_id = rows[-1].id
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='templates')
+    with op.batch_alter_table('templates') as batch_op:
+        batch_op.drop_column('score_updated_at')
+        batch_op.drop_column('popularity_score')
@@ -0,0 +1,137 @@
+"""simulation auto-save deduplication and shared result blobs
+
+Existing rows get their input_hash, and auto-saves are recognised by the
+name/description the calculation endpoints give them, so dedup and the
+retention job see pre-existing history too. results_data stays inline for
+existing rows (result_id is only set for new saves).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.schema import has_column, has_index, has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+simulations = sa.table(
+    'simulations',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('description', sa.Text),
+    sa.column('input_data', sa.JSON),
+    sa.column('input_hash', sa.String),
+    sa.column('is_autosave', sa.Boolean)
+)
+
+# What /cartera has always stored for its automatic saves
+AUTOSAVE_NAME_PREFIX = 'Simulación Cartera - '
+AUTOSAVE_DESCRIPTION = 'Cálculo automático de crecimiento de cartera'
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not has_table(bind, 'simulation_results'):
+        op.create_table('simulation_results',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('results_data', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if not has_index(bind, 'simulation_results', 'ix_simulation_results_content_hash'):
+        op.create_index('ix_simulation_results_content_hash', 'simulation_results', ['content_hash'], unique=True)
+
+    added_autosave = not has_column(bind, 'simulations', 'is_autosave')
+    results_nullable = next(
+        c['nullable'] for c in sa.inspect(bind).get_columns('simulations') if c['name'] == 'results_data'
+    )
+    with op.batch_alter_table('simulations') as batch_op:
+        if not has_column(bind, 'simulations', 'input_hash'):
+            batch_op.add_column(sa.Column('input_hash', sa.String(length=64), nullable=True))
+        if not has_column(bind, 'simulations', 'result_id'):
+            batch_op.add_column(sa.Column('result_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                'fk_simulations_result_id', 'simulation_results', ['result_id'], ['id']
+            )
+        if added_autosave:
+            batch_op.add_column(sa.Column('is_autosave', sa.Boolean(), nullable=True))
+        if not has_column(bind, 'simulations', 'compacted_at'):
+            batch_op.add_column(sa.Column('compacted_at', sa.DateTime(), nullable=True))
+        if not results_nullable:
+            batch_op.alter_column('results_data', existing_type=sa.JSON(), nullable=True)
+
+    if not has_index(bind, 'simulations', 'ix_simulations_user_module_hash'):
+        op.create_index('ix_simulations_user_module_hash', 'simulations',
+                        ['user_id', 'module_type', 'input_hash'], unique=False)
+    if not has_index(bind, 'simulations', 'ix_simulations_autosave_updated'):
+        op.create_index('ix_simulations_autosave_updated', 'simulations',
+                        ['is_autosave', 'updated_at', 'id'], unique=False)
+
+    if added_autosave:
+        backfill_autosave(bind)
+    backfill_input_hash(bind)
+
+
+def backfill_autosave(bind):
+    """Flag the rows stored by the automatic save of the portfolio module"""
+    bind.execute(simulations.update().values(is_autosave=False))
+    bind.execute(
+        simulations.update()
+        .where(simulations.c.description == AUTOSAVE_DESCRIPTION)
+        .where(simulations.c.name.startswith(AUTOSAVE_NAME_PREFIX, autoescape=True))
+        .values(is_autosave=True)
+    )
+
+
+def backfill_input_hash(bind):
+    """Hash the inputs of rows saved before input_hash existed"""
+    from app.models import compute_content_hash
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(simulations.c.id, simulations.c.input_data)
+            .where(simulations.c.input_hash.is_(None))
+            .where(simulations.c.id > last_id)
+            .order_by(simulations.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            bind.execute(
+                simulations.update().where(simulations.c.id == row.id)
+                .values(input_hash=compute_content_hash(row.input_data))
+            )
+        last_id = rows[-1].id
+
+
+def downgrade():
+    # Rows whose results only live in simulation_results cannot go back to NOT NULL
+    op.execute(
+        'UPDATE simulations SET results_data = '
+        '(SELECT results_data FROM simulation_results WHERE simulation_results.id = simulations.result_id) '
+        'WHERE results_data IS NULL AND result_id IS NOT NULL'
+    )
+    op.drop_index('ix_simulations_autosave_updated', table_name='simulations')
+    op.drop_index('ix_simulations_user_module_hash', table_name='simulations')
+    with op.batch_alter_table('simulations') as batch_op:
+        batch_op.alter_column('results_data', existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_constraint('fk_simulations_result_id', type_='foreignkey')
+        batch_op.drop_column('compacted_at')
+        batch_op.drop_column('is_autosave')
+        batch_op.drop_column('result_id')
+        batch_op.drop_column('input_hash')
+    op.drop_index('ix_simulation_results_content_hash', table_name='simulation_results')
+    op.drop_table('simulation_results')
@@ -0,0 +1,27 @@
+"""retention job index on users
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 09:25:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.schema import has_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_index(op.get_bind(), 'users', 'ix_users_registered_last_active'):
+        op.create_index('ix_users_registered_last_active', 'users', ['is_registered', 'last_active'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_registered_last_active', table_name='users')
@@ -0,0 +1,46 @@
+"""user performance sum
+
+avg_performance is now derived from a stored sum and count that are updated
+atomically; existing users get the sum their average and count imply.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.schema import has_column
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+users = sa.table(
+    'users',
+    sa.column('avg_performance', sa.Float),
+    sa.column('performance_total', sa.Float),
+    sa.column('performance_samples', sa.Integer)
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if has_column(bind, 'users', 'performance_total'):
+        return
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('performance_total', sa.Float(), nullable=True))
+
+    bind.execute(users.update().values(
+        performance_total=sa.func.coalesce(users.c.avg_performance, 0.0) * sa.func.coalesce(users.c.performance_samples, 0)
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('performance_total')
@@ -0,0 +1,52 @@
+"""user achievement notified_at
+
+Achievements awarded by the background auto-save writer are reported from
+the database instead of one worker's memory; achievements completed before
+this revision count as already reported.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.schema import has_column
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+user_achievements = sa.table(
+    'user_achievements',
+    sa.column('is_completed', sa.Boolean),
+    sa.column('completed_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+    sa.column('notified_at', sa.DateTime)
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if has_column(bind, 'user_achievements', 'notified_at'):
+        return
+
+    with op.batch_alter_table('user_achievements') as batch_op:
+        batch_op.add_column(sa.Column('notified_at', sa.DateTime(), nullable=True))
+
+    bind.execute(user_achievements.update().where(
+        user_achievements.c.is_completed == sa.true()
+    ).values(
+        notified_at=sa.func.coalesce(
+            user_achievements.c.completed_at, user_achievements.c.updated_at, sa.func.current_timestamp()
+        )
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('user_achievements') as batch_op:
+        batch_op.drop_column('notified_at')
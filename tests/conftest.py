@@ -0,0 +1,51 @@
+"""
+Shared fixtures: one application on a throwaway SQLite database, with the
+tables recreated for every test
+"""
+import os
+import tempfile
+
+import pytest
+
+# Config reads the environment at import time, so this must run before "import app"
+_db_dir = tempfile.mkdtemp(prefix='simulador_tests_')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'test.db')
+os.environ['DB_AUTO_INIT'] = 'false'
+os.environ['AUTOSAVE_ASYNC'] = 'false'
+os.environ['PROFILING_ENABLED'] = 'false'
+os.environ.pop('PROFILE_SECRET', None)
+os.environ.pop('INTERNAL_METRICS_TOKEN', None)
+
+from app import create_app  # noqa: E402
+from app.models import db, User  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app('development')
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def database(app):
+    with app.app_context():
+        db.create_all()
+        yield db
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user():
+    def make_user(**fields):
+        user = User(**fields)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
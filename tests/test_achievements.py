@@ -0,0 +1,59 @@
+from sqlalchemy import event
+
+from app import seed_achievements
+from app.models import Simulation, UserAchievement, check_achievements, db, get_active_achievements
+
+
+def add_simulations(user, count):
+    for number in range(count):
+        db.session.add(Simulation(
+            user_id=user.id, name=f'Simulación {number}', module_type='cartera',
+            input_data={'n': number}, results_data={}
+        ))
+    db.session.commit()
+
+
+def count_selects(action):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = action()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return result, statements
+
+
+def test_check_achievements_does_not_query_per_achievement(make_user):
+    seed_achievements()
+    definitions = get_active_achievements()
+    user = make_user()
+    add_simulations(user, 1)
+
+    awarded, selects = count_selects(lambda: check_achievements(user.id))
+
+    # The user, their progress rows and the simulation count, however many achievements exist
+    assert len(definitions) > 3
+    assert len(selects) == 3
+    assert 'Primer Cálculo' in [a['name'] for a in awarded]
+    assert UserAchievement.query.filter_by(user_id=user.id).count() == len(definitions)
+
+
+def test_check_achievements_awards_each_achievement_once(make_user):
+    seed_achievements()
+    user = make_user()
+    add_simulations(user, 1)
+    first = check_achievements(user.id)
+
+    add_simulations(user, 9)
+    second = check_achievements(user.id)
+
+    assert 'Analista Experto' in [a['name'] for a in second]
+    assert not {a['id'] for a in first} & {a['id'] for a in second}
+    progress = UserAchievement.query.filter_by(user_id=user.id).all()
+    earned = next(a['id'] for a in second if a['name'] == 'Analista Experto')
+    assert next(ua for ua in progress if ua.achievement_id == earned).current_value == 10
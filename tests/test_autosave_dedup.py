@@ -0,0 +1,57 @@
+from app.models import Simulation, compute_content_hash, db, save_autosaved_simulation
+
+INPUTS = {'edad_actual': 30, 'monto_inicial': 1000.0, 'tea': 8.0, 'años': 10}
+RESULTS = {'resumen': {'rentabilidad': 12.5, 'saldo_final': 2000.0}}
+
+
+def autosave(user_id, input_data=INPUTS, module_type='cartera'):
+    simulation, created = save_autosaved_simulation(
+        user_id=user_id, name='Simulación Cartera', description='Cálculo automático de crecimiento de cartera',
+        module_type=module_type, input_data=input_data, results_data=RESULTS
+    )
+    db.session.commit()
+    return simulation, created
+
+
+def test_identical_inputs_bump_the_existing_autosave(make_user):
+    user = make_user()
+    first, created = autosave(user.id)
+    assert created
+
+    second, created = autosave(user.id, dict(INPUTS))
+    assert not created
+    assert second.id == first.id
+    assert Simulation.query.filter_by(user_id=user.id).count() == 1
+
+
+def test_different_inputs_module_or_user_create_new_rows(make_user):
+    user, other = make_user(), make_user()
+    autosave(user.id)
+
+    assert autosave(user.id, dict(INPUTS, tea=9.0))[1]
+    assert autosave(user.id, module_type='jubilacion')[1]
+    assert autosave(other.id)[1]
+
+
+def test_manual_saves_are_not_deduplicated_against(make_user):
+    user = make_user()
+    manual = Simulation(
+        user_id=user.id, name='Mi plan', module_type='cartera', input_data=INPUTS,
+        input_hash=compute_content_hash(INPUTS), results_data=RESULTS, is_autosave=False
+    )
+    db.session.add(manual)
+    db.session.commit()
+
+    simulation, created = autosave(user.id)
+    assert created
+    assert simulation.id != manual.id
+    assert simulation.is_autosave
+
+
+def test_identical_results_share_one_blob(make_user):
+    first, _ = autosave(make_user().id)
+    second, _ = autosave(make_user().id)
+
+    assert first.result_id is not None
+    assert first.result_id == second.result_id
+    assert second.results == RESULTS
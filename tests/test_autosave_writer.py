@@ -0,0 +1,56 @@
+from app.autosave import SimulationWriter, save_simulation_async
+from app.models import Simulation, User, UserAchievement, db, pop_unnotified_achievements
+
+
+def item(user_id, number, **fields):
+    return dict({
+        'user_id': user_id, 'name': f'Simulación {number}', 'module_type': 'cartera',
+        'input_data': {'n': number}, 'results_data': {'resumen': {'rentabilidad': 10.0}}
+    }, **fields)
+
+
+def test_batch_is_written_and_user_stats_updated(app, make_user):
+    user = make_user()
+    SimulationWriter(app).write_batch([item(user.id, 1), item(user.id, 2), item(user.id, 1)])
+
+    db.session.expire_all()
+    assert Simulation.query.count() == 2
+    assert db.session.get(User, user.id).total_simulations == 2
+
+
+def test_one_bad_item_does_not_discard_the_batch(app, make_user, caplog):
+    user = make_user()
+    batch = [item(user.id, 1), item(user.id, 2, name=None), item(user.id, 3)]
+
+    SimulationWriter(app).write_batch(batch)
+
+    db.session.expire_all()
+    assert sorted(s.name for s in Simulation.query) == ['Simulación 1', 'Simulación 3']
+    assert db.session.get(User, user.id).performance_samples == 2
+    failures = [r for r in caplog.records if r.getMessage().startswith('Auto-save failed')]
+    assert len(failures) == 1
+
+
+def test_awarded_achievements_are_reported_once_from_the_database(app, make_user):
+    from app import seed_achievements
+    seed_achievements()
+    user = make_user()
+
+    SimulationWriter(app).write_batch([item(user.id, 1)])
+
+    # Any worker sees them: nothing is kept in the writer's memory
+    awarded = pop_unnotified_achievements(user.id)
+    assert awarded
+    assert pop_unnotified_achievements(user.id) == []
+    assert UserAchievement.query.filter_by(user_id=user.id, is_completed=True, notified_at=None).count() == 0
+
+
+def test_achievements_shown_right_away_are_not_reported_again(app, make_user):
+    from app import seed_achievements
+    seed_achievements()
+    user = make_user()
+
+    awarded = save_simulation_async(item(user.id, 1))
+
+    assert awarded
+    assert pop_unnotified_achievements(user.id) == []
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.chart_series import bond_series, lttb_indices, portfolio_series, yearly_indices
+
+
+def portfolio_frame(periods):
+    periodo = np.arange(periods + 1)
+    aportes = 1000.0 + 100.0 * periodo
+    return pd.DataFrame({
+        'Periodo': periodo,
+        'Saldo Final': aportes * 1.005 ** periodo,
+        'Aportes Acumulados': aportes,
+        'Interés': np.r_[0.0, np.full(periods, 5.0)]
+    })
+
+
+def bond_frame(periods):
+    periodo = np.arange(1, periods + 1)
+    flujo = np.full(periods, 30.0)
+    flujo[-1] += 1000.0
+    return pd.DataFrame({'Periodo': periodo, 'Flujo (USD)': flujo, 'Valor Presente (USD)': flujo * 0.9})
+
+
+@pytest.mark.parametrize('n, max_points', [(1000, 50), (101, 3), (10, 10), (5, 100)])
+def test_lttb_keeps_endpoints_and_length(n, max_points):
+    x = np.arange(n)
+    indices = lttb_indices(x, np.sin(x / 10.0), max_points)
+
+    assert len(indices) == min(n, max_points)
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(500)
+    y[337] = 100.0
+    assert 337 in lttb_indices(np.arange(500), y, 20)
+
+
+def test_yearly_indices_keep_year_ends_and_last_period():
+    assert list(yearly_indices(np.arange(30), 12)) == [0, 12, 24, 29]
+
+
+def test_auto_prefers_full_then_yearly_then_lttb():
+    assert portfolio_series(portfolio_frame(100), 'Mensual', max_points=200)['metodo'] == 'completo'
+
+    yearly = portfolio_series(portfolio_frame(600), 'Mensual', max_points=200)
+    assert yearly['metodo'] == 'anual'
+    assert yearly['puntos'] == 51
+
+    lttb = portfolio_series(portfolio_frame(600), 'Mensual', max_points=20)
+    assert lttb['metodo'] == 'lttb'
+    assert lttb['puntos'] == 20
+    assert lttb['periodo'][0] == 0 and lttb['periodo'][-1] == 600
+
+
+def test_explicit_yearly_method_still_respects_max_points():
+    serie = portfolio_series(portfolio_frame(1200), 'Mensual', max_points=10, method='anual')
+    assert serie['metodo'] == 'anual'
+    assert serie['puntos'] == 10
+    assert serie['periodo'][0] == 0 and serie['periodo'][-1] == 1200
+    assert all(len(values) == 10 for key, values in serie.items() if isinstance(values, list))
+
+    bonds = bond_series(bond_frame(200), 'Semestral', max_points=10, method='anual')
+    assert bonds['puntos'] == 10
+    assert bonds['periodo'][0] == 1 and bonds['periodo'][-1] == 100
+
+
+def test_yearly_bond_series_sums_each_year():
+    serie = bond_series(bond_frame(4), 'Semestral', method='anual')
+    assert serie['periodo'] == [1, 2]
+    assert serie['flujo'] == [60.0, 1060.0]
+
+
+def test_chart_series_endpoint_caps_points(client):
+    client.post('/cartera', data={
+        'edad_actual': 25, 'monto_inicial': 1000, 'aporte_periodico': 100, 'frecuencia': 'Mensual',
+        'tipo_plazo': 'años', 'años': 40, 'tea': 8
+    }, headers={'X-Requested-With': 'XMLHttpRequest'})
+
+    for metodo in ('auto', 'lttb', 'anual'):
+        grafica = client.get(f'/api/grafica/cartera?puntos=12&metodo={metodo}').get_json()['grafica']
+        assert grafica['puntos'] <= 12
+
+    assert client.get('/api/grafica/cartera?puntos=2').get_json()['success'] is False
@@ -0,0 +1,12 @@
+from utils.graficos import HUSL_PALETTE, _figure_pool, get_matplotlib
+
+
+def test_charts_keep_the_husl_colour_cycle():
+    colors = get_matplotlib().colors
+
+    with _figure_pool.figure((4, 3), 50) as fig:
+        ax = fig.add_subplot()
+        first, second = ax.plot([0, 1], [0, 1]) + ax.plot([0, 1], [1, 0])
+
+        assert colors.to_hex(first.get_color()) == HUSL_PALETTE[0]
+        assert colors.to_hex(second.get_color()) == HUSL_PALETTE[1]
@@ -0,0 +1,38 @@
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from flask_migrate import Migrate, downgrade, upgrade
+
+from app.models import db
+from app.schema import MIGRATIONS_DIR, pending_migrations_message
+
+
+def schema_differences():
+    with db.engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection), db.metadata)
+
+
+def test_revisions_build_the_model_schema(app):
+    Migrate(app, db, directory=MIGRATIONS_DIR)
+    db.drop_all()
+    try:
+        upgrade()
+        assert schema_differences() == []
+        assert pending_migrations_message() is None
+
+        downgrade(revision='base')
+        upgrade()
+        assert schema_differences() == []
+    finally:
+        db.session.execute(db.text('DROP TABLE IF EXISTS alembic_version'))
+        db.session.commit()
+
+
+def test_revisions_upgrade_a_create_all_database(app):
+    # Databases bootstrapped by "flask init-db" before migrations existed
+    Migrate(app, db, directory=MIGRATIONS_DIR)
+    try:
+        upgrade()
+        assert schema_differences() == []
+    finally:
+        db.session.execute(db.text('DROP TABLE IF EXISTS alembic_version'))
+        db.session.commit()
@@ -0,0 +1,35 @@
+import pytest
+
+TOKEN = 'metrics-token'
+
+
+@pytest.fixture
+def metrics_token(app):
+    app.config['INTERNAL_METRICS_TOKEN'] = TOKEN
+    yield TOKEN
+    app.config['INTERNAL_METRICS_TOKEN'] = None
+
+
+@pytest.mark.parametrize('path', ['/metrics', '/internal/db-pool'])
+def test_internal_endpoints_are_hidden_without_a_configured_token(client, path):
+    assert client.get(path).status_code == 404
+
+
+@pytest.mark.parametrize('path', ['/metrics', '/internal/db-pool'])
+def test_internal_endpoints_require_the_token(client, metrics_token, path):
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    assert client.get(path, headers={'Authorization': f'Bearer {metrics_token}'}).status_code == 200
+    assert client.get(path, headers={'X-Internal-Token': metrics_token}).status_code == 200
+
+
+def test_metrics_report_requests_and_pool(client, metrics_token):
+    client.get('/healthz')
+    body = client.get('/metrics', headers={'Authorization': f'Bearer {metrics_token}'}).get_data(as_text=True)
+
+    assert 'http_requests_total{endpoint="monitoring.healthz",method="GET",status="200"}' in body
+    assert 'db_pool_checkouts_total' in body
+
+
+def test_healthz_stays_public(client):
+    assert client.get('/healthz').get_json() == {'status': 'ok'}
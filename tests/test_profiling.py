@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from app import create_app
+from app.profiling import (
+    PROFILE_HEADER, PROFILE_ID_HEADER, RequestProfiler, init_profiling, rotate_profiles,
+    sign_profile_token, verify_profile_token
+)
+
+SECRET = 'profile-secret'
+
+
+def test_token_is_valid_until_it_expires():
+    token = sign_profile_token(SECRET, ttl=60, now=1000)
+
+    assert verify_profile_token(SECRET, token, now=1000)
+    assert verify_profile_token(SECRET, token, now=1060)
+    assert not verify_profile_token(SECRET, token, now=1061)
+
+
+@pytest.mark.parametrize('token', [
+    None, '', 'garbage', '1060', '1060.', 'abc.def',
+    sign_profile_token('other-secret', ttl=60, now=1000),
+])
+def test_malformed_or_foreign_tokens_are_rejected(token):
+    assert not verify_profile_token(SECRET, token, now=1000)
+
+
+def test_tampered_expiry_invalidates_the_signature():
+    expires, signature = sign_profile_token(SECRET, ttl=60, now=1000).split('.')
+    assert not verify_profile_token(SECRET, f'{int(expires) + 3600}.{signature}', now=1000)
+
+
+def test_rotation_keeps_the_newest_profiles(tmp_path):
+    for number in range(4):
+        for extension in ('.prof', '.collapsed'):
+            path = tmp_path / f'p{number}{extension}'
+            path.write_text('')
+            os.utime(path, (number, number))
+
+    assert rotate_profiles(str(tmp_path), keep=2) == 2
+    assert sorted(os.listdir(tmp_path)) == ['p2.collapsed', 'p2.prof', 'p3.collapsed', 'p3.prof']
+    assert rotate_profiles(str(tmp_path / 'missing'), keep=2) == 0
+
+
+def test_failed_start_leaves_no_sampler_running(monkeypatch):
+    profiler = RequestProfiler(0.001)
+
+    def busy():
+        raise ValueError('Another profiling tool is already active')
+    monkeypatch.setattr(profiler.profile, 'enable', busy)
+
+    with pytest.raises(ValueError):
+        profiler.start()
+    assert not profiler.sampler._thread.is_alive()
+
+
+def test_signed_request_is_profiled(tmp_path):
+    app = create_app('development')
+    app.config.update(TESTING=True, PROFILE_SECRET=SECRET, PROFILE_DIR=str(tmp_path))
+    init_profiling(app)
+    client = app.test_client()
+
+    assert PROFILE_ID_HEADER not in client.get('/healthz').headers
+    assert PROFILE_ID_HEADER not in client.get('/healthz', headers={PROFILE_HEADER: 'bad.token'}).headers
+
+    response = client.get('/healthz', headers={PROFILE_HEADER: sign_profile_token(SECRET)})
+    name = response.headers[PROFILE_ID_HEADER]
+    assert (tmp_path / f'{name}.prof').exists()
+    assert (tmp_path / f'{name}.collapsed').exists()
@@ -0,0 +1,68 @@
+import os
+import pytest
+
+CARTERA = {
+    'edad_actual': 30, 'monto_inicial': 10000, 'aporte_periodico': 500, 'frecuencia': 'Mensual',
+    'tipo_plazo': 'años', 'años': 30, 'tea': 8, 'edad_retiro': 60
+}
+
+
+@pytest.fixture
+def compared(client):
+    client.post('/cartera', data=CARTERA, headers={'X-Requested-With': 'XMLHttpRequest'})
+    response = client.post('/api/comparar-estrategias', json={
+        'estrategias': ['conservative', 'aggressive', 'custom'],
+        'estrategia_personalizada': {'stocks': 60, 'bonds': 30, 'gold': 10},
+        'rebalanceo': 'Anual'
+    })
+    assert response.get_json()['success']
+    return response
+
+
+def test_comparison_keeps_the_session_cookie_small(client, compared):
+    cookie = client.get_cookie('session')
+    assert len(cookie.value) < 4000
+    assert len(compared.get_json()['estrategias']) == 3
+
+
+def test_combined_report_includes_the_recomputed_comparison(client, compared):
+    response = client.get('/descargar-pdf/completo?detalle=resumen')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert response.get_data().startswith(b'%PDF')
+    response.close()
+
+
+def test_combined_report_removes_its_temporary_file(client, compared, monkeypatch):
+    from utils import pdf_generator
+    paths = []
+    generar = pdf_generator.generar_pdf_completo
+
+    def generar_y_recordar(**kwargs):
+        paths.append(generar(**kwargs))
+        return paths[-1]
+
+    monkeypatch.setattr(pdf_generator, 'generar_pdf_completo', generar_y_recordar)
+    response = client.get('/descargar-pdf/completo?detalle=resumen')
+    assert response.get_data().startswith(b'%PDF')
+    response.close()
+
+    assert len(paths) == 1
+    assert not os.path.exists(paths[0])
+
+
+def test_combined_report_closes_the_file_when_sending_fails(client, compared, monkeypatch):
+    from app import routes
+    handles = []
+
+    def send_file_roto(archivo, **kwargs):
+        handles.append(archivo)
+        raise OSError('disco lleno')
+
+    monkeypatch.setattr(routes, 'send_file', send_file_roto)
+    response = client.get('/descargar-pdf/completo?detalle=resumen')
+
+    assert response.status_code == 302
+    assert len(handles) == 1 and handles[0].closed
+    assert not os.path.exists(handles[0].name)
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from app.models import (
+    Simulation, SimulationResult, SimulationShare, Template, User, compact_stale_simulations, db,
+    purge_inactive_anonymous_users, purge_orphan_simulation_results, save_autosaved_simulation
+)
+
+OLD = datetime.utcnow() - timedelta(days=400)
+RESULTS = {'resumen': {'rentabilidad': 5.0}, 'dataframe': [{'Periodo': 1}, {'Periodo': 2}]}
+
+
+def test_purge_deletes_inactive_anonymous_users_in_chunks(make_user):
+    stale = [make_user(is_registered=False, last_active=OLD) for _ in range(5)]
+    db.session.add(Simulation(user_id=stale[0].id, name='s', module_type='cartera',
+                              input_data={}, results_data={}))
+    registered = make_user(is_registered=True, last_active=OLD)
+    recent = make_user(is_registered=False)
+    creator = make_user(is_registered=False, last_active=OLD)
+    db.session.add(Template(creator_id=creator.id, name='t', module_type='cartera', template_data={}))
+    db.session.commit()
+
+    progress = []
+    assert purge_inactive_anonymous_users(30, chunk_size=2, progress=progress.append) == 5
+
+    assert progress == [2, 4, 5]
+    assert {user.id for user in User.query} == {registered.id, recent.id, creator.id}
+    assert Simulation.query.count() == 0
+
+
+def autosave_at(user_id, number, updated_at, **fields):
+    simulation, _ = save_autosaved_simulation(user_id, f'Simulación {number}', None, 'cartera',
+                                              {'n': number}, RESULTS)
+    db.session.flush()
+    db.session.query(Simulation).filter_by(id=simulation.id).update(dict(updated_at=updated_at, **fields))
+    db.session.commit()
+    return simulation.id
+
+
+def test_compaction_thins_old_autosaves_in_chunks(make_user):
+    user = make_user()
+    old_ids = [autosave_at(user.id, number, OLD) for number in range(5)]
+    favorite = autosave_at(user.id, 5, OLD, is_favorite=True)
+    shared = autosave_at(user.id, 6, OLD)
+    db.session.add(SimulationShare(simulation_id=shared, shared_by_user_id=user.id))
+    fresh = autosave_at(user.id, 7, datetime.utcnow())
+    db.session.commit()
+
+    progress = []
+    assert compact_stale_simulations(90, chunk_size=2, progress=progress.append) == 5
+    assert progress == [2, 4, 5]
+
+    db.session.expire_all()
+    for simulation_id in old_ids:
+        simulation = db.session.get(Simulation, simulation_id)
+        assert simulation.compacted_at is not None
+        assert simulation.results == {'resumen': RESULTS['resumen']}
+        assert simulation.updated_at == OLD
+    for simulation_id in (favorite, shared, fresh):
+        assert db.session.get(Simulation, simulation_id).compacted_at is None
+
+    # Compacted rows are skipped on the next run
+    assert compact_stale_simulations(90, chunk_size=2) == 0
+
+
+def test_orphan_results_are_purged_after_compaction(make_user):
+    user = make_user()
+    autosave_at(user.id, 0, OLD)
+    assert SimulationResult.query.count() == 1
+
+    compact_stale_simulations(90)
+    assert purge_orphan_simulation_results(chunk_size=1) == 1
+    assert SimulationResult.query.count() == 0
+
+
+def test_retention_command_reports_totals(app, make_user):
+    make_user(is_registered=False, last_active=OLD)
+
+    result = app.test_cli_runner().invoke(args=['retention', '--chunk-size', '1'])
+
+    assert result.exit_code == 0, result.output
+    assert 'users deleted: 1' in result.output
+    assert 'Retention done: 1 users deleted' in result.output
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+from app.models import Simulation, db
+
+
+def current_user_id(client):
+    return client.get('/api/user/profile').get_json()['user']['id']
+
+
+def add_simulations(user_id, updated_at_list):
+    for number, updated_at in enumerate(updated_at_list):
+        db.session.add(Simulation(
+            user_id=user_id, name=f'Simulación {number}', module_type='cartera',
+            input_data={'n': number}, results_data={'resumen': {}},
+            created_at=updated_at, updated_at=updated_at
+        ))
+    db.session.commit()
+
+
+def test_cursor_pages_cover_every_simulation_once_newest_first(client):
+    user_id = current_user_id(client)
+    base = datetime(2025, 1, 1)
+    # Two pairs share updated_at, so the id tie-breaker matters
+    add_simulations(user_id, [base, base + timedelta(hours=1), base + timedelta(hours=1),
+                              base + timedelta(hours=2), base + timedelta(hours=2)])
+
+    seen, cursor = [], None
+    while True:
+        query = '/api/simulations?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(query).get_json()
+        assert page['success']
+        assert len(page['simulations']) <= 2
+        seen += [(s['updated_at'], s['id']) for s in page['simulations']]
+        if not page['has_more']:
+            assert page['next_cursor'] is None
+            break
+        cursor = page['next_cursor']
+
+    assert len(seen) == 5
+    assert len({simulation_id for _, simulation_id in seen}) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_listing_is_slim_and_scoped_to_the_user(client, make_user):
+    user_id = current_user_id(client)
+    add_simulations(user_id, [datetime(2025, 1, 1)])
+    add_simulations(make_user().id, [datetime(2025, 1, 2)])
+
+    page = client.get('/api/simulations').get_json()
+    assert len(page['simulations']) == 1
+    assert 'results_data' not in page['simulations'][0]
+
+
+def test_malformed_cursor_is_rejected(client):
+    page = client.get('/api/simulations?cursor=not-a-cursor').get_json()
+    assert page == {'success': False, 'error': 'Invalid cursor'}
+
+
+def test_ndjson_import_keeps_valid_lines_and_reports_rejected_ones(client):
+    user_id = current_user_id(client)
+    body = '\n'.join([
+        '{"name": "Plan A", "module_type": "cartera", "input_data": {"tea": 8}, '
+        '"results_data": {"resumen": {"rentabilidad": 10}}}',
+        'not json',
+        '{"name": "", "module_type": "cartera", "input_data": {}, "results_data": {}}',
+        '',
+        '{"name": "Plan B", "module_type": "bonos", "input_data": [], "results_data": {}}',
+        '{"name": "Plan C", "module_type": "bonos", "input_data": {}, "results_data": {}, "is_public": "yes"}',
+        '{"name": "Plan D", "module_type": "bonos", "input_data": {}, "results_data": {}, "user_id": "someone-else"}',
+    ])
+
+    summary = client.post('/api/simulations/import', data=body,
+                          content_type='application/x-ndjson').get_json()
+
+    assert summary['success']
+    assert summary['imported'] == 2
+    assert summary['rejected'] == 4
+    assert [error['line'] for error in summary['errors']] == [2, 3, 5, 6]
+    # Ids in the file never choose the owner of imported rows
+    assert {s.name for s in Simulation.query.filter_by(user_id=user_id)} == {'Plan A', 'Plan D'}
+    assert Simulation.query.count() == 2
+
+
+def test_ndjson_import_rejects_bad_timestamps(client):
+    current_user_id(client)
+    body = ('{"name": "Plan", "module_type": "cartera", "input_data": {}, "results_data": {}, '
+            '"created_at": "yesterday"}')
+
+    summary = client.post('/api/simulations/import', data=body,
+                          content_type='application/x-ndjson').get_json()
+
+    assert summary['imported'] == 0
+    assert summary['rejected'] == 1
+    assert 'created_at' in summary['errors'][0]['error']
+
+
+def test_saving_and_deleting_keeps_the_performance_average(client):
+    from app.models import User
+
+    user_id = current_user_id(client)
+    ids = []
+    for rentabilidad in (10.0, 20.0, 60.0):
+        response = client.post('/api/simulations', json={
+            'name': f'Plan {rentabilidad}', 'module_type': 'cartera', 'input_data': {'r': rentabilidad},
+            'results_data': {'resumen': {'rentabilidad': rentabilidad}}
+        }).get_json()
+        ids.append(response['simulation']['id'])
+
+    db.session.expire_all()
+    user = db.session.get(User, user_id)
+    assert (user.performance_samples, user.performance_total, user.avg_performance) == (3, 90.0, 30.0)
+
+    assert client.delete(f'/api/simulations/{ids[2]}').get_json()['success']
+    db.session.expire_all()
+    user = db.session.get(User, user_id)
+    assert (user.performance_samples, user.avg_performance) == (2, 15.0)
@@ -0,0 +1,88 @@
+import pytest
+
+from app.models import (
+    Template, TemplateVote, apply_template_vote, db, recount_template_votes, refresh_template_scores
+)
+
+
+@pytest.fixture
+def template(make_user):
+    template = Template(creator_id=make_user().id, name='Plan', module_type='cartera',
+                        template_data={}, upvotes=0, downvotes=0)
+    db.session.add(template)
+    db.session.commit()
+    return template
+
+
+def tallies(template_id):
+    db.session.expire_all()
+    template = db.session.get(Template, template_id)
+    return template.upvotes, template.downvotes
+
+
+def test_votes_are_counted_once_per_user_and_can_change(template, make_user):
+    voter, other = make_user(), make_user()
+
+    assert apply_template_vote(voter.id, template.id, 'upvote')
+    assert apply_template_vote(voter.id, template.id, 'upvote')
+    assert apply_template_vote(other.id, template.id, 'upvote')
+    assert tallies(template.id) == (2, 0)
+
+    assert apply_template_vote(voter.id, template.id, 'downvote')
+    assert tallies(template.id) == (1, 1)
+    assert TemplateVote.query.filter_by(template_id=template.id).count() == 2
+
+
+def test_vote_increments_the_stored_tally_not_a_stale_copy(template, make_user):
+    # Another worker's votes land after this session loaded the template
+    stale = db.session.get(Template, template.id)
+    db.session.execute(db.text('UPDATE templates SET upvotes = 5 WHERE id = :id'), {'id': template.id})
+    db.session.commit()
+
+    apply_template_vote(make_user().id, stale.id, 'upvote')
+    assert tallies(template.id) == (6, 0)
+
+
+def test_vote_rescores_the_template_without_touching_updated_at(template, make_user):
+    updated_at = template.updated_at
+    apply_template_vote(make_user().id, template.id, 'upvote')
+
+    db.session.expire_all()
+    voted = db.session.get(Template, template.id)
+    score = voted.popularity_score
+    assert score > 0
+    assert voted.score_updated_at is not None
+    assert voted.updated_at == updated_at
+
+    apply_template_vote(make_user().id, template.id, 'downvote')
+    db.session.expire_all()
+    assert db.session.get(Template, template.id).popularity_score < score
+
+
+def test_vote_on_missing_template_fails(make_user):
+    assert apply_template_vote(make_user().id, 999, 'upvote') is False
+    assert TemplateVote.query.count() == 0
+
+
+def test_recount_fixes_drifted_tallies(template, make_user):
+    apply_template_vote(make_user().id, template.id, 'upvote')
+    db.session.execute(db.text('UPDATE templates SET upvotes = 7, downvotes = 3 WHERE id = :id'), {'id': template.id})
+    db.session.commit()
+
+    assert recount_template_votes() == 1
+    assert tallies(template.id) == (1, 0)
+
+
+def test_score_refresh_keeps_updated_at(template):
+    updated_at = template.updated_at
+    db.session.execute(db.text('UPDATE templates SET score_updated_at = NULL, views = 100'))
+    db.session.commit()
+
+    assert refresh_template_scores() == 1
+
+    db.session.expire_all()
+    refreshed = db.session.get(Template, template.id)
+    assert refreshed.popularity_score > 0
+    assert refreshed.score_updated_at is not None
+    assert refreshed.updated_at == updated_at
+    assert refresh_template_scores() == 0
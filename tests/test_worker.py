@@ -0,0 +1,9 @@
+from app.monitoring import metrics
+from app.worker import warm_caches
+
+
+def test_warm_up_calculations_are_not_reported(app):
+    # The warm-up runs calcular_cartera/calcular_bonos, both wrapped in timed()
+    assert warm_caches(app) > 0
+
+    assert 'calculation_duration_seconds' not in metrics.render()
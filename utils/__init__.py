@@ -1,7 +1,34 @@
 """
 Paquete de utilidades para el Simulador Financiero
+
+Los nombres públicos de calculos_financieros, validaciones y exportar_pdf se
+siguen pudiendo importar desde el paquete (from utils import ...), pero el
+módulo que los define (y sus dependencias: pandas, ReportLab) solo se carga
+la primera vez que se usan.
 """
+import importlib
+import importlib.util
+
+# Módulos antes importados con "import *" (no comparten nombres públicos);
+# se buscan del más liviano al más pesado
+_MODULOS_EXPORTADOS = ('validaciones', 'calculos_financieros', 'exportar_pdf')
+
+def _exportados(modulo):
+    nombres = getattr(modulo, '__all__', None)
+    if nombres is None:
+        nombres = [nombre for nombre in vars(modulo) if not nombre.startswith('_')]
+    return nombres
 
-from .calculos_financieros import *
-from .validaciones import *
-from .exportar_pdf import *
+def __getattr__(nombre):
+    if nombre.startswith('_'):
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    # "from utils import graficos" pregunta primero por el atributo: es un submódulo
+    if importlib.util.find_spec(f'{__name__}.{nombre}') is not None:
+        return importlib.import_module(f'.{nombre}', __name__)
+    for nombre_modulo in _MODULOS_EXPORTADOS:
+        modulo = importlib.import_module(f'.{nombre_modulo}', __name__)
+        if nombre in _exportados(modulo):
+            valor = getattr(modulo, nombre)
+            globals()[nombre] = valor
+            return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
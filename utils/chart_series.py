@@ -0,0 +1,168 @@
+"""
+Chart-ready series for long schedules
+
+Schedules with hundreds of periods are reduced to at most N points before
+they are charted, either with Largest-Triangle-Three-Buckets (LTTB), which
+keeps the visual shape of the curve, or by aggregating the periods of each
+year. The full schedule stays available separately (method 'completo').
+"""
+import numpy as np
+
+DEFAULT_MAX_POINTS = 200
+
+PERIODS_PER_YEAR = {
+    'Mensual': 12,
+    'Bimestral': 6,
+    'Trimestral': 4,
+    'Cuatrimestral': 3,
+    'Semestral': 2,
+    'Anual': 1
+}
+
+METHODS = ('auto', 'lttb', 'anual', 'completo')
+
+def lttb_indices(x, y, max_points):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+    """
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+
+    # Bucket i spans [bounds[i], bounds[i + 1]) of the interior points (exact integer split)
+    buckets = max_points - 2
+    bounds = [1 + (i * (n - 2)) // buckets for i in range(buckets + 1)] + [n]
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(buckets):
+        start, end, next_end = bounds[i], bounds[i + 1], bounds[i + 2]
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+def yearly_indices(periodos, periods_per_year):
+    """Indices of the year-end periods (plus the first and last period)"""
+    periodos = np.asarray(periodos)
+    if periods_per_year <= 1 or len(periodos) == 0:
+        return np.arange(len(periodos))
+    keep = periodos % periods_per_year == 0
+    keep[0] = keep[-1] = True
+    return np.flatnonzero(keep)
+
+def yearly_sums(periodos, values, periods_per_year):
+    """Values summed per year of periods (period p belongs to year ceil(p / periods_per_year))"""
+    years = np.ceil(np.asarray(periodos, dtype='float64') / periods_per_year).astype(np.int64)
+    unique_years, positions = np.unique(years, return_inverse=True)
+    return unique_years, np.bincount(positions, weights=np.asarray(values, dtype='float64'))
+
+def _choose_method(method, n, periods_per_year, max_points):
+    if method not in METHODS:
+        raise ValueError(f"Método de serie no soportado: {method}")
+    if method != 'auto':
+        return method
+    if n <= max_points:
+        return 'completo'
+    if periods_per_year and periods_per_year > 1 and n / periods_per_year + 1 <= max_points:
+        return 'anual'
+    return 'lttb'
+
+def _series(method, n, periodos, etiquetas, columns):
+    serie = {
+        'metodo': method,
+        'total_periodos': n,
+        'puntos': len(periodos),
+        'periodo': [int(p) for p in periodos],
+        'etiquetas': etiquetas
+    }
+    for name, values in columns.items():
+        serie[name] = [round(float(v), 2) for v in values]
+    return serie
+
+def portfolio_series(df, frecuencia=None, max_points=DEFAULT_MAX_POINTS, method='auto'):
+    """
+    Chart series of a portfolio schedule (calcular_cartera dataframe)
+
+    Args:
+        df: Portfolio DataFrame (period 0 is the initial balance)
+        frecuencia: Contribution frequency, used for yearly aggregation
+        max_points: Maximum number of points of the series
+        method: 'auto', 'lttb', 'anual' or 'completo'
+
+    Returns:
+        Dictionary with periodo, etiquetas, saldo_final, aportes_acumulados
+        and intereses_acumulados lists, plus the method used
+    """
+    periods_per_year = PERIODS_PER_YEAR.get(frecuencia)
+    periodos = df['Periodo'].to_numpy()
+    saldo = df['Saldo Final'].to_numpy(dtype='float64')
+    columns = {
+        'saldo_final': saldo,
+        'aportes_acumulados': df['Aportes Acumulados'].to_numpy(dtype='float64'),
+        'intereses_acumulados': df['Interés'].cumsum().to_numpy(dtype='float64')
+    }
+
+    method = _choose_method(method, len(df), periods_per_year, max_points)
+    if method == 'anual' and periods_per_year:
+        # Every column is a running total, so the year-end row is the yearly value
+        indices = yearly_indices(periodos, periods_per_year)
+        # An explicit 'anual' on a very long schedule can still exceed max_points
+        indices = indices[lttb_indices(periodos[indices], saldo[indices], max_points)]
+        etiquetas = ['Inicio' if p == 0 else f'Año {-(-int(p) // periods_per_year)}' for p in periodos[indices]]
+    else:
+        if method == 'anual':
+            method = 'lttb'
+        indices = lttb_indices(periodos, saldo, max_points) if method == 'lttb' else np.arange(len(df))
+        etiquetas = ['Inicio' if p == 0 else f'Período {int(p)}' for p in periodos[indices]]
+
+    return _series(method, len(df), periodos[indices], etiquetas,
+                   {name: values[indices] for name, values in columns.items()})
+
+def bond_series(df, frecuencia=None, max_points=DEFAULT_MAX_POINTS, method='auto'):
+    """
+    Chart series of a bond cash flow schedule (calcular_bonos dataframe)
+
+    Args:
+        df: Bond DataFrame
+        frecuencia: Payment frequency, used for yearly aggregation
+        max_points: Maximum number of points of the series
+        method: 'auto', 'lttb', 'anual' or 'completo'
+
+    Returns:
+        Dictionary with periodo, etiquetas, flujo and valor_presente lists,
+        plus the method used (yearly series hold the flows of each year)
+    """
+    periods_per_year = PERIODS_PER_YEAR.get(frecuencia)
+    periodos = df['Periodo'].to_numpy()
+    flujo = df['Flujo (USD)'].to_numpy(dtype='float64')
+    valor_presente = df['Valor Presente (USD)'].to_numpy(dtype='float64')
+
+    method = _choose_method(method, len(df), periods_per_year, max_points)
+    if method == 'anual' and periods_per_year:
+        years, flujo = yearly_sums(periodos, flujo, periods_per_year)
+        _, valor_presente = yearly_sums(periodos, valor_presente, periods_per_year)
+        keep = lttb_indices(years, flujo, max_points)
+        years, flujo, valor_presente = years[keep], flujo[keep], valor_presente[keep]
+        return _series(method, len(df), years, [f'Año {int(y)}' for y in years],
+                       {'flujo': flujo, 'valor_presente': valor_presente})
+
+    if method == 'anual':
+        method = 'lttb'
+    indices = lttb_indices(periodos, flujo, max_points) if method == 'lttb' else np.arange(len(df))
+    return _series(method, len(df), periodos[indices], [f'Periodo {int(p)}' for p in periodos[indices]],
+                   {'flujo': flujo[indices], 'valor_presente': valor_presente[indices]})
@@ -246,110 +246,3 @@ def generar_pdf_bono(
     
     buffer.seek(0)
     return buffer.getvalue()
-
-
-def generar_pdf_completo(
-    df_cartera: pd.DataFrame,
-    resumen_cartera: Dict,
-    resumen_jubilacion: Dict,
-    df_bono: Optional[pd.DataFrame] = None,
-    resumen_bono: Optional[Dict] = None,
-    ruta_grafica: Optional[str] = None
-) -> bytes:
-    """
-    Genera un PDF completo con todos los módulos
-    
-    Args:
-        df_cartera: DataFrame con el detalle de la cartera
-        resumen_cartera: Resumen de la cartera
-        resumen_jubilacion: Resumen de la jubilación
-        df_bono: DataFrame opcional con flujos del bono
-        resumen_bono: Resumen opcional del bono
-        ruta_grafica: Ruta opcional de la gráfica
-    
-    Returns:
-        Bytes del PDF generado
-    """
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-    story = []
-    estilos = crear_estilos_personalizados()
-    
-    # Portada
-    titulo = Paragraph("Reporte Financiero Completo", estilos['titulo'])
-    story.append(titulo)
-    story.append(Spacer(1, 0.1*inch))
-    
-    subtitulo = Paragraph("Simulador de Jubilación y Valoración de Bonos", estilos['subtitulo'])
-    story.append(subtitulo)
-    story.append(Spacer(1, 0.2*inch))
-    
-    fecha = Paragraph(f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}", estilos['normal'])
-    story.append(fecha)
-    story.append(Spacer(1, 0.5*inch))
-    
-    # Módulo A: Cartera
-    story.append(Paragraph("MÓDULO A: CRECIMIENTO DE CARTERA", estilos['subtitulo']))
-    
-    for clave, valor in resumen_cartera.items():
-        if isinstance(valor, (int, float)):
-            texto = f"<b>{clave}:</b> ${valor:,.2f} USD"
-        else:
-            texto = f"<b>{clave}:</b> {valor}"
-        story.append(Paragraph(texto, estilos['resumen']))
-    
-    story.append(Spacer(1, 0.2*inch))
-    
-    # Gráfica
-    if ruta_grafica:
-        try:
-            img = RLImage(ruta_grafica, width=6*inch, height=3*inch)
-            story.append(img)
-            story.append(Spacer(1, 0.2*inch))
-        except:
-            pass
-    
-    # Módulo B: Jubilación
-    story.append(PageBreak())
-    story.append(Paragraph("MÓDULO B: PROYECCIÓN DE JUBILACIÓN", estilos['subtitulo']))
-    
-    for clave, valor in resumen_jubilacion.items():
-        if isinstance(valor, (int, float)):
-            texto = f"<b>{clave}:</b> ${valor:,.2f} USD"
-        else:
-            texto = f"<b>{clave}:</b> {valor}"
-        story.append(Paragraph(texto, estilos['resumen']))
-    
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Tabla de cartera (resumen)
-    if len(df_cartera) > 20:
-        df_mostrar = pd.concat([df_cartera.head(10), df_cartera.tail(10)])
-    else:
-        df_mostrar = df_cartera
-    
-    tabla = crear_tabla_estilizada(df_mostrar)
-    story.append(tabla)
-    
-    # Módulo C: Bonos (si existe)
-    if df_bono is not None and resumen_bono is not None:
-        story.append(PageBreak())
-        story.append(Paragraph("MÓDULO C: VALORACIÓN DE BONOS", estilos['subtitulo']))
-        
-        for clave, valor in resumen_bono.items():
-            if isinstance(valor, (int, float)):
-                texto = f"<b>{clave}:</b> ${valor:,.2f} USD"
-            else:
-                texto = f"<b>{clave}:</b> {valor}"
-            story.append(Paragraph(texto, estilos['resumen']))
-        
-        story.append(Spacer(1, 0.3*inch))
-        
-        tabla_bono = crear_tabla_estilizada(df_bono)
-        story.append(tabla_bono)
-    
-    # Construir PDF
-    doc.build(story)
-    
-    buffer.seek(0)
-    return buffer.getvalue()
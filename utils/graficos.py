@@ -1,17 +1,156 @@
 """
 Graphics generation utilities for the Financial Simulator
+
+Charts are drawn with the object-oriented Figure API on Agg canvases (no
+pyplot state machine), so they can be rendered concurrently from threaded
+workers. Figures are reused from a small pool and rendered PNGs are cached
+by a hash of the chart data. matplotlib itself is imported on the first chart.
 """
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import seaborn as sns
+import hashlib
 import io
+import json
+import os
 import base64
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Optional, Dict, Any
-
-# Set style
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+from .chart_series import lttb_indices, DEFAULT_MAX_POINTS
+
+# Idle figures kept per (size, dpi) and rendered PNGs kept in memory
+FIGURE_POOL_SIZE = 4
+CHART_CACHE_SIZE = 64
+
+# Long schedules are downsampled (LTTB) before plotting; markers and value labels only on short ones
+MAX_CHART_POINTS = DEFAULT_MAX_POINTS
+MAX_MARKERS = 60
+
+# seaborn's "husl" palette (sns.color_palette("husl")), the colour cycle charts always used
+HUSL_PALETTE = ('#f77189', '#bb9832', '#50b131', '#36ada4', '#3ba3ec', '#e866f4')
+
+CHART_DIR = os.environ.get('CHART_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'simulador_charts')
+
+_SUBPLOT_PARAMS = ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+
+_matplotlib = None
+_matplotlib_lock = threading.Lock()
+
+def get_matplotlib():
+    """The matplotlib module, imported with the Agg backend and chart style on first use"""
+    global _matplotlib
+    if _matplotlib is None:
+        with _matplotlib_lock:
+            if _matplotlib is None:
+                import matplotlib
+                matplotlib.use('Agg')  # Use non-interactive backend
+                import matplotlib.style
+                import matplotlib.figure
+                import matplotlib.ticker
+                import matplotlib.backends.backend_agg
+
+                # Set style
+                matplotlib.style.use('seaborn-v0_8')
+                matplotlib.rcParams['axes.prop_cycle'] = matplotlib.cycler(color=HUSL_PALETTE)
+                _matplotlib = matplotlib
+    return _matplotlib
+
+class FigurePool:
+    """Reusable Agg figures; each checked-out figure is used by one thread only"""
+
+    def __init__(self, max_idle=FIGURE_POOL_SIZE):
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def figure(self, figsize, dpi):
+        """Borrow a blank figure of the given size, returning it cleared afterwards"""
+        key = (tuple(figsize), dpi)
+        with self._lock:
+            idle = self._idle.get(key)
+            fig = idle.pop() if idle else None
+        matplotlib = get_matplotlib()
+        if fig is None:
+            fig = matplotlib.figure.Figure(figsize=figsize, dpi=dpi)
+            matplotlib.backends.backend_agg.FigureCanvasAgg(fig)
+
+        try:
+            yield fig
+        finally:
+            fig.clear()
+            # tight_layout moves the subplot parameters; restore the defaults
+            fig.subplotpars.update(**{
+                name: matplotlib.rcParams[f'figure.subplot.{name}'] for name in _SUBPLOT_PARAMS
+            })
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(fig)
+
+class ChartCache:
+    """Thread-safe LRU of rendered PNG bytes keyed by data hash"""
+
+    def __init__(self, max_entries=CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+_figure_pool = FigurePool()
+_chart_cache = ChartCache()
+
+def _currency_formatter():
+    return get_matplotlib().ticker.FuncFormatter(lambda x, p: f'${x:,.0f}')
+
+def _data_uri(png):
+    return f"data:image/png;base64,{base64.b64encode(png).decode('utf-8')}"
+
+def chart_key(kind, titulo, figsize, dpi, df=None, columns=(), datos=None):
+    """Hash of everything that determines a chart image"""
+    sha = hashlib.sha256()
+    sha.update(json.dumps([kind, titulo, list(figsize), dpi]).encode('utf-8'))
+    for column in columns:
+        sha.update(column.encode('utf-8'))
+        sha.update(df[column].to_numpy(dtype='float64').tobytes())
+    if datos is not None:
+        sha.update(json.dumps(datos, sort_keys=True, default=str).encode('utf-8'))
+    return sha.hexdigest()
+
+def guardar_png(png, directorio=None):
+    """
+    Write a rendered chart to disk (once per content) for use in PDF reports
+
+    Returns:
+        Path of the PNG file, named by its content hash
+    """
+    directorio = directorio or CHART_DIR
+    path = os.path.join(directorio, f"{hashlib.sha256(png).hexdigest()}.png")
+    if not os.path.exists(path):
+        os.makedirs(directorio, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(suffix='.png', dir=directorio)
+        with os.fdopen(fd, 'wb') as archivo:
+            archivo.write(png)
+        os.replace(temporary, path)
+    return path
 
 class GraficosGenerator:
     """Class for generating charts and graphs"""
@@ -20,6 +159,104 @@ class GraficosGenerator:
         self.fig_size = (10, 6)
         self.dpi = 100
 
+    def _render(self, key, draw, tight=True):
+        """PNG bytes of a chart, drawn on a pooled figure unless already cached"""
+        png = _chart_cache.get(key)
+        if png is not None:
+            return png
+
+        buffer = io.BytesIO()
+        with _figure_pool.figure(self.fig_size, self.dpi) as fig:
+            ax = fig.add_subplot()
+            draw(ax)
+            if tight:
+                fig.tight_layout()
+            fig.savefig(buffer, format='png', bbox_inches='tight')
+        png = buffer.getvalue()
+        _chart_cache.put(key, png)
+        return png
+
+    def grafica_cartera_png(self, df, titulo="Evolución de la Cartera"):
+        """Portfolio growth chart as PNG bytes"""
+        df = df.iloc[lttb_indices(df['Periodo'], df['Saldo Final (USD)'], MAX_CHART_POINTS)]
+        markers = len(df) <= MAX_MARKERS
+
+        def draw(ax):
+            # Plot data
+            ax.plot(df['Periodo'], df['Saldo Final (USD)'], label='Saldo Total', linewidth=2,
+                    marker='o' if markers else None, markersize=3)
+            ax.plot(df['Periodo'], df['Aportes Acumulados (USD)'], label='Aportes Acumulados', linewidth=2, linestyle='--',
+                    marker='s' if markers else None, markersize=3)
+
+            # Formatting
+            ax.set_title(titulo, fontsize=14, fontweight='bold', pad=20)
+            ax.set_xlabel('Periodo', fontsize=12)
+            ax.set_ylabel('Monto (USD)', fontsize=12)
+            ax.legend(fontsize=10)
+            ax.grid(True, alpha=0.3)
+
+            # Format y-axis as currency
+            ax.yaxis.set_major_formatter(_currency_formatter())
+
+        key = chart_key('cartera', titulo, self.fig_size, self.dpi, df,
+                        ('Periodo', 'Saldo Final (USD)', 'Aportes Acumulados (USD)'))
+        return self._render(key, draw)
+
+    def grafica_bonos_png(self, df, titulo="Flujos del Bono"):
+        """Bond cash flows chart as PNG bytes"""
+        df = df.iloc[lttb_indices(df['Periodo'], df['Flujo (USD)'], MAX_CHART_POINTS)]
+
+        def draw(ax):
+            # Create bar chart
+            bar_width = 0.35
+            periods = df['Periodo']
+
+            bars1 = ax.bar(periods - bar_width/2, df['Flujo (USD)'], bar_width,
+                          label='Flujo Nominal', alpha=0.8, color='skyblue')
+            bars2 = ax.bar(periods + bar_width/2, df['Valor Presente (USD)'], bar_width,
+                          label='Valor Presente', alpha=0.8, color='salmon')
+
+            # Formatting
+            ax.set_title(titulo, fontsize=14, fontweight='bold', pad=20)
+            ax.set_xlabel('Periodo', fontsize=12)
+            ax.set_ylabel('Monto (USD)', fontsize=12)
+            ax.legend(fontsize=10)
+            ax.grid(True, alpha=0.3, axis='y')
+
+            # Format y-axis as currency
+            ax.yaxis.set_major_formatter(_currency_formatter())
+
+            # Add value labels on bars
+            def add_value_labels(bars):
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height,
+                           f'${height:,.0f}', ha='center', va='bottom', fontsize=8)
+
+            if len(df) <= MAX_MARKERS:
+                add_value_labels(bars1)
+                add_value_labels(bars2)
+
+        key = chart_key('bonos', titulo, self.fig_size, self.dpi, df,
+                        ('Periodo', 'Flujo (USD)', 'Valor Presente (USD)'))
+        return self._render(key, draw)
+
+    def grafica_jubilacion_png(self, datos_jubilacion, titulo="Proyección de Jubilación"):
+        """Retirement projection chart as PNG bytes"""
+        def draw(ax):
+            # This would be implemented when retirement calculations are complete
+            ax.text(0.5, 0.5, 'Gráfica de Jubilación\n(En desarrollo)',
+                   transform=ax.transAxes, ha='center', va='center',
+                   fontsize=14, fontweight='bold')
+
+            ax.set_title(titulo, fontsize=14, fontweight='bold', pad=20)
+            ax.set_xlim(0, 1)
+            ax.set_ylim(0, 1)
+            ax.axis('off')
+
+        key = chart_key('jubilacion', titulo, self.fig_size, self.dpi, datos=datos_jubilacion)
+        return self._render(key, draw, tight=False)
+
     def generar_grafica_cartera(self, df, titulo="Evolución de la Cartera"):
         """
         Generate portfolio growth chart
@@ -31,34 +268,7 @@ class GraficosGenerator:
         Returns:
             Base64 encoded image string
         """
-        fig, ax = plt.subplots(figsize=self.fig_size, dpi=self.dpi)
-
-        # Plot data
-        ax.plot(df['Periodo'], df['Saldo Final (USD)'], label='Saldo Total', linewidth=2, marker='o', markersize=3)
-        ax.plot(df['Periodo'], df['Aportes Acumulados (USD)'], label='Aportes Acumulados', linewidth=2, linestyle='--', marker='s', markersize=3)
-
-        # Formatting
-        ax.set_title(titulo, fontsize=14, fontweight='bold', pad=20)
-        ax.set_xlabel('Periodo', fontsize=12)
-        ax.set_ylabel('Monto (USD)', fontsize=12)
-        ax.legend(fontsize=10)
-        ax.grid(True, alpha=0.3)
-
-        # Format y-axis as currency
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
-
-        # Tight layout
-        plt.tight_layout()
-
-        # Convert to base64
-        buffer = io.BytesIO()
-        fig.savefig(buffer, format='png', bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        buffer.close()
-        plt.close(fig)
-
-        return f"data:image/png;base64,{image_base64}"
+        return _data_uri(self.grafica_cartera_png(df, titulo))
 
     def generar_grafica_bonos(self, df, titulo="Flujos del Bono"):
         """
@@ -71,49 +281,7 @@ class GraficosGenerator:
         Returns:
             Base64 encoded image string
         """
-        fig, ax = plt.subplots(figsize=self.fig_size, dpi=self.dpi)
-
-        # Create bar chart
-        bar_width = 0.35
-        periods = df['Periodo']
-
-        bars1 = ax.bar(periods - bar_width/2, df['Flujo (USD)'], bar_width,
-                      label='Flujo Nominal', alpha=0.8, color='skyblue')
-        bars2 = ax.bar(periods + bar_width/2, df['Valor Presente (USD)'], bar_width,
-                      label='Valor Presente', alpha=0.8, color='salmon')
-
-        # Formatting
-        ax.set_title(titulo, fontsize=14, fontweight='bold', pad=20)
-        ax.set_xlabel('Periodo', fontsize=12)
-        ax.set_ylabel('Monto (USD)', fontsize=12)
-        ax.legend(fontsize=10)
-        ax.grid(True, alpha=0.3, axis='y')
-
-        # Format y-axis as currency
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
-
-        # Add value labels on bars
-        def add_value_labels(bars):
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'${height:,.0f}', ha='center', va='bottom', fontsize=8)
-
-        add_value_labels(bars1)
-        add_value_labels(bars2)
-
-        # Tight layout
-        plt.tight_layout()
-
-        # Convert to base64
-        buffer = io.BytesIO()
-        fig.savefig(buffer, format='png', bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        buffer.close()
-        plt.close(fig)
-
-        return f"data:image/png;base64,{image_base64}"
+        return _data_uri(self.grafica_bonos_png(df, titulo))
 
     def generar_grafica_jubilacion(self, datos_jubilacion, titulo="Proyección de Jubilación"):
         """
@@ -126,28 +294,40 @@ class GraficosGenerator:
         Returns:
             Base64 encoded image string
         """
-        # Placeholder for retirement chart
-        fig, ax = plt.subplots(figsize=self.fig_size, dpi=self.dpi)
+        return _data_uri(self.grafica_jubilacion_png(datos_jubilacion, titulo))
 
-        # This would be implemented when retirement calculations are complete
-        ax.text(0.5, 0.5, 'Gráfica de Jubilación\n(En desarrollo)',
-               transform=ax.transAxes, ha='center', va='center',
-               fontsize=14, fontweight='bold')
+    def generar_lote(self, peticiones, max_workers=1):
+        """
+        Render several charts (e.g. all the charts of a PDF report)
 
-        ax.set_title(titulo, fontsize=14, fontweight='bold', pad=20)
-        ax.set_xlim(0, 1)
-        ax.set_ylim(0, 1)
-        ax.axis('off')
+        Rendering is CPU-bound under the GIL, so batches run sequentially by
+        default; max_workers > 1 renders them from a thread pool.
 
-        # Convert to base64
-        buffer = io.BytesIO()
-        fig.savefig(buffer, format='png', bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        buffer.close()
-        plt.close(fig)
+        Args:
+            peticiones: List of (tipo, datos, titulo) with tipo in
+                'cartera', 'bonos' or 'jubilacion'; titulo may be omitted
+            max_workers: Charts rendered at the same time
 
-        return f"data:image/png;base64,{image_base64}"
+        Returns:
+            List of PNG bytes, in the order of the requests
+        """
+        renderers = {
+            'cartera': self.grafica_cartera_png,
+            'bonos': self.grafica_bonos_png,
+            'jubilacion': self.grafica_jubilacion_png
+        }
+        tasks = []
+        for peticion in peticiones:
+            tipo, args = peticion[0], peticion[1:]
+            if tipo not in renderers:
+                raise ValueError(f"Tipo de gráfica no soportado: {tipo}")
+            tasks.append((renderers[tipo], args))
+
+        if len(tasks) <= 1 or max_workers <= 1:
+            return [render(*args) for render, args in tasks]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            futures = [executor.submit(render, *args) for render, args in tasks]
+            return [future.result() for future in futures]
 
 # Convenience functions
 def generar_grafica_cartera(df, titulo="Evolución de la Cartera"):
@@ -164,3 +344,8 @@ def generar_grafica_jubilacion(datos, titulo="Proyección de Jubilación"):
     """Generate retirement chart"""
     generator = GraficosGenerator()
     return generator.generar_grafica_jubilacion(datos, titulo)
+
+def generar_graficas(peticiones, max_workers=1):
+    """Render a batch of charts (PNG bytes, in request order)"""
+    generator = GraficosGenerator()
+    return generator.generar_lote(peticiones, max_workers)
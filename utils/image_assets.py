@@ -0,0 +1,121 @@
+"""
+Image asset pipeline for PDF reports and the user manual
+
+Source images are downsampled once with Pillow to the pixel size they are
+drawn at (for a target DPI), cached on disk by source hash, and drawn from
+ImageReaders shared across reports so each asset is decoded once per process.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from PIL import Image as PILImage
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus.flowables import Flowable
+
+# Resolution images are resampled to for their drawn size
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+
+CACHE_DIR = os.environ.get('ASSET_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'simulador_assets')
+
+@lru_cache(maxsize=64)
+def _source_hash(path, mtime_ns, size):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 16), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def source_hash(path):
+    """SHA-256 of an image file, recomputed only when it changes"""
+    stat = os.stat(path)
+    return _source_hash(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+_prepared = {}
+
+def prepare_image(path, width, height, dpi=DEFAULT_DPI):
+    """
+    Path of a copy of the image resampled to width x height points at dpi.
+
+    Images already at or below the target size are returned unchanged
+    (never upscaled). Results are cached on disk by source hash and target
+    size, and remembered in-process until the source file changes.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, width, height, dpi)
+    prepared = _prepared.get(key)
+    if prepared is None or not os.path.exists(prepared):
+        prepared = _prepared[key] = _prepare_image(path, width, height, dpi)
+    return prepared
+
+def _prepare_image(path, width, height, dpi):
+    target = (max(int(round(width / 72.0 * dpi)), 1), max(int(round(height / 72.0 * dpi)), 1))
+
+    with PILImage.open(path) as image:
+        if image.width <= target[0] and image.height <= target[1] and image.mode in ('RGB', 'L'):
+            return path
+
+        keep_jpeg = image.format == 'JPEG' and image.mode in ('RGB', 'L')
+        extension = '.jpg' if keep_jpeg else '.png'
+        cached = os.path.join(CACHE_DIR, f"{source_hash(path)}_{target[0]}x{target[1]}{extension}")
+        if os.path.exists(cached):
+            return cached
+
+        if image.mode == 'P':
+            # Palette images (with transparency) would be converted on every embed
+            image = image.convert('RGBA')
+        if image.width > target[0] or image.height > target[1]:
+            image = image.resize(
+                (min(image.width, target[0]), min(image.height, target[1])),
+                PILImage.LANCZOS
+            )
+
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(suffix=extension, dir=CACHE_DIR)
+        os.close(fd)
+        try:
+            if keep_jpeg:
+                image.save(temporary, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+            else:
+                image.save(temporary, 'PNG', optimize=True)
+            os.replace(temporary, cached)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    return cached
+
+@lru_cache(maxsize=32)
+def _load_image_reader(path, mtime_ns, size):
+    return ImageReader(path)
+
+def get_image_reader(path):
+    """Decoded image for path, cached until the file changes"""
+    stat = os.stat(path)
+    return _load_image_reader(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+class CachedImage(Flowable):
+    """Image flowable drawn from a shared ImageReader (decoded once per process)"""
+
+    # Readers are shared between threads; embedding reads their file handle
+    _draw_lock = threading.Lock()
+
+    def __init__(self, reader, width, height, hAlign='CENTER'):
+        Flowable.__init__(self)
+        self.reader = reader
+        self.drawWidth = width
+        self.drawHeight = height
+        self.hAlign = hAlign
+
+    def wrap(self, availWidth, availHeight):
+        return self.drawWidth, self.drawHeight
+
+    def draw(self):
+        with self._draw_lock:
+            self.canv.drawImage(self.reader, 0, 0, self.drawWidth, self.drawHeight, mask='auto')
+
+def asset_image(path, width, height, dpi=DEFAULT_DPI, hAlign='CENTER'):
+    """Flowable for an image asset, resampled for its drawn size and cached"""
+    return CachedImage(get_image_reader(prepare_image(path, width, height, dpi)), width, height, hAlign)
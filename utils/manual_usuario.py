@@ -5,7 +5,23 @@ from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak, KeepTogether
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
 from reportlab.pdfgen import canvas
+import hashlib
 import os
+import tempfile
+import threading
+from . import image_assets
+from .image_assets import asset_image
+
+# Directorios del manual
+DOCS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static', 'docs'))
+IMAGES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static', 'images'))
+MANUAL_PATH = os.path.join(DOCS_DIR, 'manual_usuario.pdf')
+
+# Huella (fuente + imágenes) con la que se generó el PDF actual
+FINGERPRINT_PATH = MANUAL_PATH + '.sha256'
+
+_manual_lock = threading.Lock()
+_manual_cache = {'firma': None, 'huella': None}
 
 class NumberedCanvas(canvas.Canvas):
     """Canvas personalizado para agregar números de página"""
@@ -34,16 +50,25 @@ class NumberedCanvas(canvas.Canvas):
             f"Página {self._pageNumber} de {page_count}"
         )
 
-def crear_manual_usuario():
-    """Crear manual de usuario con diseño profesional tipo documento académico"""
+def crear_manual_usuario(filename=None, verbose=True):
+    """
+    Crear manual de usuario con diseño profesional tipo documento académico
+
+    Args:
+        filename: Ruta de salida (por defecto static/docs/manual_usuario.pdf)
+        verbose: Imprimir el progreso en la consola
+
+    Returns:
+        Ruta del PDF generado, o None si falló
+    """
 
     # Directorios
-    output_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'docs')
-    images_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'images')
+    output_dir = DOCS_DIR
+    images_dir = IMAGES_DIR
     os.makedirs(output_dir, exist_ok=True)
     os.makedirs(images_dir, exist_ok=True)
 
-    filename = os.path.join(output_dir, 'manual_usuario.pdf')
+    filename = filename or MANUAL_PATH
 
     # Configuración del documento
     doc = SimpleDocTemplate(
@@ -181,7 +206,7 @@ def crear_manual_usuario():
     logo_path = os.path.join(images_dir, 'logount.png')
     if os.path.exists(logo_path):
         try:
-            logo = Image(logo_path, width=7*cm, height=5*cm)
+            logo = asset_image(logo_path, width=7*cm, height=5*cm)
             logo.hAlign = 'CENTER'
             content.append(logo)
             content.append(Spacer(1, 1*cm))
@@ -197,7 +222,7 @@ def crear_manual_usuario():
     dashboard_path = os.path.join(images_dir, 'dashboard_principal.jpeg')
     if os.path.exists(dashboard_path):
         try:
-            dashboard = Image(dashboard_path, width=16*cm, height=9*cm)
+            dashboard = asset_image(dashboard_path, width=16*cm, height=9*cm)
             dashboard.hAlign = 'CENTER'
             content.append(dashboard)
             content.append(Spacer(1, 0.3*cm))
@@ -272,7 +297,7 @@ def crear_manual_usuario():
     modulo_img = os.path.join(images_dir, 'moduloA.jpeg')
     if os.path.exists(modulo_img):
         try:
-            img = Image(modulo_img, width=16*cm, height=9*cm)
+            img = asset_image(modulo_img, width=16*cm, height=9*cm)
             img.hAlign = 'CENTER'
             content.append(img)
             content.append(Spacer(1, 0.3*cm))
@@ -409,7 +434,7 @@ def crear_manual_usuario():
     form_img = os.path.join(images_dir, 'formulario_captura.jpeg')
     if os.path.exists(form_img):
         try:
-            img = Image(form_img, width=14*cm, height=8*cm)
+            img = asset_image(form_img, width=14*cm, height=8*cm)
             img.hAlign = 'CENTER'
             content.append(img)
             content.append(Spacer(1, 0.3*cm))
@@ -563,7 +588,7 @@ def crear_manual_usuario():
     results_img = os.path.join(images_dir, 'modulo_a_resultados.jpeg')
     if os.path.exists(results_img):
         try:
-            img = Image(results_img, width=14*cm, height=9*cm)
+            img = asset_image(results_img, width=14*cm, height=9*cm)
             img.hAlign = 'CENTER'
             content.append(img)
             content.append(Spacer(1, 0.3*cm))
@@ -582,7 +607,7 @@ def crear_manual_usuario():
     modulo_b_img = os.path.join(images_dir, 'formulavf.jpeg')
     if os.path.exists(modulo_b_img):
         try:
-            img = Image(modulo_b_img, width=10*cm, height=1*cm)
+            img = asset_image(modulo_b_img, width=10*cm, height=1*cm)
             img.hAlign = 'CENTER'
             content.append(img)
             content.append(Spacer(1, 0.3*cm))
@@ -674,7 +699,7 @@ def crear_manual_usuario():
     modulo_b_img = os.path.join(images_dir, 'modulo_b_captura.jpeg')
     if os.path.exists(modulo_b_img):
         try:
-            img = Image(modulo_b_img, width=14*cm, height=9*cm)
+            img = asset_image(modulo_b_img, width=14*cm, height=9*cm)
             img.hAlign = 'CENTER'
             content.append(img)
             content.append(Spacer(1, 0.3*cm))
@@ -771,7 +796,7 @@ def crear_manual_usuario():
     modulo_b_img = os.path.join(images_dir, 'formulacupon.jpeg')
     if os.path.exists(modulo_b_img):
         try:
-            img = Image(modulo_b_img, width=10*cm, height=2*cm)
+            img = asset_image(modulo_b_img, width=10*cm, height=2*cm)
             img.hAlign = 'CENTER'
             content.append(img)
             content.append(Spacer(1, 0.3*cm))
@@ -1056,6 +1081,8 @@ def crear_manual_usuario():
     # Generar PDF
     try:
         doc.build(content, canvasmaker=NumberedCanvas)
+        if not verbose:
+            return filename
         print(f"✅ Manual de usuario creado exitosamente")
         print(f"📄 Ubicación: {filename}")
         print(f"\n📁 Carpeta de imágenes: {images_dir}")
@@ -1075,5 +1102,88 @@ def crear_manual_usuario():
         traceback.print_exc()
         return None
 
+def _firma_fuentes():
+    """Nombre, tamaño y mtime de los archivos que determinan el manual (barato de obtener)"""
+    rutas = [os.path.abspath(__file__), os.path.abspath(image_assets.__file__)]
+    if os.path.isdir(IMAGES_DIR):
+        rutas += [os.path.join(IMAGES_DIR, nombre) for nombre in sorted(os.listdir(IMAGES_DIR))]
+    firma = []
+    for ruta in rutas:
+        estado = os.stat(ruta)
+        firma.append((os.path.basename(ruta), estado.st_size, estado.st_mtime_ns))
+    return tuple(firma)
+
+def huella_manual():
+    """
+    SHA-256 del código fuente del manual (y del preprocesado de imágenes) y de todas sus imágenes
+
+    Returns:
+        Huella hexadecimal; solo se recalcula si cambia algún archivo
+    """
+    firma = _firma_fuentes()
+    if _manual_cache['firma'] == firma:
+        return _manual_cache['huella']
+
+    sha = hashlib.sha256()
+    rutas = [os.path.abspath(__file__), os.path.abspath(image_assets.__file__)]
+    rutas += [os.path.join(IMAGES_DIR, nombre) for nombre, _, _ in firma[2:]]
+    for ruta in rutas:
+        sha.update(os.path.basename(ruta).encode('utf-8'))
+        with open(ruta, 'rb') as archivo:
+            sha.update(archivo.read())
+
+    _manual_cache['firma'] = firma
+    _manual_cache['huella'] = sha.hexdigest()
+    return _manual_cache['huella']
+
+def _huella_generada():
+    try:
+        with open(FINGERPRINT_PATH) as archivo:
+            return archivo.read().strip()
+    except OSError:
+        return None
+
+def obtener_manual_usuario():
+    """
+    Ruta del manual ya generado, construyéndolo solo si falta o si cambió su huella
+
+    La generación ocurre una vez (al desplegar con `python -m utils.manual_usuario`
+    o en la primera descarga) bajo un lock, en un archivo temporal que luego
+    reemplaza al definitivo de forma atómica, así que las descargas concurrentes
+    nunca leen un PDF a medio escribir. El PDF y su huella (.sha256) se versionan
+    juntos: tras cambiar el manual o sus imágenes, regenerarlo y commitear ambos.
+
+    Returns:
+        Tupla (ruta del PDF, huella)
+    """
+    huella = huella_manual()
+    if os.path.exists(MANUAL_PATH) and _huella_generada() == huella:
+        return MANUAL_PATH, huella
+
+    with _manual_lock:
+        # Otro hilo pudo haberlo generado mientras esperábamos
+        if os.path.exists(MANUAL_PATH) and _huella_generada() == huella:
+            return MANUAL_PATH, huella
+
+        os.makedirs(DOCS_DIR, exist_ok=True)
+        fd, temporal = tempfile.mkstemp(prefix='manual_', suffix='.pdf', dir=DOCS_DIR)
+        os.close(fd)
+        try:
+            if crear_manual_usuario(temporal, verbose=False) is None:
+                raise RuntimeError('No se pudo generar el manual de usuario')
+            # mkstemp crea el archivo con permisos 0600; el manual se sirve como estático
+            os.chmod(temporal, 0o644)
+            os.replace(temporal, MANUAL_PATH)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+        with open(FINGERPRINT_PATH, 'w') as archivo:
+            archivo.write(huella)
+
+    return MANUAL_PATH, huella
+
 if __name__ == "__main__":
-    crear_manual_usuario()
\ No newline at end of file
+    # Paso de despliegue: python -m utils.manual_usuario
+    ruta, huella = obtener_manual_usuario()
+    print(f"📄 Manual de usuario listo: {ruta} ({huella[:12]})")
\ No newline at end of file
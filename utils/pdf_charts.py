@@ -0,0 +1,181 @@
+"""
+Vector charts for PDF reports drawn with reportlab.graphics
+
+Charts are built straight from arrays as Drawing flowables, so reports embed
+them as PDF vector operators (no matplotlib rendering, no PNG round trip).
+"""
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+from reportlab.lib.colors import HexColor
+from reportlab.lib.units import cm
+from .chart_series import lttb_indices, DEFAULT_MAX_POINTS
+
+# Same palette as the report tables
+SERIES_COLORS = [HexColor('#3b82f6'), HexColor('#10b981'), HexColor('#f59e0b'),
+                 HexColor('#ef4444'), HexColor('#8b5cf6'), HexColor('#06b6d4')]
+AXIS_COLOR = HexColor('#6b7280')
+GRID_COLOR = HexColor('#e5e7eb')
+
+CHART_WIDTH = 16*cm
+CHART_HEIGHT = 7*cm
+
+# Plot area margins inside the drawing (room for axis labels and legend)
+MARGIN_LEFT = 1.9*cm
+MARGIN_RIGHT = 0.4*cm
+MARGIN_BOTTOM = 1.0*cm
+MARGIN_TOP = 0.9*cm
+
+# Long series are downsampled (LTTB) to these many points/bars; markers only on short
+# series; category labels are thinned to MAX_CATEGORY_LABELS
+MAX_LINE_POINTS = DEFAULT_MAX_POINTS
+MAX_BARS = 60
+MAX_MARKERS = 60
+MAX_CATEGORY_LABELS = 24
+
+def _currency(value):
+    return f'${value:,.0f}'
+
+def _floats(values):
+    return [float(value) for value in values]
+
+def _decimate(x, y, others, max_points):
+    """x, y and the other series reduced to the LTTB points of y"""
+    x, y, others = _floats(x), _floats(y), [_floats(values) for values in others]
+    indices = lttb_indices(x, y, max_points)
+    if len(indices) == len(x):
+        return x, y, others
+    return [x[i] for i in indices], [y[i] for i in indices], [[values[i] for i in indices] for values in others]
+
+def _drawing(width, height):
+    drawing = Drawing(width, height)
+    drawing.hAlign = 'CENTER'
+    return drawing
+
+def _style_value_axis(axis):
+    axis.labels.fontName = 'Helvetica'
+    axis.labels.fontSize = 7
+    axis.labels.fillColor = AXIS_COLOR
+    axis.strokeColor = AXIS_COLOR
+    axis.labelTextFormat = _currency
+    axis.visibleGrid = True
+    axis.gridStrokeColor = GRID_COLOR
+    axis.gridStrokeWidth = 0.5
+    axis.forceZero = True
+
+def _legend(drawing, names, fill_colors):
+    legend = Legend()
+    legend.alignment = 'right'
+    legend.x = MARGIN_LEFT
+    legend.y = drawing.height - 0.25*cm
+    legend.columnMaximum = 1
+    legend.deltax = 4*cm
+    legend.dxTextSpace = 4
+    legend.fontName = 'Helvetica'
+    legend.fontSize = 8
+    legend.strokeColor = None
+    legend.colorNamePairs = list(zip(fill_colors, names))
+    drawing.add(legend)
+
+def _plot_area(chart, drawing):
+    chart.x = MARGIN_LEFT
+    chart.y = MARGIN_BOTTOM
+    chart.width = drawing.width - MARGIN_LEFT - MARGIN_RIGHT
+    chart.height = drawing.height - MARGIN_BOTTOM - MARGIN_TOP
+
+def _category_names(labels):
+    """Category labels, blanking all but about MAX_CATEGORY_LABELS of them"""
+    labels = [str(label) for label in labels]
+    step = max(1, -(-len(labels) // MAX_CATEGORY_LABELS))
+    return [label if index % step == 0 else '' for index, label in enumerate(labels)]
+
+def portfolio_growth_chart(periodos, saldo, aportes, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Line chart of the portfolio balance against accumulated contributions"""
+    drawing = _drawing(width, height)
+    periodos, saldo, (aportes,) = _decimate(periodos, saldo, [aportes], MAX_LINE_POINTS)
+
+    plot = LinePlot()
+    _plot_area(plot, drawing)
+    plot.data = [list(zip(periodos, saldo)), list(zip(periodos, aportes))]
+    plot.joinedLines = 1
+    for index, color in enumerate(SERIES_COLORS[:2]):
+        plot.lines[index].strokeColor = color
+        plot.lines[index].strokeWidth = 1.5
+    plot.lines[1].strokeDashArray = (4, 3)
+    if len(periodos) <= MAX_MARKERS:
+        plot.lines[0].symbol = makeMarker('FilledCircle', size=2.5)
+        plot.lines[1].symbol = makeMarker('FilledSquare', size=2.5)
+
+    plot.xValueAxis.labels.fontName = 'Helvetica'
+    plot.xValueAxis.labels.fontSize = 7
+    plot.xValueAxis.labels.fillColor = AXIS_COLOR
+    plot.xValueAxis.strokeColor = AXIS_COLOR
+    plot.xValueAxis.labelTextFormat = '%d'
+    if periodos:
+        plot.xValueAxis.valueMin = min(periodos)
+        plot.xValueAxis.valueMax = max(periodos)
+    _style_value_axis(plot.yValueAxis)
+
+    drawing.add(plot)
+    _legend(drawing, ['Saldo Total', 'Aportes Acumulados'], SERIES_COLORS[:2])
+    return drawing
+
+def bond_flows_chart(periodos, flujos, valor_presente, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Grouped bar chart of nominal cash flows and their present value per period"""
+    drawing = _drawing(width, height)
+    periodos, flujos, (valor_presente,) = _decimate(periodos, flujos, [valor_presente], MAX_BARS)
+
+    chart = VerticalBarChart()
+    _plot_area(chart, drawing)
+    chart.data = [flujos, valor_presente]
+    chart.groupSpacing = 2
+    chart.barSpacing = 0
+    chart.bars.strokeColor = None
+    chart.bars[0].fillColor = SERIES_COLORS[0]
+    chart.bars[1].fillColor = SERIES_COLORS[1]
+
+    chart.categoryAxis.categoryNames = _category_names(int(periodo) for periodo in periodos)
+    chart.categoryAxis.labels.fontName = 'Helvetica'
+    chart.categoryAxis.labels.fontSize = 7
+    chart.categoryAxis.labels.fillColor = AXIS_COLOR
+    chart.categoryAxis.strokeColor = AXIS_COLOR
+    chart.categoryAxis.tickDown = 0
+    _style_value_axis(chart.valueAxis)
+
+    drawing.add(chart)
+    _legend(drawing, ['Flujo Nominal', 'Valor Presente'], SERIES_COLORS[:2])
+    return drawing
+
+def strategy_comparison_chart(nombres, capitales, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Bar chart of the projected final capital of each strategy"""
+    drawing = _drawing(width, height)
+    nombres = [str(nombre) for nombre in nombres]
+
+    chart = VerticalBarChart()
+    _plot_area(chart, drawing)
+    chart.y = MARGIN_BOTTOM + 0.4*cm
+    chart.height -= 0.4*cm + MARGIN_TOP / 2
+    chart.data = [_floats(capitales)]
+    chart.bars.strokeColor = None
+    for index in range(len(nombres)):
+        chart.bars[(0, index)].fillColor = SERIES_COLORS[index % len(SERIES_COLORS)]
+
+    chart.barLabelFormat = _currency
+    chart.barLabels.fontName = 'Helvetica'
+    chart.barLabels.fontSize = 7
+    chart.barLabels.nudge = 6
+
+    chart.categoryAxis.categoryNames = nombres
+    chart.categoryAxis.labels.fontName = 'Helvetica'
+    chart.categoryAxis.labels.fontSize = 7
+    chart.categoryAxis.labels.fillColor = colors.black
+    chart.categoryAxis.labels.boxAnchor = 'ne' if len(nombres) > 4 else 'n'
+    chart.categoryAxis.labels.angle = 20 if len(nombres) > 4 else 0
+    chart.categoryAxis.strokeColor = AXIS_COLOR
+    _style_value_axis(chart.valueAxis)
+
+    drawing.add(chart)
+    return drawing
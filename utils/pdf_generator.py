@@ -2,25 +2,56 @@
 PDF generation utilities for the Financial Simulator
 """
 import io
+import os
+import tempfile
+import threading
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak, HRFlowable
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle, Image, PageBreak, HRFlowable
 from reportlab.platypus.flowables import KeepTogether
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.colors import HexColor
 import pandas as pd
 from datetime import datetime
-
-class PDFGenerator:
-    """Class for generating professional PDF reports"""
+from .image_assets import asset_image
+from .pdf_charts import portfolio_growth_chart, bond_flows_chart, strategy_comparison_chart
+
+# Column formats for the periodic schedules: (DataFrame column, format)
+PORTFOLIO_SCHEDULE_COLUMNS = [
+    ('Periodo', 'int'),
+    ('Saldo Inicial', '${:,.2f}'),
+    ('Aportes', '${:,.2f}'),
+    ('Interés', '${:,.2f}'),
+    ('Saldo Final', '${:,.2f}'),
+    ('Aportes Acumulados', '${:,.2f}')
+]
+BOND_SCHEDULE_COLUMNS = [
+    ('Periodo', 'int'),
+    ('Flujo (USD)', '${:,.2f}'),
+    ('Valor Presente (USD)', '${:,.2f}')
+]
+
+# Usable height of an A4 page with the 2 cm report margins
+FRAME_HEIGHT = A4[1] - 4*cm
+
+# Rows kept in the body table when the full schedule goes to an appendix
+SUMMARY_MAX_ROWS = 24
+
+# Style registry shared by every report in the process (built once, read-only afterwards)
+_style_registry = None
+_style_registry_lock = threading.Lock()
+
+class PDFStyleRegistry:
+    """Colors, paragraph styles and table styles shared by all PDF reports"""
 
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._setup_colors()
         self._setup_styles()
+        self._setup_table_styles()
 
     def _setup_colors(self):
         """Setup color scheme for the PDF"""
@@ -99,10 +130,128 @@ class PDFGenerator:
             alignment=1
         )
 
-    def generate_portfolio_report(self, df, resumen, grafica_path=None):
-        """Generate professional PDF report for portfolio simulation"""
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
+        # Branding header
+        self.header_main_style = ParagraphStyle(
+            'HeaderMain',
+            fontSize=18,
+            fontName='Helvetica-Bold',
+            textColor=self.primary_color,
+            alignment=0
+        )
+        self.header_sub_style = ParagraphStyle(
+            'HeaderSub',
+            fontSize=12,
+            fontName='Helvetica',
+            textColor=self.secondary_color,
+            alignment=2
+        )
+
+    def _setup_table_styles(self):
+        """Setup the TableStyles reused by every report"""
+        self.table_styles = {
+            'header': TableStyle([
+                ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+                ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ]),
+            'info': TableStyle([
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('TEXTCOLOR', (0, 0), (0, -1), self.primary_color),
+                ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+                ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ]),
+            # Highlighted metric boxes (colored header row on a light background)
+            'key_metrics': self._highlight_style(self.secondary_color),
+            'risk': self._highlight_style(self.warning_color),
+            'params': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, -1), self.light_bg),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('TEXTCOLOR', (0, 0), (0, -1), self.primary_color),
+                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+                ('LEFTPADDING', (0, 0), (-1, -1), 10),
+                ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+                ('TOPPADDING', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ]),
+            # Data tables: (body font size, grid width, horizontal padding, vertical padding)
+            'detail': self._data_style(8, 0.3, 3, 4),
+            'detail_compact': self._data_style(7, 0.3, 3, 4),
+            'grid': self._data_style(8, 0.5, 4, 6),
+            'strategy': self._data_style(8, 0.3, 4, 6),
+            'breakdown': self._data_style(9, 0.3, 6, 8),
+            'config': self._data_style(8, 0.3, 6, 8),
+        }
+
+        # (header, body) row heights of the schedule styles: single-line cells are
+        # one leading plus vertical padding (FONTSIZE leaves the 12pt default leading)
+        self.schedule_row_heights = {
+            'detail': (12 + 2*4, 12 + 2*4),
+            'detail_compact': (12 + 2*4, 12 + 2*4),
+        }
+
+    def _highlight_style(self, header_color):
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), header_color),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BACKGROUND', (0, 1), (-1, -1), self.light_bg),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ])
+
+    def _data_style(self, font_size, grid_width, h_padding, v_padding):
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), self.table_header_bg),
+            ('TEXTCOLOR', (0, 0), (-1, 0), self.primary_color),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('GRID', (0, 0), (-1, -1), grid_width, colors.lightgrey),
+            ('FONTSIZE', (0, 1), (-1, -1), font_size),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), h_padding),
+            ('RIGHTPADDING', (0, 0), (-1, -1), h_padding),
+            ('TOPPADDING', (0, 0), (-1, -1), v_padding),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), v_padding),
+        ])
+
+def get_style_registry():
+    """Return the process-wide style registry, building it on first use"""
+    global _style_registry
+    if _style_registry is None:
+        with _style_registry_lock:
+            if _style_registry is None:
+                _style_registry = PDFStyleRegistry()
+    return _style_registry
+
+class PDFGenerator:
+    """Class for generating professional PDF reports"""
+
+    def __init__(self):
+        # Reuse the shared registry: per-report setup is only attribute lookups
+        registry = get_style_registry()
+        self.registry = registry
+        self.styles = registry.styles
+        for name in ('primary_color', 'secondary_color', 'accent_color', 'warning_color',
+                     'light_bg', 'table_header_bg', 'positive_color', 'negative_color',
+                     'title_style', 'subtitle_style', 'section_style', 'normal_style',
+                     'small_style', 'footer_style'):
+            setattr(self, name, getattr(registry, name))
+
+    def _new_document(self, buffer):
+        """A4 document with the standard report margins"""
+        return SimpleDocTemplate(
             buffer,
             pagesize=A4,
             leftMargin=2*cm,
@@ -110,46 +259,141 @@ class PDFGenerator:
             topMargin=2*cm,
             bottomMargin=2*cm
         )
-        elements = []
 
-        # Header with branding
+    def _table(self, data, col_widths, style_name, extra_commands=None, repeat_rows=0):
+        """Table using a registry style, optionally extended with report-specific commands"""
+        style = self.registry.table_styles[style_name]
+        if extra_commands:
+            style = TableStyle(extra_commands, parent=style)
+        table = Table(data, colWidths=col_widths, repeatRows=repeat_rows)
+        table.setStyle(style)
+        return table
+
+    def _header_flowables(self, title, subtitle, tipo_analisis):
+        """Branding header, title block and generation info shared by every report"""
         header_data = [
-            [Paragraph("TU RETIRO SEGURO", ParagraphStyle('HeaderMain',
-                fontSize=18, fontName='Helvetica-Bold', textColor=self.primary_color, alignment=0)),
-             Paragraph("Reporte Profesional", ParagraphStyle('HeaderSub',
-                fontSize=12, fontName='Helvetica', textColor=self.secondary_color, alignment=2))]
+            [Paragraph("TU RETIRO SEGURO", self.registry.header_main_style),
+             Paragraph("Reporte Profesional", self.registry.header_sub_style)]
         ]
-        header_table = Table(header_data, colWidths=[10*cm, 6*cm])
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 10))  # Add space before the line
-        elements.append(HRFlowable(width="100%", thickness=2, color=self.secondary_color, spaceAfter=20))
-
-        # Main Title
-        elements.append(Paragraph("Simulación de Crecimiento de Cartera", self.title_style))
-        elements.append(Paragraph("Análisis detallado de proyección financiera", self.small_style))
-        elements.append(Spacer(1, 15))
-
-        # Generation info
         info_data = [
             ["Fecha de generación:", datetime.now().strftime('%d/%m/%Y %H:%M')],
-            ["Tipo de análisis:", "Proyección de inversión con interés compuesto"],
+            ["Tipo de análisis:", tipo_analisis],
             ["Moneda:", "USD (Dólares Americanos)"]
         ]
-        info_table = Table(info_data, colWidths=[4*cm, 12*cm])
-        info_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), self.primary_color),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 20))
+        return [
+            self._table(header_data, [10*cm, 6*cm], 'header'),
+            Spacer(1, 10),  # Add space before the line
+            HRFlowable(width="100%", thickness=2, color=self.secondary_color, spaceAfter=20),
+            Paragraph(title, self.title_style),
+            Paragraph(subtitle, self.small_style),
+            Spacer(1, 15),
+            self._table(info_data, [4*cm, 12*cm], 'info'),
+            Spacer(1, 20)
+        ]
+
+    def _footer_flowables(self, nota):
+        """Footer line with the disclaimer and generation timestamp"""
+        return [
+            Spacer(1, 30),
+            HRFlowable(width="100%", thickness=1, color=colors.lightgrey, spaceAfter=10),
+            Paragraph(f"Reporte generado por Simulador Financiero - {nota}", self.footer_style),
+            Paragraph(f"Página 1 - Generado el {datetime.now().strftime('%d/%m/%Y a las %H:%M')}", self.footer_style)
+        ]
+
+    def _format_columns(self, df, columns):
+        """Format a schedule column by column and return its rows"""
+        formatted = []
+        for column, fmt in columns:
+            values = df[column]
+            if fmt == 'int':
+                formatted.append(values.astype(int).astype(str).tolist())
+            else:
+                formatted.append(values.map(fmt.format).tolist())
+        return [list(row) for row in zip(*formatted)]
+
+    def _schedule_tables(self, header, rows, col_widths, style_name):
+        """
+        Page-sized LongTables with fixed row heights, so ReportLab neither
+        measures every cell nor re-splits one huge table on each page
+        """
+        header_height, row_height = self.registry.schedule_row_heights[style_name]
+        rows_per_table = max(int((FRAME_HEIGHT - header_height) // row_height), 1)
+
+        tables = []
+        for start in range(0, len(rows), rows_per_table):
+            chunk = rows[start:start + rows_per_table]
+            table = LongTable(
+                [header] + chunk,
+                colWidths=col_widths,
+                rowHeights=[header_height] + [row_height] * len(chunk),
+                repeatRows=1
+            )
+            table.setStyle(self.registry.table_styles[style_name])
+            tables.append(table)
+        return tables
+
+    def _summary_rows(self, rows, max_rows=SUMMARY_MAX_ROWS):
+        """Every step-th row (always ending on the last one) so at most max_rows remain"""
+        step = max(-(-len(rows) // max_rows), 1)
+        return step, rows[len(rows) - 1 - (len(rows) - 1) // step * step::step]
+
+    def _schedule_section(self, title, description, header, rows, col_widths, style_name, appendix=False):
+        """
+        Flowables for a periodic schedule. With appendix=True the body gets a
+        sampled table and the full schedule is returned separately for the end
+        of the report. Returns (body, appendix_flowables).
+        """
+        if not appendix:
+            body = [Paragraph(title, self.section_style), Paragraph(description, self.normal_style)]
+            body.extend(self._schedule_tables(header, rows, col_widths, style_name))
+            return body, []
+
+        step, summary = self._summary_rows(rows)
+        body = [
+            Paragraph(title, self.section_style),
+            Paragraph(f"Se muestra un período de cada {step}; el detalle completo de los "
+                      f"{len(rows)} períodos está en el anexo", self.normal_style)
+        ]
+        body.extend(self._schedule_tables(header, summary, col_widths, style_name))
+
+        anexo = [
+            PageBreak(),
+            Paragraph(f"📎 ANEXO - {title.split(' ', 1)[-1]}", self.section_style),
+            Paragraph(description, self.normal_style)
+        ]
+        anexo.extend(self._schedule_tables(header, rows, col_widths, style_name))
+        return body, anexo
+
+    def _image(self, path, width, height):
+        """Image flowable resampled for its drawn size, backed by a cached reader"""
+        return asset_image(path, width, height)
+
+    def generate_portfolio_report(self, df, resumen, grafica_path=None, appendix=False, chart=True):
+        """Generate professional PDF report for portfolio simulation (appendix=True: summary + full schedule annex)"""
+        buffer = io.BytesIO()
+        doc = self._new_document(buffer)
+
+        # Header with branding, title and generation info
+        elements = self._header_flowables(
+            "Simulación de Crecimiento de Cartera",
+            "Análisis detallado de proyección financiera",
+            "Proyección de inversión con interés compuesto"
+        )
+        body, anexo = self._portfolio_sections(df, resumen, grafica_path, appendix, chart)
+        elements.extend(body)
+        elements.extend(anexo)
+
+        # Footer
+        elements.extend(self._footer_flowables("Todos los cálculos son proyecciones basadas en los parámetros proporcionados"))
+
+        # Build PDF
+        doc.build(elements)
+        buffer.seek(0)
+        return buffer
+
+    def _portfolio_sections(self, df, resumen, grafica_path=None, appendix=False, chart=True):
+        """Flowables of the portfolio report body: (body, annex); chart draws a vector chart when no image is given"""
+        elements = []
 
         # Executive Summary Section
         elements.append(Paragraph("📊 RESUMEN EJECUTIVO", self.section_style))
@@ -168,22 +412,7 @@ class PDFGenerator:
              "Porcentaje de retorno sobre la inversión"]
         ]
 
-        key_metrics_table = Table(key_metrics_data, colWidths=[3.5*cm, 3.5*cm, 9*cm])
-        key_metrics_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.secondary_color),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), self.light_bg),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        key_metrics_table = self._table(key_metrics_data, [3.5*cm, 3.5*cm, 9*cm], 'key_metrics')
         elements.append(key_metrics_table)
         elements.append(Spacer(1, 15))
 
@@ -200,29 +429,19 @@ class PDFGenerator:
             ["TEA Equivalente", f"{resumen.get('tea_equivalente', resumen.get('tea', 0)):.2f}%"]
         ]
 
-        params_table = Table(params_data, colWidths=[5*cm, 11*cm])
-        params_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), self.light_bg),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), self.primary_color),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        params_table = self._table(params_data, [5*cm, 11*cm], 'params')
         elements.append(params_table)
         elements.append(Spacer(1, 20))
 
         # Chart Section
-        if grafica_path:
+        if grafica_path or (chart and len(df)):
             elements.append(Paragraph("📈 EVOLUCIÓN DE LA CARTERA", self.section_style))
             elements.append(Paragraph("Visualización gráfica del crecimiento del capital a lo largo del tiempo", self.normal_style))
             try:
-                img = Image(grafica_path, 14*cm, 8*cm)
-                img.hAlign = 'CENTER'
+                if grafica_path:
+                    img = self._image(grafica_path, 14*cm, 8*cm)
+                else:
+                    img = portfolio_growth_chart(df['Periodo'], df['Saldo Final'], df['Aportes Acumulados'])
                 elements.append(Spacer(1, 10))
                 elements.append(img)
                 elements.append(Spacer(1, 15))
@@ -252,125 +471,53 @@ class PDFGenerator:
 
         elements.append(Spacer(1, 20))
 
-        # Detailed Results Table
-        elements.append(Paragraph("📋 DETALLE PERIÓDICO COMPLETO", self.section_style))
-        elements.append(Paragraph(f"Evolución mensual/anual del capital - Total de {len(df)} períodos", self.normal_style))
+        # Detailed Results Table (all periods, or sampled with the full schedule in an appendix)
+        header = ['Periodo', 'Saldo Inicial', 'Aportes', 'Interés', 'Saldo Final', 'Aportes Acum.']
+        rows = self._format_columns(df, PORTFOLIO_SCHEDULE_COLUMNS)
 
-        # Show all periods in the table
-        table_data = [['Periodo', 'Saldo Inicial', 'Aportes', 'Interés', 'Saldo Final', 'Aportes Acum.']]
-        for _, row in df.iterrows():
-            table_data.append([
-                str(int(row['Periodo'])),
-                f"${row['Saldo Inicial']:,.2f}",
-                f"${row['Aportes']:,.2f}",
-                f"${row['Interés']:,.2f}",
-                f"${row['Saldo Final']:,.2f}",
-                f"${row['Aportes Acumulados']:,.2f}"
-            ])
-
-        # Create table - use smaller font for many rows
-        font_size = 7 if len(df) > 50 else 8  # Smaller font for very long tables
+        # Smaller font for very long tables
+        style_name = 'detail_compact' if len(df) > 50 else 'detail'
         col_widths = [1.2*cm, 2.2*cm, 1.8*cm, 1.8*cm, 2.2*cm, 2.8*cm] if len(df) > 50 else [1.5*cm, 2.5*cm, 2*cm, 2*cm, 2.5*cm, 3*cm]
 
-        full_table = Table(table_data, colWidths=col_widths, repeatRows=1)  # repeatRows=1 to repeat header on new pages
-        table_style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.table_header_bg),
-            ('TEXTCOLOR', (0, 0), (-1, 0), self.primary_color),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.3, colors.lightgrey),
-            ('FONTSIZE', (0, 1), (-1, -1), font_size),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 3),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ])
-        full_table.setStyle(table_style)
-        elements.append(full_table)
-
-        # Footer
-        elements.append(Spacer(1, 30))
-        elements.append(HRFlowable(width="100%", thickness=1, color=colors.lightgrey, spaceAfter=10))
-        elements.append(Paragraph("Reporte generado por Simulador Financiero - Todos los cálculos son proyecciones basadas en los parámetros proporcionados", self.footer_style))
-        elements.append(Paragraph(f"Página 1 - Generado el {datetime.now().strftime('%d/%m/%Y a las %H:%M')}", self.footer_style))
+        body, anexo = self._schedule_section(
+            "📋 DETALLE PERIÓDICO COMPLETO",
+            f"Evolución mensual/anual del capital - Total de {len(df)} períodos",
+            header, rows, col_widths, style_name, appendix
+        )
+        elements.extend(body)
 
-        # Build PDF
-        doc.build(elements)
-        buffer.seek(0)
-        return buffer
+        return elements, anexo
 
     def _get_table_style(self):
         """Get consistent table styling"""
-        return TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.table_header_bg),
-            ('TEXTCOLOR', (0, 0), (-1, 0), self.primary_color),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ])
+        return self.registry.table_styles['grid']
 
-    def generate_bond_report(self, df, resumen):
-        """Generate professional PDF report for bond valuation"""
+    def generate_bond_report(self, df, resumen, appendix=False, chart=True):
+        """Generate professional PDF report for bond valuation (appendix=True: summary + full schedule annex)"""
         buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            leftMargin=2*cm,
-            rightMargin=2*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm
+        doc = self._new_document(buffer)
+
+        # Header with branding, title and generation info
+        elements = self._header_flowables(
+            "Valoración de Bonos",
+            "Análisis detallado de valoración de instrumento de deuda",
+            "Valoración de bono con descuento de flujos"
         )
-        elements = []
+        body, anexo = self._bond_sections(df, resumen, appendix, chart)
+        elements.extend(body)
+        elements.extend(anexo)
 
-        # Header with branding
-        header_data = [
-            [Paragraph("TU RETIRO SEGURO", ParagraphStyle('HeaderMain',
-                fontSize=18, fontName='Helvetica-Bold', textColor=self.primary_color, alignment=0)),
-             Paragraph("Reporte Profesional", ParagraphStyle('HeaderSub',
-                fontSize=12, fontName='Helvetica', textColor=self.secondary_color, alignment=2))]
-        ]
-        header_table = Table(header_data, colWidths=[10*cm, 6*cm])
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 10))
-        elements.append(HRFlowable(width="100%", thickness=2, color=self.secondary_color, spaceAfter=20))
-
-        # Main Title
-        elements.append(Paragraph("Valoración de Bonos", self.title_style))
-        elements.append(Paragraph("Análisis detallado de valoración de instrumento de deuda", self.small_style))
-        elements.append(Spacer(1, 15))
+        # Footer
+        elements.extend(self._footer_flowables("Todos los cálculos son valoraciones basadas en los parámetros proporcionados"))
 
-        # Generation info
-        info_data = [
-            ["Fecha de generación:", datetime.now().strftime('%d/%m/%Y %H:%M')],
-            ["Tipo de análisis:", "Valoración de bono con descuento de flujos"],
-            ["Moneda:", "USD (Dólares Americanos)"]
-        ]
-        info_table = Table(info_data, colWidths=[4*cm, 12*cm])
-        info_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), self.primary_color),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 20))
+        # Build PDF
+        doc.build(elements)
+        buffer.seek(0)
+        return buffer
+
+    def _bond_sections(self, df, resumen, appendix=False, chart=True):
+        """Flowables of the bond report body: (body, annex); chart adds a vector cash flow chart"""
+        elements = []
 
         # Executive Summary Section
         elements.append(Paragraph("📊 RESUMEN EJECUTIVO", self.section_style))
@@ -397,25 +544,11 @@ class PDFGenerator:
              "Tasa de descuento utilizada en la valoración"]
         ]
 
-        key_metrics_table = Table(key_metrics_data, colWidths=[3.5*cm, 3.5*cm, 9*cm])
-        key_metrics_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.secondary_color),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), self.light_bg),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        key_metrics_table = self._table(key_metrics_data, [3.5*cm, 3.5*cm, 9*cm], 'key_metrics', [
             # Color the status row
             ('TEXTCOLOR', (1, 3), (1, 3), estado_color),
             ('FONTNAME', (1, 3), (1, 3), 'Helvetica-Bold'),
-        ]))
+        ])
         elements.append(key_metrics_table)
         elements.append(Spacer(1, 15))
 
@@ -429,22 +562,18 @@ class PDFGenerator:
             ["TEA de Mercado", f"{resumen.get('tea_retorno', 0):.2f}%"]
         ]
 
-        params_table = Table(params_data, colWidths=[5*cm, 11*cm])
-        params_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), self.light_bg),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), self.primary_color),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        params_table = self._table(params_data, [5*cm, 11*cm], 'params')
         elements.append(params_table)
         elements.append(Spacer(1, 20))
 
+        # Cash Flow Chart
+        if chart and len(df):
+            elements.append(Paragraph("📈 FLUJOS DEL BONO", self.section_style))
+            elements.append(Paragraph("Flujos nominales y su valor presente en cada período", self.normal_style))
+            elements.append(Spacer(1, 10))
+            elements.append(bond_flows_chart(df['Periodo'], df['Flujo (USD)'], df['Valor Presente (USD)']))
+            elements.append(Spacer(1, 15))
+
         # Bond Analysis
         elements.append(Paragraph("💡 ANÁLISIS DE VALORACIÓN", self.section_style))
 
@@ -479,105 +608,49 @@ class PDFGenerator:
 
         elements.append(Spacer(1, 20))
 
-        # Cash Flows Table
-        elements.append(Paragraph("📋 FLUJOS DE EFECTIVO DETALLADOS", self.section_style))
-        elements.append(Paragraph(f"Desglose completo de pagos e intereses descontados - Total de {len(df)} períodos", self.normal_style))
-
-        # Prepare table data
-        table_data = [['Periodo', 'Flujo de Caja (USD)', 'Valor Presente (USD)']]
-        for _, row in df.iterrows():
-            table_data.append([
-                str(int(row['Periodo'])),
-                f"${row['Flujo (USD)']:,.2f}",
-                f"${row['Valor Presente (USD)']:,.2f}"
-            ])
+        # Cash Flows Table (all periods, or sampled with the full schedule in an appendix)
+        header = ['Periodo', 'Flujo de Caja (USD)', 'Valor Presente (USD)']
+        rows = self._format_columns(df, BOND_SCHEDULE_COLUMNS)
 
-        # Create table with appropriate sizing
-        font_size = 7 if len(df) > 50 else 8
+        style_name = 'detail_compact' if len(df) > 50 else 'detail'
         col_widths = [2*cm, 3.5*cm, 3.5*cm] if len(df) > 50 else [2.5*cm, 4*cm, 4*cm]
 
-        flows_table = Table(table_data, colWidths=col_widths, repeatRows=1)
-        table_style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.table_header_bg),
-            ('TEXTCOLOR', (0, 0), (-1, 0), self.primary_color),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.3, colors.lightgrey),
-            ('FONTSIZE', (0, 1), (-1, -1), font_size),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 3),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ])
-        flows_table.setStyle(table_style)
-        elements.append(flows_table)
+        body, anexo = self._schedule_section(
+            "📋 FLUJOS DE EFECTIVO DETALLADOS",
+            f"Desglose completo de pagos e intereses descontados - Total de {len(df)} períodos",
+            header, rows, col_widths, style_name, appendix
+        )
+        elements.extend(body)
+
+        return elements, anexo
+
+    def generate_retirement_report(self, resumen):
+        """Generate professional PDF report for retirement projection"""
+        buffer = io.BytesIO()
+        doc = self._new_document(buffer)
+
+        # Header with branding, title and generation info
+        elements = self._header_flowables(
+            "Proyección de Jubilación",
+            "Análisis detallado de planificación financiera para el retiro",
+            "Proyección de pensión con impuestos"
+        )
+        body, anexo = self._retirement_sections(resumen)
+        elements.extend(body)
+        elements.extend(anexo)
 
         # Footer
-        elements.append(Spacer(1, 30))
-        elements.append(HRFlowable(width="100%", thickness=1, color=colors.lightgrey, spaceAfter=10))
-        elements.append(Paragraph("Reporte generado por Simulador Financiero - Todos los cálculos son valoraciones basadas en los parámetros proporcionados", self.footer_style))
-        elements.append(Paragraph(f"Página 1 - Generado el {datetime.now().strftime('%d/%m/%Y a las %H:%M')}", self.footer_style))
+        elements.extend(self._footer_flowables("Todos los cálculos son proyecciones basadas en los parámetros proporcionados"))
 
         # Build PDF
         doc.build(elements)
         buffer.seek(0)
         return buffer
 
-    def generate_retirement_report(self, resumen):
-        """Generate professional PDF report for retirement projection"""
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            leftMargin=2*cm,
-            rightMargin=2*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm
-        )
+    def _retirement_sections(self, resumen):
+        """Flowables of the retirement report body: (body, annex)"""
         elements = []
 
-        # Header with branding
-        header_data = [
-            [Paragraph("TU RETIRO SEGURO", ParagraphStyle('HeaderMain',
-                fontSize=18, fontName='Helvetica-Bold', textColor=self.primary_color, alignment=0)),
-             Paragraph("Reporte Profesional", ParagraphStyle('HeaderSub',
-                fontSize=12, fontName='Helvetica', textColor=self.secondary_color, alignment=2))]
-        ]
-        header_table = Table(header_data, colWidths=[10*cm, 6*cm])
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 10))
-        elements.append(HRFlowable(width="100%", thickness=2, color=self.secondary_color, spaceAfter=20))
-
-        # Main Title
-        elements.append(Paragraph("Proyección de Jubilación", self.title_style))
-        elements.append(Paragraph("Análisis detallado de planificación financiera para el retiro", self.small_style))
-        elements.append(Spacer(1, 15))
-
-        # Generation info
-        info_data = [
-            ["Fecha de generación:", datetime.now().strftime('%d/%m/%Y %H:%M')],
-            ["Tipo de análisis:", "Proyección de pensión con impuestos"],
-            ["Moneda:", "USD (Dólares Americanos)"]
-        ]
-        info_table = Table(info_data, colWidths=[4*cm, 12*cm])
-        info_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), self.primary_color),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 20))
-
         # Executive Summary Section
         elements.append(Paragraph("📊 RESUMEN EJECUTIVO", self.section_style))
         elements.append(Paragraph("Principales indicadores de la proyección de jubilación", self.normal_style))
@@ -618,22 +691,7 @@ class PDFGenerator:
                  "Modalidad de retiro seleccionada"]
             ]
 
-        key_metrics_table = Table(key_metrics_data, colWidths=[3.5*cm, 3.5*cm, 9*cm])
-        key_metrics_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.secondary_color),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), self.light_bg),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        key_metrics_table = self._table(key_metrics_data, [3.5*cm, 3.5*cm, 9*cm], 'key_metrics')
         elements.append(key_metrics_table)
         elements.append(Spacer(1, 15))
 
@@ -657,19 +715,7 @@ class PDFGenerator:
                 ["Usar TEA de Cartera", "Sí" if resumen.get('usar_misma_tea') else "No"]
             ])
 
-        params_table = Table(params_data, colWidths=[5*cm, 11*cm])
-        params_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), self.light_bg),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), self.primary_color),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        params_table = self._table(params_data, [5*cm, 11*cm], 'params')
         elements.append(params_table)
         elements.append(Spacer(1, 20))
 
@@ -733,22 +779,7 @@ class PDFGenerator:
                 ["Retiro Neto", f"${resumen.get('pension_mensual_neta', 0):,.2f}"]
             ]
 
-        breakdown_table = Table(breakdown_data, colWidths=[4*cm, 4*cm, 4*cm] if resumen.get('tipo_retiro') == 'pension' else [6*cm, 6*cm])
-        breakdown_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.table_header_bg),
-            ('TEXTCOLOR', (0, 0), (-1, 0), self.primary_color),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.3, colors.lightgrey),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        breakdown_table = self._table(breakdown_data, [4*cm, 4*cm, 4*cm] if resumen.get('tipo_retiro') == 'pension' else [6*cm, 6*cm], 'breakdown')
         elements.append(breakdown_table)
 
         # Additional information
@@ -757,69 +788,35 @@ class PDFGenerator:
             elements.append(Paragraph("📝 INFORMACIÓN ADICIONAL", self.section_style))
             elements.append(Paragraph(resumen.get('mensaje', 'Cálculo completado exitosamente'), self.normal_style))
 
+        return elements, []
+
+    def generate_strategy_comparison_report(self, estrategias, benchmarks, analisis_riesgo, configuracion=None, chart=True):
+        """Generate professional PDF report for strategy comparison"""
+        buffer = io.BytesIO()
+        doc = self._new_document(buffer)
+
+        # Header with branding, title and generation info
+        elements = self._header_flowables(
+            "Comparación de Estrategias de Inversión",
+            "Análisis comparativo de diferentes estrategias de inversión",
+            "Comparación de estrategias de inversión"
+        )
+        body, anexo = self._strategy_comparison_sections(estrategias, benchmarks, analisis_riesgo, configuracion, chart)
+        elements.extend(body)
+        elements.extend(anexo)
+
         # Footer
-        elements.append(Spacer(1, 30))
-        elements.append(HRFlowable(width="100%", thickness=1, color=colors.lightgrey, spaceAfter=10))
-        elements.append(Paragraph("Reporte generado por Simulador Financiero - Todos los cálculos son proyecciones basadas en los parámetros proporcionados", self.footer_style))
-        elements.append(Paragraph(f"Página 1 - Generado el {datetime.now().strftime('%d/%m/%Y a las %H:%M')}", self.footer_style))
+        elements.extend(self._footer_flowables("Todos los cálculos son proyecciones basadas en los parámetros proporcionados"))
 
         # Build PDF
         doc.build(elements)
         buffer.seek(0)
         return buffer
 
-    def generate_strategy_comparison_report(self, estrategias, benchmarks, analisis_riesgo, configuracion=None):
-        """Generate professional PDF report for strategy comparison"""
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            leftMargin=2*cm,
-            rightMargin=2*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm
-        )
+    def _strategy_comparison_sections(self, estrategias, benchmarks, analisis_riesgo, configuracion=None, chart=True):
+        """Flowables of the strategy comparison body: (body, annex); chart adds a vector capital chart"""
         elements = []
 
-        # Header with branding
-        header_data = [
-            [Paragraph("TU RETIRO SEGURO", ParagraphStyle('HeaderMain',
-                fontSize=18, fontName='Helvetica-Bold', textColor=self.primary_color, alignment=0)),
-             Paragraph("Reporte Profesional", ParagraphStyle('HeaderSub',
-                fontSize=12, fontName='Helvetica', textColor=self.secondary_color, alignment=2))]
-        ]
-        header_table = Table(header_data, colWidths=[10*cm, 6*cm])
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 10))
-        elements.append(HRFlowable(width="100%", thickness=2, color=self.secondary_color, spaceAfter=20))
-
-        # Main Title
-        elements.append(Paragraph("Comparación de Estrategias de Inversión", self.title_style))
-        elements.append(Paragraph("Análisis comparativo de diferentes estrategias de inversión", self.small_style))
-        elements.append(Spacer(1, 15))
-
-        # Generation info
-        info_data = [
-            ["Fecha de generación:", datetime.now().strftime('%d/%m/%Y %H:%M')],
-            ["Tipo de análisis:", "Comparación de estrategias de inversión"],
-            ["Moneda:", "USD (Dólares Americanos)"]
-        ]
-        info_table = Table(info_data, colWidths=[4*cm, 12*cm])
-        info_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), self.primary_color),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 20))
-
         # Executive Summary Section
         elements.append(Paragraph("📊 RESUMEN EJECUTIVO", self.section_style))
         elements.append(Paragraph("Principales indicadores de la comparación de estrategias", self.normal_style))
@@ -842,22 +839,7 @@ class PDFGenerator:
              "Probabilidad de superar el escenario promedio"]
         ]
 
-        key_metrics_table = Table(key_metrics_data, colWidths=[3.5*cm, 3.5*cm, 9*cm])
-        key_metrics_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.secondary_color),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), self.light_bg),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        key_metrics_table = self._table(key_metrics_data, [3.5*cm, 3.5*cm, 9*cm], 'key_metrics')
         elements.append(key_metrics_table)
         elements.append(Spacer(1, 15))
 
@@ -876,25 +858,18 @@ class PDFGenerator:
                 f"{estrategia.get('Ratio Sharpe', 0):.3f}"
             ])
 
-        strategy_table = Table(table_data, colWidths=[3*cm, 3*cm, 2.5*cm, 2.5*cm, 2.5*cm])
-        strategy_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.table_header_bg),
-            ('TEXTCOLOR', (0, 0), (-1, 0), self.primary_color),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.3, colors.lightgrey),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        strategy_table = self._table(table_data, [3*cm, 3*cm, 2.5*cm, 2.5*cm, 2.5*cm], 'strategy')
         elements.append(strategy_table)
         elements.append(Spacer(1, 20))
 
+        if chart:
+            elements.append(Paragraph("Capital final proyectado por estrategia", self.normal_style))
+            elements.append(strategy_comparison_chart(
+                [estrategia.get('Estrategia', 'N/A') for estrategia in estrategias],
+                [estrategia.get('Capital Promedio (USD)', 0) for estrategia in estrategias]
+            ))
+            elements.append(Spacer(1, 20))
+
         # Benchmark Comparison
         elements.append(Paragraph("📈 COMPARACIÓN CON BENCHMARKS", self.section_style))
         elements.append(Paragraph("Comparación con índices de mercado y estrategias tradicionales", self.normal_style))
@@ -910,22 +885,7 @@ class PDFGenerator:
                 f"{diferencia:+.2f}%"
             ])
 
-        benchmark_table = Table(benchmark_data, colWidths=[3.5*cm, 3*cm, 2*cm, 3*cm])
-        benchmark_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.table_header_bg),
-            ('TEXTCOLOR', (0, 0), (-1, 0), self.primary_color),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.3, colors.lightgrey),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        benchmark_table = self._table(benchmark_data, [3.5*cm, 3*cm, 2*cm, 3*cm], 'strategy')
         elements.append(benchmark_table)
         elements.append(Spacer(1, 20))
 
@@ -945,22 +905,7 @@ class PDFGenerator:
              "Probabilidad de superar el rendimiento promedio"]
         ]
 
-        risk_table = Table(risk_data, colWidths=[4*cm, 3*cm, 9*cm])
-        risk_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.warning_color),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, -1), self.light_bg),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.white),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        risk_table = self._table(risk_data, [4*cm, 3*cm, 9*cm], 'risk')
         elements.append(risk_table)
         elements.append(Spacer(1, 20))
 
@@ -1000,46 +945,78 @@ class PDFGenerator:
                     ["Bienes Raíces (%)", f"{custom.get('realEstate', 0)}%"]
                 ])
 
-            config_table = Table(config_data, colWidths=[5*cm, 11*cm])
-            config_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), self.table_header_bg),
-                ('TEXTCOLOR', (0, 0), (-1, 0), self.primary_color),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 0.3, colors.lightgrey),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ]))
+            config_table = self._table(config_data, [5*cm, 11*cm], 'config')
             elements.append(config_table)
             elements.append(Spacer(1, 20))
 
+        return elements, []
+
+    def generate_complete_report(self, output_path, cartera_data=None, jubilacion_data=None,
+                                 bono_data=None, comparacion_data=None, appendix=True):
+        """
+        Generate the combined report (modules A, B, C and strategy comparison)
+        straight into output_path. Modules without data are skipped; with
+        appendix=True the long schedules are sampled in the body and printed
+        in full at the end.
+        """
+        doc = self._new_document(output_path)
+        elements = self._header_flowables(
+            "Reporte Financiero Completo",
+            "Plan integral de inversión, jubilación, bonos y estrategias",
+            "Reporte combinado de todos los módulos"
+        )
+
+        # Each module contributes its body now and its annex after the last module
+        sections = []
+        if cartera_data:
+            sections.append(("MÓDULO A: CRECIMIENTO DE CARTERA", self._portfolio_sections(
+                cartera_data['dataframe'], cartera_data['resumen'],
+                cartera_data.get('grafica_path'), appendix
+            )))
+        if jubilacion_data:
+            sections.append(("MÓDULO B: PROYECCIÓN DE JUBILACIÓN", self._retirement_sections(jubilacion_data)))
+        if bono_data:
+            sections.append(("MÓDULO C: VALORACIÓN DE BONOS", self._bond_sections(
+                bono_data['dataframe'], bono_data['resumen'], appendix
+            )))
+        if comparacion_data:
+            sections.append(("COMPARACIÓN DE ESTRATEGIAS", self._strategy_comparison_sections(
+                comparacion_data['estrategias'], comparacion_data['benchmarks'],
+                comparacion_data.get('analisis_riesgo', {}), comparacion_data.get('configuracion')
+            )))
+
+        if not sections:
+            raise ValueError('No hay datos de ningún módulo para el reporte completo')
+
+        # Table of contents on the cover
+        elements.append(Paragraph("📑 CONTENIDO", self.section_style))
+        for title, _ in sections:
+            elements.append(Paragraph(f"• {title}", self.normal_style))
+
+        anexos = []
+        for title, (body, anexo) in sections:
+            elements.append(PageBreak())
+            elements.append(Paragraph(title, self.subtitle_style))
+            elements.extend(body)
+            anexos.extend(anexo)
+        elements.extend(anexos)
+
         # Footer
-        elements.append(Spacer(1, 30))
-        elements.append(HRFlowable(width="100%", thickness=1, color=colors.lightgrey, spaceAfter=10))
-        elements.append(Paragraph("Reporte generado por Simulador Financiero - Todos los cálculos son proyecciones basadas en los parámetros proporcionados", self.footer_style))
-        elements.append(Paragraph(f"Página 1 - Generado el {datetime.now().strftime('%d/%m/%Y a las %H:%M')}", self.footer_style))
+        elements.extend(self._footer_flowables("Todos los cálculos son proyecciones basadas en los parámetros proporcionados"))
 
-        # Build PDF
         doc.build(elements)
-        buffer.seek(0)
-        return buffer
+        return output_path
 
 # Convenience functions
-def generar_pdf_cartera(df, resumen, grafica_path=None):
+def generar_pdf_cartera(df, resumen, grafica_path=None, appendix=False):
     """Generate portfolio PDF report"""
     generator = PDFGenerator()
-    return generator.generate_portfolio_report(df, resumen, grafica_path)
+    return generator.generate_portfolio_report(df, resumen, grafica_path, appendix)
 
-def generar_pdf_bono(df, resumen):
+def generar_pdf_bono(df, resumen, appendix=False):
     """Generate bond PDF report"""
     generator = PDFGenerator()
-    return generator.generate_bond_report(df, resumen)
+    return generator.generate_bond_report(df, resumen, appendix)
 
 def generar_pdf_jubilacion(resumen):
     """Generate retirement PDF report"""
@@ -1051,7 +1028,26 @@ def generar_pdf_comparacion(estrategias, benchmarks, analisis_riesgo, configurac
     generator = PDFGenerator()
     return generator.generate_strategy_comparison_report(estrategias, benchmarks, analisis_riesgo, configuracion)
 
-def generar_pdf_completo(cartera_data=None, jubilacion_data=None, bono_data=None):
-    """Generate complete PDF report with all modules"""
-    # TODO: Implement complete report generation
-    pass
+def generar_pdf_completo(cartera_data=None, jubilacion_data=None, bono_data=None,
+                         comparacion_data=None, output_path=None, appendix=True):
+    """
+    Generate complete PDF report with all modules.
+
+    The PDF is written to output_path (a new temporary file by default)
+    instead of an in-memory buffer; the caller owns the returned path and
+    must delete it.
+    """
+    temporary = output_path is None
+    if temporary:
+        fd, output_path = tempfile.mkstemp(prefix='reporte_completo_', suffix='.pdf')
+        os.close(fd)
+
+    generator = PDFGenerator()
+    try:
+        return generator.generate_complete_report(
+            output_path, cartera_data, jubilacion_data, bono_data, comparacion_data, appendix
+        )
+    except Exception:
+        if temporary:
+            os.remove(output_path)
+        raise